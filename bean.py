@@ -108,3 +108,226 @@ class Bean(object):
                 for key, value in record.items():
                     print('\t\t', key, ':', value)
                 print('\t\t---- ---- ---- ---- ---- ---- ---- ----')
+
+
+class LazyBean(Bean):
+    """
+    This class represents a SuiteCRM Bean that decodes its fields on demand.
+
+    The raw name value list and relationship list returned by SuiteCRM
+    are kept as they are, and each field is converted to its value the
+    first time it is accessed. It offers the same interface as Bean.
+    """
+
+    def __init__(self, module, name_value_list=None, relationship_list=None):
+        self.module = module
+        self._raw_fields = name_value_list or {}
+        self._raw_relationships = relationship_list or []
+        self._decoded_fields = {}
+        self._all_fields_decoded = False
+        self._decoded_relationships = None
+
+    def _get_raw_fields(self):
+        if not isinstance(self._raw_fields, dict):
+            self._raw_fields = dict(
+                (value['name'], value) for value in self._raw_fields)
+        return self._raw_fields
+
+    @property
+    def _fields(self):
+        if not self._all_fields_decoded:
+            fields = {}
+            for name, value in self._get_raw_fields().items():
+                fields[name] = self._decoded_fields.pop(name, value['value'])
+            fields.update(self._decoded_fields)
+            self._decoded_fields = fields
+            self._all_fields_decoded = True
+            self._raw_fields = {}
+        return self._decoded_fields
+
+    @property
+    def _relationship_list(self):
+        if self._decoded_relationships is None:
+            self._decoded_relationships = {}
+            relationship_list = self._raw_relationships
+            self._raw_relationships = []
+            Bean._set_relationship_list(self, relationship_list)
+        return self._decoded_relationships
+
+    def __getitem__(self, field_name):
+        try:
+            return self._decoded_fields[field_name]
+        except KeyError:
+            pass
+        if not self._all_fields_decoded:
+            raw_value = self._get_raw_fields().get(field_name)
+            if raw_value is not None:
+                value = raw_value['value']
+                self._decoded_fields[field_name] = value
+                return value
+        return self._relationship_list.get(field_name, '')
+
+    def __setitem__(self, field_name, value):
+        self._decoded_fields[field_name] = value
+
+
+class BeanSchema(object):
+    """
+    Field name table shared by all the compact beans of a module
+    that have the same fields.
+    """
+
+    __slots__ = ('module', 'field_names', 'field_indexes')
+
+    _schemas = {}
+
+    def __init__(self, module, field_names):
+        self.module = module
+        self.field_names = field_names
+        self.field_indexes = dict((name, i) for i, name in enumerate(field_names))
+
+    @classmethod
+    def get(cls, module, field_names):
+        """
+        Get the shared schema of a module and a list of fields.
+
+        :param str module: name of the module.
+        :param tuple[str] field_names: names of the fields, in order.
+        :return: the schema.
+        :rtype: BeanSchema
+        """
+        key = (module, field_names)
+        schema = cls._schemas.get(key)
+        if schema is None:
+            schema = cls._schemas.setdefault(key, cls(module, field_names))
+        return schema
+
+
+class CompactBean(object):
+    """
+    This class represents a SuiteCRM Bean using less memory than Bean.
+
+    Field names are stored once on a BeanSchema shared by the beans
+    with the same module and fields, and each bean only stores the list
+    of its values. It offers the same interface as Bean.
+    """
+
+    __slots__ = ('_schema', '_values', '_extra_fields', '_relationship_list')
+
+    def __init__(self, module, name_value_list=None, relationship_list=None,
+                 schema=None):
+        if name_value_list:
+            if not isinstance(name_value_list, dict):
+                name_value_list = dict(
+                    (value['name'], value) for value in name_value_list)
+            field_names = tuple(name_value_list.keys())
+            if schema is None or schema.field_names != field_names:
+                schema = BeanSchema.get(module, field_names)
+            self._values = [value['value'] for value in name_value_list.values()]
+        else:
+            schema = BeanSchema.get(module, ())
+            self._values = []
+        self._schema = schema
+        self._extra_fields = None
+        self._relationship_list = None
+        if relationship_list:
+            self._relationship_list = Bean(
+                module, relationship_list=relationship_list)._relationship_list
+
+    @property
+    def module(self):
+        """
+        Get the module of the bean.
+
+        :return: name of the module.
+        :rtype: str
+        """
+        return self._schema.module
+
+    @property
+    def schema(self):
+        """
+        Get the field name table of the bean.
+
+        :return: schema of the bean.
+        :rtype: BeanSchema
+        """
+        return self._schema
+
+    def _set_name_value_list(self, name_value_list):
+        for value in name_value_list.values():
+            self[value['name']] = value['value']
+
+    def __getitem__(self, field_name):
+        index = self._schema.field_indexes.get(field_name)
+        if index is not None:
+            return self._values[index]
+        if self._extra_fields and field_name in self._extra_fields:
+            return self._extra_fields[field_name]
+        if self._relationship_list and field_name in self._relationship_list:
+            return self._relationship_list[field_name]
+        return ''
+
+    def __setitem__(self, field_name, value):
+        index = self._schema.field_indexes.get(field_name)
+        if index is not None:
+            self._values[index] = value
+        else:
+            if self._extra_fields is None:
+                self._extra_fields = {}
+            self._extra_fields[field_name] = value
+
+    def _items(self):
+        for item in zip(self._schema.field_names, self._values):
+            yield item
+        if self._extra_fields:
+            for item in self._extra_fields.items():
+                yield item
+
+    @property
+    def name_value_list(self):
+        """
+        Get name value list of bean fields.
+
+        :return: name value list of bean fields.
+        :rtype: list[dict]
+        """
+        return [{'name': name, 'value': value} for name, value in self._items()]
+
+    @property
+    def fields(self):
+        """
+        Get list of bean fields.
+
+        :return: list with bean fields.
+        :rtype: list[str]
+        """
+        return [name for name, value in self._items()]
+
+    @property
+    def json(self):
+        """
+        Get JSON representation of bean.
+
+        :return: key value dictionary containing all bean fields.
+        :rtype: dict[str, object]
+        """
+        return dict(self._items())
+
+    def __str__(self):
+        string = self.module + '\n'
+        for key, value in self._items():
+            string += '\t' + str(key) + ': ' + str(value) + '\n'
+        return string
+
+    def show(self):
+        """Prints a representation of bean information."""
+        print(self.module)
+        for key, value in self._items():
+            print('\t', key, ':', value)
+        for relationship, records in (self._relationship_list or {}).items():
+            print('\t', relationship, ':')
+            for record in records:
+                for key, value in record.items():
+                    print('\t\t', key, ':', value)
+                print('\t\t---- ---- ---- ---- ---- ---- ---- ----')
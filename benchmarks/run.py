@@ -0,0 +1,353 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import argparse
+import datetime
+import gc
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import OrderedDict
+from ..bean import Bean
+from ..config import Config
+from ..suitecrm import SuiteCRM
+from ..suitecrm_cached import SuiteCRMCached
+from ..transport import InProcessTransport, register_transport
+from .server import StandInServer, start_server_process
+
+
+class BenchmarkContext(object):
+    """
+    Settings shared by the benchmarks and factory of the clients they use.
+    """
+
+    def __init__(self, url, records=1000, operations=200, page_size=100,
+                 settings=None):
+        """
+        :param str url: URL of the stand-in server.
+        :param int records: number of records of every module of the server.
+        :param int operations: number of operations of every benchmark.
+        :param int page_size: number of beans of every page retrieved.
+        :param dict[str, dict[str, str]] settings: client settings, by section.
+        """
+        self.url = url
+        self.records = records
+        self.operations = operations
+        self.page_size = page_size
+        self.settings = {
+            'SuiteCRM Metadata Cache': {'enabled': 'False'},
+            'SuiteCRM Cache': {'cache_backend': 'memory'},
+        }
+        for section, values in (settings or {}).items():
+            self.settings.setdefault(section, {}).update(values)
+        self.config_dir = tempfile.mkdtemp(prefix='suitepy-benchmarks-')
+
+    def get_config(self):
+        return Config.from_values(
+            self.url, 'admin', 'admin', settings=self.settings,
+            config_dir=self.config_dir)
+
+    def get_client(self, cached=False):
+        """
+        Create a new client of the stand-in server.
+
+        :param bool cached: if True, return a SuiteCRMCached client.
+        :rtype: SuiteCRM
+        """
+        if cached:
+            return SuiteCRMCached(conf=self.get_config())
+        return SuiteCRM(self.get_config())
+
+    def get_id(self, module_name, i):
+        return '%s-%08d' % (module_name.lower(), i % self.records)
+
+    def close(self):
+        shutil.rmtree(self.config_dir, ignore_errors=True)
+
+
+def bench_get_bean(context):
+    """
+    Retrieve contacts one by one. An operation is a bean retrieved.
+    """
+    crm = context.get_client()
+
+    def run():
+        for i in range(context.operations):
+            crm.get_bean('Contacts', context.get_id('Contacts', i * 7919))
+        return context.operations
+    return run
+
+
+def bench_get_bean_list(context):
+    """
+    Page through all the contacts. An operation is a bean retrieved.
+    """
+    crm = context.get_client()
+
+    def run():
+        beans = 0
+        offset = 0
+        while offset is not None:
+            page = crm.get_bean_list(
+                'Contacts', offset=offset, max_results=context.page_size)
+            beans += len(page['entry_list'])
+            offset = page['next_offset']
+        return beans
+    return run
+
+
+def bench_save_bean(context):
+    """
+    Create notes one by one. An operation is a bean saved.
+    """
+    crm = context.get_client()
+
+    def run():
+        for i in range(context.operations):
+            bean = Bean('Notes')
+            bean['name'] = 'Benchmark note %d' % i
+            bean['description'] = 'Note created by the save_bean benchmark'
+            crm.save_bean(bean)
+        return context.operations
+    return run
+
+
+def bench_get_relationships(context):
+    """
+    Retrieve the contacts of accounts. An operation is a call made.
+    """
+    crm = context.get_client()
+
+    def run():
+        for i in range(context.operations):
+            crm.get_relationships(
+                'Accounts', context.get_id('Accounts', i * 7919), 'contacts')
+        return context.operations
+    return run
+
+
+def bench_cached_get_bean(context):
+    """
+    Retrieve 20 contacts again and again with the cached client.
+    An operation is a bean retrieved.
+    """
+    crm = context.get_client(cached=True)
+
+    def run():
+        for i in range(context.operations):
+            crm.get_bean('Contacts', context.get_id('Contacts', i % 20))
+        return context.operations
+    return run
+
+
+def bench_cached_get_bean_list(context):
+    """
+    Retrieve 5 pages of contacts again and again with the cached client.
+    An operation is a bean retrieved.
+    """
+    crm = context.get_client(cached=True)
+
+    def run():
+        beans = 0
+        for i in range(context.operations):
+            page = crm.get_bean_list(
+                'Contacts', offset=(i % 5) * context.page_size,
+                max_results=context.page_size)
+            beans += len(page['entry_list'])
+        return beans
+    return run
+
+
+BENCHMARKS = OrderedDict([
+    ('get_bean', bench_get_bean),
+    ('get_bean_list', bench_get_bean_list),
+    ('save_bean', bench_save_bean),
+    ('get_relationships', bench_get_relationships),
+    ('cached_get_bean', bench_cached_get_bean),
+    ('cached_get_bean_list', bench_cached_get_bean_list),
+])
+
+
+def measure(name, benchmark, context, repeat=3):
+    """
+    Measure the throughput and the memory of a benchmark.
+
+    The throughput is the best of repeat runs, and the memory is the peak
+    of memory allocated by Python during an extra run.
+
+    :param str name: name of the benchmark.
+    :param benchmark: function that returns the function to measure, which
+        returns the number of operations done.
+    :param BenchmarkContext context: context of the benchmark.
+    :param int repeat: number of runs measured.
+    :return: the result of the benchmark.
+    :rtype: dict
+    """
+    run = benchmark(context)
+    # Warm up connections, session and caches.
+    operations = run()
+    best = None
+    for _ in range(max(repeat, 1)):
+        gc.collect()
+        start = time.perf_counter()
+        operations = run()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return OrderedDict([
+        ('name', name),
+        ('operations', operations),
+        ('seconds', best),
+        ('operations_per_second', operations / best if best else None),
+        ('microseconds_per_operation',
+         best * 1e6 / operations if operations else None),
+        ('peak_memory_bytes', peak_memory),
+    ])
+
+
+def run_benchmarks(names=None, records=1000, fields=10, latency=0.0,
+                   operations=200, page_size=100, repeat=3, settings=None,
+                   in_process=False):
+    """
+    Run benchmarks against a stand-in server started on a child process.
+
+    :param list[str] names: benchmarks to run, by default all of them.
+    :param int records: number of records of every module of the server.
+    :param int fields: number of extra text fields of every record.
+    :param float latency: seconds every call waits on the server.
+    :param int operations: number of operations of every benchmark.
+    :param int page_size: number of beans of every page retrieved.
+    :param int repeat: number of runs measured of every benchmark.
+    :param dict[str, dict[str, str]] settings: client settings, by section.
+    :param bool in_process: if True, calls are passed to a server of the same
+        process with an InProcessTransport, without any network, to measure
+        the overhead of the client alone. The memory measured then includes
+        the memory allocated by the server.
+    :return: report with the environment, the parameters and the results.
+    :rtype: dict
+    """
+    names = names or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            raise ValueError('Unknown benchmark: ' + name)
+    if in_process:
+        server = StandInServer(records=records, fields=fields, latency=latency)
+        register_transport(
+            'stand-in', lambda conf: InProcessTransport(conf, server.handle))
+        settings = dict(settings or {})
+        settings['SuiteCRM HTTP Connection'] = dict(
+            settings.get('SuiteCRM HTTP Connection', {}), transport='stand-in')
+        process, url = None, server.url
+    else:
+        process, url = start_server_process(records, fields, latency)
+    context = BenchmarkContext(url, records, operations, page_size, settings)
+    try:
+        results = [measure(name, BENCHMARKS[name], context, repeat)
+                   for name in names]
+    finally:
+        context.close()
+        if process is None:
+            server.stop()
+        else:
+            process.terminate()
+            process.join()
+    return OrderedDict([
+        ('date', datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')),
+        ('python', platform.python_implementation() + ' ' + platform.python_version()),
+        ('platform', platform.platform()),
+        ('parameters', OrderedDict([
+            ('records', records),
+            ('fields', fields),
+            ('latency', latency),
+            ('operations', operations),
+            ('page_size', page_size),
+            ('repeat', repeat),
+            ('in_process', in_process),
+            ('settings', settings or {}),
+        ])),
+        ('results', results),
+    ])
+
+
+def _parse_setting(value):
+    try:
+        option, setting_value = value.split('=', 1)
+        section, option = option.rsplit('.', 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            'Settings must look like "Section.option=value"')
+    return section, option, setting_value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark SuitePY against a local stand-in SuiteCRM server.')
+    parser.add_argument('benchmarks', nargs='*', metavar='benchmark',
+                        help='benchmarks to run: ' + ', '.join(BENCHMARKS))
+    parser.add_argument('--records', type=int, default=1000,
+                        help='number of records of every module')
+    parser.add_argument('--fields', type=int, default=10,
+                        help='number of extra text fields of every record')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds every call waits on the server')
+    parser.add_argument('--operations', type=int, default=200,
+                        help='number of operations of every benchmark')
+    parser.add_argument('--page-size', type=int, default=100,
+                        help='number of beans of every page retrieved')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='number of runs measured of every benchmark')
+    parser.add_argument('--setting', type=_parse_setting, action='append',
+                        default=[], metavar='SECTION.OPTION=VALUE',
+                        help='client setting, for example '
+                             '"SuiteCRM HTTP Connection.json_codec=json"')
+    parser.add_argument('--in-process', action='store_true',
+                        help='call a server of the same process without any '
+                             'network, to measure the overhead of the client')
+    parser.add_argument('--output', help='file where the JSON report is written, '
+                                         'by default the standard output')
+    args = parser.parse_args(argv)
+    settings = {}
+    for section, option, value in args.setting:
+        settings.setdefault(section, {})[option] = value
+    report = run_benchmarks(
+        args.benchmarks, args.records, args.fields, args.latency,
+        args.operations, args.page_size, args.repeat, settings,
+        args.in_process)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,464 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+MODULES = ('Accounts', 'Contacts', 'Notes')
+
+ERRORS = {
+    'invalid_login': ('Invalid Login', 'Login attempt failed please check the username and password', 10),
+    'invalid_session': ('Invalid Session ID', 'The session ID is invalid', 11),
+    'module_not_found': ('Module Does Not Exist', 'This module is not available on this server', 20),
+    'invalid_call': ('Invalid Call', 'The call made is invalid', 1000),
+}
+
+NOT_FOUND_WARNING = 'Access to this object is denied since it has been deleted or does not exist'
+
+
+class StandInData(object):
+    """
+    Synthetic records of a SuiteCRM instance.
+
+    Every module has the same number of records with the same fields,
+    and every account is related to the contacts with the same index
+    modulo the number of accounts, through the contacts link.
+    """
+
+    def __init__(self, records=1000, fields=10, modules=MODULES):
+        """
+        :param int records: number of records of every module.
+        :param int fields: number of extra text fields of every record.
+        :param tuple[str] modules: names of the modules.
+        """
+        self.fields = ['id', 'name', 'date_entered', 'amount', 'deleted'] + \
+            ['field_%d' % i for i in range(fields)]
+        self.modules = {}
+        self.relationships = {}
+        self.lock = threading.Lock()
+        for module in modules:
+            records_by_id = {}
+            for i in range(records):
+                record_id = '%s-%08d' % (module.lower(), i)
+                record = {
+                    'id': record_id,
+                    'name': '%s %d' % (module, i),
+                    'date_entered': '2018-01-%02d 10:00:00' % (i % 28 + 1),
+                    'amount': str(i * 10),
+                    'deleted': '0',
+                }
+                for j in range(fields):
+                    record['field_%d' % j] = 'Value %d of field %d' % (i, j)
+                records_by_id[record_id] = record
+            self.modules[module] = records_by_id
+        if 'Accounts' in self.modules and 'Contacts' in self.modules:
+            accounts = sorted(self.modules['Accounts'])
+            for i, contact_id in enumerate(sorted(self.modules['Contacts'])):
+                account_id = accounts[i % len(accounts)]
+                self.relationships.setdefault(
+                    (account_id, 'contacts'), []).append(contact_id)
+                self.relationships.setdefault(
+                    (contact_id, 'accounts'), []).append(account_id)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that time out close their connection before the response
+        # is written, which is expected and not worth a traceback.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super(_HTTPServer, self).handle_error(request, client_address)
+
+
+class StandInServer(object):
+    """
+    HTTP server that speaks the SuiteCRM v4_1 REST protocol used by SuitePY
+    (form encoded method and rest_data, JSON responses and error objects),
+    serving synthetic data.
+
+    It implements login, logout, get_entry, get_entries, get_entry_list,
+    get_entries_count, set_entry, set_entries, get_relationships,
+    set_relationship, get_available_modules and get_module_fields.
+    Queries and orders are ignored.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, records=1000, fields=10,
+                 latency=0.0, username='admin', password='admin'):
+        """
+        :param str host: address to listen on.
+        :param int port: port to listen on, 0 to use any free port.
+        :param int records: number of records of every module.
+        :param int fields: number of extra text fields of every record.
+        :param float latency: seconds every call waits before responding.
+        :param str username: username accepted by login.
+        :param str password: password accepted by login, in plain text.
+        """
+        self.data = StandInData(records, fields)
+        self.latency = latency
+        self.username = username
+        self.password = password
+        self.sessions = set()
+        self.calls = 0
+        self._httpd = _HTTPServer((host, port), self._get_handler())
+        self._thread = None
+        self._serving = False
+
+    @property
+    def url(self):
+        """
+        Get the URL of the REST API of the server.
+
+        :rtype: str
+        """
+        host, port = self._httpd.server_address[:2]
+        return 'http://%s:%d/service/v4_1/rest.php' % (host, port)
+
+    def start(self):
+        """
+        Start serving on a background thread.
+
+        :return: the server.
+        :rtype: StandInServer
+        """
+        self._serving = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """
+        Serve on the current thread until the process is stopped.
+        """
+        self._serving = True
+        self._httpd.serve_forever()
+
+    def stop(self):
+        """
+        Stop serving and close the socket.
+        """
+        if self._serving:
+            self._httpd.shutdown()
+            self._serving = False
+        self._httpd.server_close()
+
+    def expire_sessions(self):
+        """
+        Invalidate all the sessions, so clients have to login again.
+        """
+        self.sessions.clear()
+
+    def _get_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately, without this every
+            # response of a kept alive connection waits for a delayed ACK.
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                form = parse_qs(self.rfile.read(length).decode('utf8'))
+                body = json.dumps(server.handle(
+                    form.get('method', [''])[0],
+                    form.get('rest_data', ['{}'])[0]
+                )).encode('utf8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def handle(self, method, rest_data):
+        """
+        Answer an API call.
+
+        :param str method: name of the API method.
+        :param str rest_data: JSON encoded parameters of the call.
+        :return: response of the call, an error object if it failed.
+        :rtype: dict
+        """
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        try:
+            parameters = json.loads(rest_data)
+        except ValueError:
+            return self._error('invalid_call')
+        if method == 'login':
+            return self._login(parameters)
+        if not isinstance(parameters, dict) or \
+                parameters.get('session') not in self.sessions:
+            return self._error('invalid_session')
+        handler = getattr(self, '_' + method, None)
+        if handler is None or method.startswith('_'):
+            return self._error('invalid_call')
+        module_name = parameters.get('module_name')
+        if module_name is not None and module_name not in self.data.modules:
+            return self._error('module_not_found')
+        return handler(parameters)
+
+    @staticmethod
+    def _error(kind):
+        name, description, number = ERRORS[kind]
+        return {'name': name, 'description': description, 'number': number}
+
+    def _select(self, record, select_fields):
+        fields = select_fields or self.data.fields
+        return dict(
+            (field, {'name': field, 'value': record.get(field, '')})
+            for field in fields
+        )
+
+    def _entry(self, module_name, record, select_fields):
+        return {
+            'id': record['id'],
+            'module_name': module_name,
+            'name_value_list': self._select(record, select_fields),
+        }
+
+    @staticmethod
+    def _missing_entry(module_name, record_id):
+        return {
+            'id': record_id,
+            'module_name': module_name,
+            'name_value_list': [
+                {'name': 'warning', 'value': NOT_FOUND_WARNING},
+                {'name': 'deleted', 'value': 1},
+            ],
+        }
+
+    def _login(self, parameters):
+        user_auth = parameters.get('user_auth') or {}
+        password = self.password.encode('utf8')
+        if user_auth.get('user_name') != self.username or \
+                user_auth.get('password') not in (
+                    self.password, hashlib.md5(password).hexdigest()):
+            return self._error('invalid_login')
+        session_id = uuid.uuid4().hex
+        self.sessions.add(session_id)
+        return {
+            'id': session_id,
+            'module_name': 'Users',
+            'name_value_list': {
+                'user_name': {'name': 'user_name', 'value': self.username},
+            },
+        }
+
+    def _logout(self, parameters):
+        self.sessions.discard(parameters['session'])
+        return None
+
+    def _get_entry(self, parameters):
+        return self._get_entries(dict(parameters, ids=[parameters.get('id')]))
+
+    def _get_entries(self, parameters):
+        module_name = parameters['module_name']
+        records = self.data.modules[module_name]
+        entry_list = []
+        for record_id in parameters.get('ids') or []:
+            record = records.get(record_id)
+            if record is None or record['deleted'] == '1':
+                entry_list.append(self._missing_entry(module_name, record_id))
+            else:
+                entry_list.append(self._entry(
+                    module_name, record, parameters.get('select_fields')))
+        return {'entry_list': entry_list, 'relationship_list': []}
+
+    def _get_records(self, module_name, deleted=False):
+        records = self.data.modules[module_name]
+        return [records[record_id] for record_id in sorted(records)
+                if deleted or records[record_id]['deleted'] != '1']
+
+    def _get_entry_list(self, parameters):
+        module_name = parameters['module_name']
+        records = self._get_records(module_name, parameters.get('deleted'))
+        offset = int(parameters.get('offset') or 0)
+        max_results = int(parameters.get('max_results') or 20)
+        page = records[offset:offset + max_results]
+        select_fields = parameters.get('select_fields')
+        return {
+            'result_count': len(page),
+            'total_count': str(len(records)),
+            'next_offset': offset + len(page),
+            'entry_list': [self._entry(module_name, record, select_fields)
+                           for record in page],
+            'relationship_list': [],
+        }
+
+    def _get_entries_count(self, parameters):
+        records = self._get_records(
+            parameters['module_name'], parameters.get('deleted'))
+        return {'result_count': len(records)}
+
+    def _save(self, module_name, name_value_list):
+        if isinstance(name_value_list, dict):
+            name_value_list = name_value_list.values()
+        values = dict((field['name'], field['value']) for field in name_value_list)
+        values.pop('new_with_id', None)
+        with self.data.lock:
+            records = self.data.modules[module_name]
+            record_id = values.get('id') or str(uuid.uuid4())
+            record = records.get(record_id)
+            if record is None:
+                record = dict((field, '') for field in self.data.fields)
+                record['deleted'] = '0'
+                records[record_id] = record
+            record.update(values)
+            record['id'] = record_id
+        return record
+
+    def _set_entry(self, parameters):
+        record = self._save(
+            parameters['module_name'], parameters.get('name_value_list') or [])
+        return {
+            'id': record['id'],
+            'entry_list': self._select(record, list(record)),
+        }
+
+    def _set_entries(self, parameters):
+        ids = [self._save(parameters['module_name'], name_value_list)['id']
+               for name_value_list in parameters.get('name_value_lists') or []]
+        return {'ids': ids}
+
+    def _get_relationships(self, parameters):
+        link = parameters.get('link_field_name')
+        related_module = 'Accounts' if link == 'accounts' else 'Contacts'
+        records = self.data.modules.get(related_module, {})
+        related_ids = self.data.relationships.get(
+            (parameters.get('module_id'), link), [])
+        offset = int(parameters.get('offset') or 0)
+        limit = int(parameters.get('limit') or 0) or len(related_ids)
+        related_fields = parameters.get('related_fields')
+        return {
+            'entry_list': [
+                self._entry(related_module, records[record_id], related_fields)
+                for record_id in related_ids[offset:offset + limit]
+                if record_id in records
+            ],
+            'relationship_list': [],
+        }
+
+    def _set_relationship(self, parameters):
+        key = (parameters.get('module_id'), parameters.get('link_field_name'))
+        created = 0
+        deleted = 0
+        with self.data.lock:
+            related_ids = self.data.relationships.setdefault(key, [])
+            for related_id in parameters.get('related_ids') or []:
+                if parameters.get('delete'):
+                    if related_id in related_ids:
+                        related_ids.remove(related_id)
+                        deleted += 1
+                elif related_id not in related_ids:
+                    related_ids.append(related_id)
+                    created += 1
+        return {'created': created, 'failed': 0, 'deleted': deleted}
+
+    def _get_available_modules(self, parameters):
+        return {'modules': [
+            {'module_key': module, 'module_label': module, 'favorite_enabled': False}
+            for module in sorted(self.data.modules)
+        ]}
+
+    def _get_module_fields(self, parameters):
+        types = {'id': 'id', 'date_entered': 'datetime', 'amount': 'currency',
+                 'deleted': 'bool'}
+        module_fields = dict(
+            (field, {'name': field, 'type': types.get(field, 'varchar'),
+                     'label': field, 'required': 0, 'options': []})
+            for field in self.data.fields
+        )
+        fields = parameters.get('fields')
+        if fields:
+            module_fields = dict((field, module_fields[field])
+                                 for field in fields if field in module_fields)
+        return {
+            'module_name': parameters['module_name'],
+            'table_name': parameters['module_name'].lower(),
+            'module_fields': module_fields,
+            'link_fields': [],
+        }
+
+
+def _serve(urls, records, fields, latency):
+    server = StandInServer(records=records, fields=fields, latency=latency)
+    urls.put(server.url)
+    server.serve_forever()
+
+
+def start_server_process(records=1000, fields=10, latency=0.0):
+    """
+    Start a StandInServer on a child process, so its work does not
+    interfere with the measures of the client.
+
+    :param int records: number of records of every module.
+    :param int fields: number of extra text fields of every record.
+    :param float latency: seconds every call waits before responding.
+    :return: the process, to terminate it when done, and the URL of the server.
+    :rtype: tuple[multiprocessing.Process, str]
+    """
+    urls = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=_serve, args=(urls, records, fields, latency))
+    process.daemon = True
+    process.start()
+    return process, urls.get(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Serve synthetic data with the SuiteCRM v4_1 REST protocol.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--records', type=int, default=1000,
+                        help='number of records of every module')
+    parser.add_argument('--fields', type=int, default=10,
+                        help='number of extra text fields of every record')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds every call waits before responding')
+    args = parser.parse_args()
+    server = StandInServer(args.host, args.port, args.records, args.fields,
+                           args.latency)
+    print('Serving on ' + server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
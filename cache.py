@@ -0,0 +1,517 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import hashlib
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+_FIELD_LIST_PARAMETERS = frozenset([
+    'select_fields', 'related_fields', 'fields',
+])
+
+
+def make_cache_key(method, parameters):
+    """
+    Get a hashable key that identifies an API call.
+
+    The session ID is left out, so keys survive re-logins, and equivalent
+    forms of the parameters get the same key: empty values ('', [], {}
+    and None) are equal, and the order of field lists is not relevant.
+
+    :param str method: name of the API method.
+    :param dict[str, object] parameters: parameters of the call.
+    :return: key of the call.
+    :rtype: tuple
+    """
+    items = []
+    for name, value in parameters.items():
+        if name == 'session':
+            continue
+        if name in _FIELD_LIST_PARAMETERS and isinstance(value, (list, tuple)):
+            value = sorted(value)
+        items.append((name, _freeze(value)))
+    items.sort(key=lambda item: item[0])
+    return method, tuple(items)
+
+
+def _freeze(value):
+    if value is None or value == '' or value == [] or value == {}:
+        return None
+    if isinstance(value, dict):
+        return tuple(sorted(
+            ((name, _freeze(item)) for name, item in value.items()),
+            key=lambda item: item[0]
+        ))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def estimate_size(value):
+    """
+    Estimate the memory used by a decoded API response.
+
+    :param object value: value made of dicts, lists, tuples and scalars.
+    :return: approximate size in bytes.
+    :rtype: int
+    """
+    size = 0
+    pending = [value]
+    while pending:
+        item = pending.pop()
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            pending.extend(item)
+    return size
+
+
+class CacheBackend(object):
+    """
+    Base class for the caches used by SuiteCRMCached.
+
+    A cache stores values under hashable keys, holds at most max_size
+    entries evicting the least recently used ones, and can expire entries
+    after ttl seconds. Entries can be labeled with tags to invalidate
+    them together. Implementations count hits, misses and evictions.
+
+    If max_bytes is set, least recently used entries are also evicted to
+    keep the estimated size in bytes of all the entries under it, and
+    entries bigger than max_entry_bytes are not stored at all.
+    """
+
+    def __init__(self, max_size=100, ttl=None, max_bytes=None,
+                 max_entry_bytes=None):
+        """
+        Creates an empty cache.
+
+        :param int max_size: maximum number of entries.
+        :param float ttl: seconds an entry is valid, None or 0 to never expire.
+        :param int max_bytes: maximum total size of the entries, None or 0 for no limit.
+        :param int max_entry_bytes: maximum size of an entry, None or 0 for no limit.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """
+        Get the value stored for a key, marking it as the most recently used.
+
+        :param key: hashable key.
+        :param default: value returned if the key is not cached or has expired.
+        :return: the cached value or default.
+        """
+        raise NotImplementedError
+
+    def set(self, key, value, tags=()):
+        """
+        Store a value for a key, evicting the least recently used entries
+        if the cache is full.
+
+        :param key: hashable key.
+        :param value: value to store.
+        :param tags: hashable tags used to invalidate the entry.
+        :return: True if the value has been stored, False if it is too big.
+        :rtype: bool
+        """
+        raise NotImplementedError
+
+    def _too_big(self, size):
+        return bool(self.max_entry_bytes) and size > self.max_entry_bytes
+
+    def _over_capacity(self, count, size):
+        return count > self.max_size or \
+            (bool(self.max_bytes) and size > self.max_bytes)
+
+    def delete(self, key):
+        """
+        Remove a key from the cache, if present.
+
+        :param key: hashable key.
+        """
+        raise NotImplementedError
+
+    def invalidate_tag(self, tag):
+        """
+        Remove all the entries labeled with a tag.
+
+        :param tag: hashable tag.
+        :return: number of removed entries.
+        :rtype: int
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove all the entries of the cache."""
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+    @property
+    def size_bytes(self):
+        """
+        Get the estimated size of all the entries.
+
+        :return: size in bytes.
+        :rtype: int
+        """
+        raise NotImplementedError
+
+
+class LRUCache(CacheBackend):
+    """
+    In-memory cache that evicts the least recently used entry when full.
+
+    Entries can have a time to live. Expired entries are not actively
+    purged, they are removed when they are accessed or when they reach
+    the least recently used end of the cache.
+
+    Entries can be labeled with tags, so all the entries sharing a tag
+    can be invalidated at once.
+    Operations take constant time, except tag invalidation that takes
+    time proportional to the number of invalidated entries. The size of
+    the entries is only estimated when they are stored if max_bytes or
+    max_entry_bytes is set, otherwise it is estimated when size_bytes
+    is requested.
+    The cache can be shared by several threads.
+    """
+
+    def __init__(self, max_size=100, ttl=None, max_bytes=None,
+                 max_entry_bytes=None):
+        super(LRUCache, self).__init__(
+            max_size, ttl, max_bytes, max_entry_bytes)
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._size_bytes = 0
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _get_time():
+        return time.monotonic()
+
+    def _expired(self, expires_at):
+        return expires_at is not None and expires_at <= self._get_time()
+
+    def get(self, key, default=None):
+        """
+        Get the value stored for a key, marking it as the most recently used.
+
+        :param key: hashable key.
+        :param default: value returned if the key is not cached or has expired.
+        :return: the cached value or default.
+        """
+        with self._lock:
+            try:
+                value, expires_at, tags, size = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if self._expired(expires_at):
+                self._remove(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, tags=()):
+        """
+        Store a value for a key, evicting the least recently used entries
+        if the cache is full.
+
+        :param key: hashable key.
+        :param value: value to store.
+        :param tags: hashable tags used to invalidate the entry.
+        :return: True if the value has been stored, False if it is too big.
+        :rtype: bool
+        """
+        size = None
+        if self.max_bytes or self.max_entry_bytes:
+            size = estimate_size(value)
+        expires_at = self._get_time() + self.ttl if self.ttl else None
+        tags = tuple(tags)
+        with self._lock:
+            self._remove(key)
+            if size is not None and self._too_big(size):
+                return False
+            self._entries[key] = (value, expires_at, tags, size)
+            self._size_bytes += size or 0
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self._over_capacity(len(self._entries), self._size_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            return True
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._size_bytes -= entry[3] or 0
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def delete(self, key):
+        """
+        Remove a key from the cache, if present.
+
+        :param key: hashable key.
+        """
+        with self._lock:
+            self._remove(key)
+
+    def invalidate_tag(self, tag):
+        """
+        Remove all the entries labeled with a tag.
+
+        :param tag: hashable tag.
+        :return: number of removed entries.
+        :rtype: int
+        """
+        with self._lock:
+            keys = self._tags.pop(tag, ())
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        """Remove all the entries of the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._size_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size_bytes(self):
+        with self._lock:
+            return self._size_bytes + sum(
+                estimate_size(value)
+                for value, expires_at, tags, size in self._entries.values()
+                if size is None
+            )
+
+    def __contains__(self, key):
+        with self._lock:
+            try:
+                return not self._expired(self._entries[key][1])
+            except KeyError:
+                return False
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Persistent cache stored on a SQLite database file.
+
+    The cache survives restarts and can be shared by several processes
+    on the same host. Keys, tags and values must be picklable.
+    Hit, miss and eviction counters are kept per instance.
+    The size of an entry is the size of its pickled value.
+    """
+
+    def __init__(self, path, max_size=100, ttl=None, max_bytes=None,
+                 max_entry_bytes=None):
+        """
+        Opens the cache stored on a file, creating it if needed.
+
+        :param str path: path of the SQLite database file.
+        :param int max_size: maximum number of entries.
+        :param float ttl: seconds an entry is valid, None or 0 to never expire.
+        :param int max_bytes: maximum total size of the entries, None or 0 for no limit.
+        :param int max_entry_bytes: maximum size of an entry, None or 0 for no limit.
+        """
+        super(SQLiteCache, self).__init__(
+            max_size, ttl, max_bytes, max_entry_bytes)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=30, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'key TEXT PRIMARY KEY, value BLOB, '
+                'expires_at REAL, accessed REAL, size INTEGER)')
+            columns = [row[1] for row in self._connection.execute(
+                'PRAGMA table_info(entries)')]
+            if 'size' not in columns:
+                self._connection.execute(
+                    'ALTER TABLE entries ADD COLUMN size INTEGER DEFAULT 0')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS entries_accessed '
+                'ON entries (accessed)')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS tags (tag TEXT, key TEXT)')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS tags_tag ON tags (tag)')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS tags_key ON tags (key)')
+
+    @staticmethod
+    def _digest(key):
+        return hashlib.sha1(repr(key).encode('utf8')).hexdigest()
+
+    @staticmethod
+    def _get_time():
+        return time.time()
+
+    def _remove(self, digests):
+        for digest in digests:
+            self._connection.execute(
+                'DELETE FROM entries WHERE key = ?', (digest,))
+            self._connection.execute(
+                'DELETE FROM tags WHERE key = ?', (digest,))
+
+    def get(self, key, default=None):
+        digest = self._digest(key)
+        now = self._get_time()
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT value, expires_at FROM entries WHERE key = ?',
+                (digest,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+            if row[1] is not None and row[1] <= now:
+                self._remove([digest])
+                self.misses += 1
+                return default
+            self._connection.execute(
+                'UPDATE entries SET accessed = ? WHERE key = ?', (now, digest))
+            self.hits += 1
+        return pickle.loads(row[0])
+
+    def set(self, key, value, tags=()):
+        digest = self._digest(key)
+        blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        now = self._get_time()
+        expires_at = now + self.ttl if self.ttl else None
+        with self._lock:
+            if self._too_big(len(blob)):
+                self._remove([digest])
+                return False
+            self._connection.execute('BEGIN IMMEDIATE')
+            try:
+                self._remove([digest])
+                self._connection.execute(
+                    'INSERT INTO entries '
+                    '(key, value, expires_at, accessed, size) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (digest, sqlite3.Binary(blob), expires_at, now, len(blob))
+                )
+                self._connection.executemany(
+                    'INSERT INTO tags (tag, key) VALUES (?, ?)',
+                    [(self._digest(tag), digest) for tag in tags]
+                )
+                self._evict()
+                self._connection.execute('COMMIT')
+            except BaseException:
+                self._connection.execute('ROLLBACK')
+                raise
+        return True
+
+    def _evict(self):
+        count, size = self._connection.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        if not self._over_capacity(count, size):
+            return
+        evicted = []
+        for key, entry_size in self._connection.execute(
+                'SELECT key, size FROM entries ORDER BY accessed'):
+            if not self._over_capacity(count, size):
+                break
+            evicted.append(key)
+            count -= 1
+            size -= entry_size or 0
+        self._remove(evicted)
+        self.evictions += len(evicted)
+
+    def delete(self, key):
+        with self._lock:
+            self._remove([self._digest(key)])
+
+    def invalidate_tag(self, tag):
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT key FROM tags WHERE tag = ?', (self._digest(tag),)
+            ).fetchall()
+            self._remove(row[0] for row in rows)
+        return len(rows)
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute('DELETE FROM entries')
+            self._connection.execute('DELETE FROM tags')
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute(
+                'SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    @property
+    def size_bytes(self):
+        with self._lock:
+            return self._connection.execute(
+                'SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def close(self):
+        """Closes the connection to the database file."""
+        with self._lock:
+            self._connection.close()
+
+
+def create_cache(backend='memory', max_size=100, ttl=None, path=None,
+                 max_bytes=None, max_entry_bytes=None):
+    """
+    Creates a cache of the specified backend.
+
+    :param str backend: 'memory' for an LRUCache or 'sqlite' for a SQLiteCache.
+    :param int max_size: maximum number of entries.
+    :param float ttl: seconds an entry is valid, None or 0 to never expire.
+    :param str path: path of the database file of persistent backends.
+    :param int max_bytes: maximum total size of the entries, None or 0 for no limit.
+    :param int max_entry_bytes: maximum size of an entry, None or 0 for no limit.
+    :return: the new cache.
+    :rtype: CacheBackend
+    """
+    if backend == 'memory':
+        return LRUCache(max_size, ttl, max_bytes, max_entry_bytes)
+    if backend == 'sqlite':
+        return SQLiteCache(path, max_size, ttl, max_bytes, max_entry_bytes)
+    raise ValueError('Unknown cache backend: ' + str(backend))
@@ -0,0 +1,118 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import json
+
+
+class JSONCodec(object):
+    """
+    Encodes the parameters and decodes the responses of SuiteCRM API calls
+    using the json module of the standard library.
+
+    Responses are decoded straight from the bytes of the body into
+    plain dicts, which keep the order of the keys.
+    """
+
+    name = 'json'
+
+    def dumps(self, value):
+        """
+        Encode a value as JSON.
+
+        :param object value: value to encode.
+        :return: JSON document.
+        :rtype: str
+        """
+        return json.dumps(value)
+
+    def loads(self, data):
+        """
+        Decode a JSON document.
+
+        :param bytes data: JSON document, as bytes or str.
+        :return: decoded value.
+        :rtype: object
+        """
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    JSON codec that uses the orjson package.
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def dumps(self, value):
+        return self._orjson.dumps(value).decode('utf8')
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+
+class UjsonCodec(JSONCodec):
+    """
+    JSON codec that uses the ujson package.
+    """
+
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+
+    def dumps(self, value):
+        return self._ujson.dumps(value, ensure_ascii=False)
+
+    def loads(self, data):
+        return self._ujson.loads(data)
+
+
+_CODECS = {
+    JSONCodec.name: JSONCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    UjsonCodec.name: UjsonCodec,
+}
+
+
+def get_codec(name='auto'):
+    """
+    Get a JSON codec by name.
+
+    :param str name: 'json', 'orjson', 'ujson' or 'auto' to use orjson
+        if it is installed and the json module otherwise.
+    :return: the codec.
+    :rtype: JSONCodec
+    :raises ImportError: if the package of the requested codec is not installed.
+    """
+    if name == 'auto':
+        try:
+            return OrjsonCodec()
+        except ImportError:
+            return JSONCodec()
+    try:
+        codec_class = _CODECS[name]
+    except KeyError:
+        raise ValueError('Unknown JSON codec: ' + str(name))
+    return codec_class()
@@ -0,0 +1,271 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import datetime
+from collections import OrderedDict
+from decimal import Decimal, InvalidOperation
+
+INT_TYPES = frozenset(['int', 'integer', 'long'])
+DECIMAL_TYPES = frozenset(['decimal', 'currency'])
+FLOAT_TYPES = frozenset(['float', 'double'])
+BOOL_TYPES = frozenset(['bool'])
+DATE_TYPES = frozenset(['date'])
+DATETIME_TYPES = frozenset(['datetime', 'datetimecombo'])
+
+
+def entries_to_columns(entry_list, select_fields=None):
+    """
+    Build one list of values per field from the entry_list of a
+    get_entry_list response, without creating Bean objects.
+
+    :param list[dict] entry_list: entries returned by get_entry_list.
+    :param list[str] select_fields: fields of the columns, by default
+        the fields of the first entry.
+    :return: dict containing a list of values for every field.
+    :rtype: collections.OrderedDict[str, list]
+    """
+    if not select_fields:
+        select_fields = []
+        if entry_list:
+            name_value_list = entry_list[0]['name_value_list']
+            if isinstance(name_value_list, dict):
+                select_fields = list(name_value_list.keys())
+            else:
+                select_fields = [value['name'] for value in name_value_list]
+    columns = OrderedDict((field, []) for field in select_fields)
+    appends = [(field, columns[field].append) for field in select_fields]
+    for entry in entry_list:
+        name_value_list = entry['name_value_list']
+        if not isinstance(name_value_list, dict):
+            name_value_list = dict(
+                (value['name'], value) for value in name_value_list)
+        for field, append in appends:
+            value = name_value_list.get(field)
+            append(value['value'] if value is not None else None)
+    return columns
+
+
+def extend_columns(columns, other):
+    """
+    Append the values of some columns at the end of other columns.
+
+    :param dict[str, list] columns: columns to extend.
+    :param dict[str, list] other: columns to append.
+    :return: the extended columns.
+    :rtype: dict[str, list]
+    """
+    for field, values in other.items():
+        if field in columns:
+            columns[field].extend(values)
+        else:
+            columns[field] = values
+    return columns
+
+
+def _parse_int(value):
+    return int(value)
+
+
+def _parse_decimal(value):
+    return Decimal(value)
+
+
+def _parse_float(value):
+    return float(value)
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ('1', 'true', 'on', 'yes')
+
+
+def _parse_date(value):
+    return datetime.datetime.strptime(value[:10], '%Y-%m-%d').date()
+
+
+def _parse_datetime(value):
+    return datetime.datetime.strptime(value[:19], '%Y-%m-%d %H:%M:%S')
+
+
+def _get_parser(field_type):
+    if field_type in INT_TYPES:
+        return _parse_int
+    if field_type in DECIMAL_TYPES:
+        return _parse_decimal
+    if field_type in FLOAT_TYPES:
+        return _parse_float
+    if field_type in BOOL_TYPES:
+        return _parse_bool
+    if field_type in DATE_TYPES:
+        return _parse_date
+    if field_type in DATETIME_TYPES:
+        return _parse_datetime
+    return None
+
+
+def get_field_types(module_fields):
+    """
+    Get the type of every field from a get_module_fields response.
+
+    :param dict[str, object] module_fields: result of SuiteCRM.get_module_fields.
+    :return: type of every field.
+    :rtype: dict[str, str]
+    """
+    definitions = module_fields.get('module_fields') or {}
+    if not isinstance(definitions, dict):
+        definitions = dict(
+            (definition['name'], definition) for definition in definitions)
+    return dict(
+        (name, definition.get('type')) for name, definition in definitions.items()
+    )
+
+
+def type_columns(columns, field_types):
+    """
+    Convert the values of the columns to Python types.
+
+    Integers, decimals, floats, booleans, dates and datetimes are
+    converted, empty and invalid values become None, and fields of
+    other types are kept as they are.
+
+    :param dict[str, list] columns: columns with the values returned by SuiteCRM.
+    :param dict[str, str] field_types: type of every field.
+    :return: columns with typed values.
+    :rtype: collections.OrderedDict[str, list]
+    """
+    typed_columns = OrderedDict()
+    for field, values in columns.items():
+        parse = _get_parser(field_types.get(field))
+        if parse is None:
+            typed_columns[field] = values
+            continue
+        typed_values = []
+        append = typed_values.append
+        for value in values:
+            if value is None or value == '':
+                append(None)
+                continue
+            try:
+                append(parse(value))
+            except (ValueError, TypeError, InvalidOperation):
+                append(None)
+        typed_columns[field] = typed_values
+    return typed_columns
+
+
+def columns_to_numpy(columns, field_types):
+    """
+    Convert typed columns to NumPy arrays. Requires numpy.
+
+    Integer and boolean columns with missing values, and decimal
+    columns, become float arrays with NaN for missing values.
+    Dates and datetimes become datetime64 arrays.
+
+    :param dict[str, list] columns: columns returned by type_columns.
+    :param dict[str, str] field_types: type of every field.
+    :return: dict containing an array for every field.
+    :rtype: collections.OrderedDict[str, numpy.ndarray]
+    """
+    import numpy
+
+    arrays = OrderedDict()
+    for field, values in columns.items():
+        field_type = field_types.get(field)
+        missing = any(value is None for value in values)
+        if field_type in INT_TYPES and not missing:
+            arrays[field] = numpy.array(values, dtype=numpy.int64)
+        elif field_type in BOOL_TYPES and not missing:
+            arrays[field] = numpy.array(values, dtype=bool)
+        elif field_type in INT_TYPES or field_type in BOOL_TYPES or \
+                field_type in DECIMAL_TYPES or field_type in FLOAT_TYPES:
+            arrays[field] = numpy.array(
+                [numpy.nan if value is None else float(value) for value in values],
+                dtype=numpy.float64
+            )
+        elif field_type in DATE_TYPES:
+            arrays[field] = numpy.array(
+                ['NaT' if value is None else value for value in values],
+                dtype='datetime64[D]'
+            )
+        elif field_type in DATETIME_TYPES:
+            arrays[field] = numpy.array(
+                ['NaT' if value is None else value for value in values],
+                dtype='datetime64[s]'
+            )
+        else:
+            arrays[field] = numpy.array(values, dtype=object)
+    return arrays
+
+
+def columns_to_dataframe(columns, field_types):
+    """
+    Convert typed columns to a pandas DataFrame. Requires pandas.
+
+    Integer and boolean columns use pandas nullable dtypes, so
+    missing values do not turn them into floats.
+
+    :param dict[str, list] columns: columns returned by type_columns.
+    :param dict[str, str] field_types: type of every field.
+    :return: DataFrame with a column for every field.
+    :rtype: pandas.DataFrame
+    """
+    import pandas
+
+    series = OrderedDict()
+    for field, values in columns.items():
+        field_type = field_types.get(field)
+        if field_type in INT_TYPES:
+            series[field] = pandas.array(values, dtype='Int64')
+        elif field_type in BOOL_TYPES:
+            series[field] = pandas.array(values, dtype='boolean')
+        elif field_type in DECIMAL_TYPES or field_type in FLOAT_TYPES:
+            series[field] = pandas.array(
+                [None if value is None else float(value) for value in values],
+                dtype='Float64'
+            )
+        elif field_type in DATE_TYPES or field_type in DATETIME_TYPES:
+            series[field] = pandas.to_datetime(pandas.Series(values))
+        else:
+            series[field] = pandas.Series(values, dtype=object)
+    return pandas.DataFrame(series)
+
+
+def convert_columns(columns, field_types, output='dict'):
+    """
+    Convert columns with the values returned by SuiteCRM to the requested output.
+
+    :param dict[str, list] columns: columns with the values returned by SuiteCRM.
+    :param dict[str, str] field_types: type of every field, None to keep values untyped.
+    :param str output: 'dict' for a dict of lists, 'numpy' for a dict
+        of NumPy arrays or 'pandas' for a DataFrame.
+    :return: the converted columns.
+    """
+    if output not in ('dict', 'numpy', 'pandas'):
+        raise ValueError('Unknown columnar output: ' + str(output))
+    if field_types is None:
+        field_types = {}
+    else:
+        columns = type_columns(columns, field_types)
+    if output == 'numpy':
+        return columns_to_numpy(columns, field_types)
+    if output == 'pandas':
+        return columns_to_dataframe(columns, field_types)
+    return columns
@@ -27,6 +27,7 @@ class Config:
     This class is used to read from a file the access credentials of a SuiteCRM API.
 
     This avoids the need of hard-code the credentials in the code.
+    Configurations can also be built from values with Config.from_values.
     """
 
     def __init__(self, config_file="suitepy.ini"):
@@ -40,6 +41,7 @@ class Config:
         else:
             base_dir = os.path.dirname(os.path.abspath(__file__))
             abs_path = os.path.join(base_dir, config_file)
+        self._config_dir = os.path.dirname(abs_path)
         if os.path.isfile(abs_path):
             print("Loading config from file: " + abs_path)
             self._load_config_file(abs_path)
@@ -49,9 +51,56 @@ class Config:
             self._create_config_file(abs_path)
             exit(0)
 
+    @classmethod
+    def from_values(cls, url, username, password, application_name="SuitePY",
+                    verify_ssl=True, settings=None, config_dir=None):
+        """
+        Creates a Config instance from the specified values instead of a file.
+
+        :param str url: SuiteCRM REST API URL.
+        :param str username: login username.
+        :param str password: login password.
+        :param str application_name: application name used when login to SuiteCRM API.
+        :param bool verify_ssl: whether the SSL certificate should be verified.
+        :param dict[str, dict[str, object]] settings: other settings, by section,
+            with the same names used on the config file.
+        :param str config_dir: directory used to resolve relative paths,
+            by default the directory of this package.
+        :return: the configuration.
+        :rtype: Config
+        """
+        config = configparser.ConfigParser()
+        config.read_dict({
+            "SuiteCRM API Credentials": {
+                "url": url,
+                "username": username,
+                "password": password,
+                "application_name": application_name,
+                "verify_ssl": str(verify_ssl),
+            }
+        })
+        if settings:
+            config.read_dict(settings)
+        conf = cls.__new__(cls)
+        conf._config_dir = config_dir or os.path.dirname(os.path.abspath(__file__))
+        conf._load_config(config)
+        return conf
+
     def _load_config_file(self, config_file):
         config = configparser.ConfigParser()
         config.read(config_file)
+        self._load_config(config)
+
+    def _load_config(self, config):
+        self._load_credentials(config)
+        self._load_connection_settings(config)
+        self._load_cache_settings(config)
+        self._load_metadata_cache_settings(config)
+        self._load_governor_settings(config)
+        self._load_retry_policy_settings(config)
+        self._load_metrics_settings(config)
+
+    def _load_credentials(self, config):
         self._url = config.get("SuiteCRM API Credentials", "url")
         self._username = config.get("SuiteCRM API Credentials", "username")
         self._password = config.get("SuiteCRM API Credentials", "password")
@@ -59,8 +108,93 @@ class Config:
             "SuiteCRM API Credentials",
             "application_name"
         )
-        self._verify_ssl = bool(config.get(
-            "SuiteCRM API Credentials", "verify_ssl"))
+        self._verify_ssl = config.getboolean(
+            "SuiteCRM API Credentials", "verify_ssl")
+
+    def _load_connection_settings(self, config):
+        section = "SuiteCRM HTTP Connection"
+        self._pool_connections = config.getint(
+            section, "pool_connections", fallback=10)
+        self._pool_maxsize = config.getint(
+            section, "pool_maxsize", fallback=10)
+        self._pool_block = config.getboolean(
+            section, "pool_block", fallback=False)
+        self._keep_alive = config.getboolean(
+            section, "keep_alive", fallback=True)
+        self._connect_timeout = config.getfloat(
+            section, "connect_timeout", fallback=10.0)
+        self._read_timeout = config.getfloat(
+            section, "read_timeout", fallback=60.0)
+        self._async_max_concurrency = config.getint(
+            section, "async_max_concurrency", fallback=100)
+        self._json_codec = config.get(section, "json_codec", fallback="auto")
+        self._coalesce_calls = config.getboolean(
+            section, "coalesce_calls", fallback=True)
+        self._transport = config.get(section, "transport", fallback="requests")
+        self._async_transport = config.get(
+            section, "async_transport", fallback="aiohttp")
+
+    def _load_cache_settings(self, config):
+        section = "SuiteCRM Cache"
+        self._max_cached_requests = config.getint(
+            section, "max_cached_requests", fallback=100)
+        self._cache_ttl = config.getfloat(section, "cache_ttl", fallback=0)
+        self._max_cached_bytes = config.getint(
+            section, "max_cached_bytes", fallback=0)
+        self._max_cached_entry_bytes = config.getint(
+            section, "max_cached_entry_bytes", fallback=0)
+        self._cache_backend = config.get(
+            section, "cache_backend", fallback="memory")
+        self._cache_path = os.path.join(
+            self._config_dir,
+            config.get(section, "cache_path", fallback="suitepy_cache.sqlite")
+        )
+
+    def _load_metadata_cache_settings(self, config):
+        section = "SuiteCRM Metadata Cache"
+        self._metadata_cache_enabled = config.getboolean(
+            section, "enabled", fallback=False)
+        self._metadata_cache_ttl = config.getfloat(
+            section, "ttl", fallback=86400)
+        self._metadata_cache_path = os.path.join(
+            self._config_dir,
+            config.get(section, "path", fallback="suitepy_metadata.sqlite")
+        )
+
+    def _load_governor_settings(self, config):
+        section = "SuiteCRM Governor"
+        self._governor_enabled = config.getboolean(
+            section, "enabled", fallback=False)
+        self._governor_read_rate = config.getfloat(
+            section, "read_rate", fallback=0)
+        self._governor_read_max_concurrency = config.getint(
+            section, "read_max_concurrency", fallback=10)
+        self._governor_write_rate = config.getfloat(
+            section, "write_rate", fallback=0)
+        self._governor_write_max_concurrency = config.getint(
+            section, "write_max_concurrency", fallback=4)
+        self._governor_min_concurrency = config.getint(
+            section, "min_concurrency", fallback=1)
+        self._governor_latency_tolerance = config.getfloat(
+            section, "latency_tolerance", fallback=2.0)
+
+    def _load_retry_policy_settings(self, config):
+        section = "SuiteCRM Retry Policy"
+        self._retries = config.getint(section, "retries", fallback=2)
+        self._retry_backoff = config.getfloat(
+            section, "backoff", fallback=0.1)
+        self._retry_max_backoff = config.getfloat(
+            section, "max_backoff", fallback=2.0)
+        self._call_deadline = config.getfloat(
+            section, "deadline", fallback=0)
+        self._hedge_percentile = config.getfloat(
+            section, "hedge_percentile", fallback=0)
+        self._retry_writes = config.getboolean(
+            section, "retry_writes", fallback=False)
+
+    def _load_metrics_settings(self, config):
+        self._metrics_enabled = config.getboolean(
+            "SuiteCRM Metrics", "enabled", fallback=False)
 
     @staticmethod
     def _create_config_file(config_file):
@@ -75,10 +209,60 @@ class Config:
         config.set("SuiteCRM API Credentials", "username", "api")
         config.set("SuiteCRM API Credentials", "password", "123456")
         config.set("SuiteCRM API Credentials", "application_name", "SuitePY")
-        config.set("SuiteCRM API Credentials", "verify_ssl", True)
+        config.set("SuiteCRM API Credentials", "verify_ssl", "True")
+        config.add_section("SuiteCRM HTTP Connection")
+        config.set("SuiteCRM HTTP Connection", "pool_connections", "10")
+        config.set("SuiteCRM HTTP Connection", "pool_maxsize", "10")
+        config.set("SuiteCRM HTTP Connection", "pool_block", "False")
+        config.set("SuiteCRM HTTP Connection", "keep_alive", "True")
+        config.set("SuiteCRM HTTP Connection", "connect_timeout", "10")
+        config.set("SuiteCRM HTTP Connection", "read_timeout", "60")
+        config.set("SuiteCRM HTTP Connection", "async_max_concurrency", "100")
+        config.set("SuiteCRM HTTP Connection", "json_codec", "auto")
+        config.set("SuiteCRM HTTP Connection", "coalesce_calls", "True")
+        config.set("SuiteCRM HTTP Connection", "transport", "requests")
+        config.set("SuiteCRM HTTP Connection", "async_transport", "aiohttp")
+        config.add_section("SuiteCRM Cache")
+        config.set("SuiteCRM Cache", "max_cached_requests", "100")
+        config.set("SuiteCRM Cache", "cache_ttl", "0")
+        config.set("SuiteCRM Cache", "max_cached_bytes", "0")
+        config.set("SuiteCRM Cache", "max_cached_entry_bytes", "0")
+        config.set("SuiteCRM Cache", "cache_backend", "memory")
+        config.set("SuiteCRM Cache", "cache_path", "suitepy_cache.sqlite")
+        config.add_section("SuiteCRM Metadata Cache")
+        config.set("SuiteCRM Metadata Cache", "enabled", "False")
+        config.set("SuiteCRM Metadata Cache", "ttl", "86400")
+        config.set("SuiteCRM Metadata Cache", "path", "suitepy_metadata.sqlite")
+        config.add_section("SuiteCRM Governor")
+        config.set("SuiteCRM Governor", "enabled", "False")
+        config.set("SuiteCRM Governor", "read_rate", "0")
+        config.set("SuiteCRM Governor", "read_max_concurrency", "10")
+        config.set("SuiteCRM Governor", "write_rate", "0")
+        config.set("SuiteCRM Governor", "write_max_concurrency", "4")
+        config.set("SuiteCRM Governor", "min_concurrency", "1")
+        config.set("SuiteCRM Governor", "latency_tolerance", "2.0")
+        config.add_section("SuiteCRM Retry Policy")
+        config.set("SuiteCRM Retry Policy", "retries", "2")
+        config.set("SuiteCRM Retry Policy", "backoff", "0.1")
+        config.set("SuiteCRM Retry Policy", "max_backoff", "2.0")
+        config.set("SuiteCRM Retry Policy", "deadline", "0")
+        config.set("SuiteCRM Retry Policy", "hedge_percentile", "0")
+        config.set("SuiteCRM Retry Policy", "retry_writes", "False")
+        config.add_section("SuiteCRM Metrics")
+        config.set("SuiteCRM Metrics", "enabled", "False")
         config.write(config_file)
         config_file.close()
 
+    @property
+    def key(self):
+        """
+        Get the values that identify the SuiteCRM instance and account of the configuration.
+
+        :return: URL, username and application name.
+        :rtype: tuple[str, str, str]
+        """
+        return self._url, self._username, self._application_name
+
     @property
     def url(self):
         """
@@ -128,3 +312,346 @@ class Config:
         :rtype: bool
         """
         return self._verify_ssl
+
+    @property
+    def pool_connections(self):
+        """
+        Get number of per-host connection pools kept by the HTTP client.
+
+        :return: number of connection pools.
+        :rtype: int
+        """
+        return self._pool_connections
+
+    @property
+    def pool_maxsize(self):
+        """
+        Get maximum number of connections kept alive per host.
+
+        :return: maximum number of connections per host.
+        :rtype: int
+        """
+        return self._pool_maxsize
+
+    @property
+    def pool_block(self):
+        """
+        Specifies whether requests must wait for a free connection
+        when the pool of a host is exhausted.
+
+        :return: True if requests must wait for a free connection, False otherwise.
+        :rtype: bool
+        """
+        return self._pool_block
+
+    @property
+    def keep_alive(self):
+        """
+        Specifies whether connections to SuiteCRM are kept alive between calls.
+
+        :return: True if connections are reused, False otherwise.
+        :rtype: bool
+        """
+        return self._keep_alive
+
+    @property
+    def connect_timeout(self):
+        """
+        Get timeout in seconds to establish a connection with SuiteCRM.
+
+        :return: connect timeout in seconds.
+        :rtype: float
+        """
+        return self._connect_timeout
+
+    @property
+    def read_timeout(self):
+        """
+        Get timeout in seconds to wait for a SuiteCRM response.
+
+        :return: read timeout in seconds.
+        :rtype: float
+        """
+        return self._read_timeout
+
+    @property
+    def async_max_concurrency(self):
+        """
+        Get maximum number of calls that AsyncSuiteCRM keeps in flight at once.
+
+        :return: maximum number of concurrent asynchronous calls.
+        :rtype: int
+        """
+        return self._async_max_concurrency
+
+    @property
+    def json_codec(self):
+        """
+        Get the name of the JSON codec used to encode and decode API calls.
+
+        :return: 'json', 'orjson', 'ujson' or 'auto'.
+        :rtype: str
+        """
+        return self._json_codec
+
+    @property
+    def coalesce_calls(self):
+        """
+        Check if identical read calls made at the same time share one request.
+
+        :return: True if identical concurrent calls are coalesced.
+        :rtype: bool
+        """
+        return self._coalesce_calls
+
+    @property
+    def transport(self):
+        """
+        Get the transport used to send API calls.
+
+        :return: name of a registered transport or dotted path of a Transport class.
+        :rtype: str
+        """
+        return self._transport
+
+    @property
+    def async_transport(self):
+        """
+        Get the transport used to send API calls of asynchronous clients.
+
+        :return: name of a registered transport or dotted path of a Transport class.
+        :rtype: str
+        """
+        return self._async_transport
+
+    @property
+    def max_cached_requests(self):
+        """
+        Get maximum number of calls stored in the cache of SuiteCRMCached.
+
+        :return: maximum number of cached calls.
+        :rtype: int
+        """
+        return self._max_cached_requests
+
+    @property
+    def cache_ttl(self):
+        """
+        Get seconds a call stays valid in the cache of SuiteCRMCached.
+
+        :return: time to live of cached calls in seconds, 0 if they never expire.
+        :rtype: float
+        """
+        return self._cache_ttl
+
+    @property
+    def max_cached_bytes(self):
+        """
+        Get maximum estimated size of the calls stored in the cache of SuiteCRMCached.
+
+        :return: maximum size in bytes, 0 for no limit.
+        :rtype: int
+        """
+        return self._max_cached_bytes
+
+    @property
+    def max_cached_entry_bytes(self):
+        """
+        Get maximum estimated size of a call to be stored in the cache of SuiteCRMCached.
+
+        :return: maximum size in bytes, 0 for no limit.
+        :rtype: int
+        """
+        return self._max_cached_entry_bytes
+
+    @property
+    def cache_backend(self):
+        """
+        Get the kind of cache used by SuiteCRMCached.
+
+        :return: 'memory' for a process-local cache or 'sqlite' for a persistent one.
+        :rtype: str
+        """
+        return self._cache_backend
+
+    @property
+    def cache_path(self):
+        """
+        Get the path of the file of persistent caches.
+
+        :return: absolute path of the cache file.
+        :rtype: str
+        """
+        return self._cache_path
+
+    @property
+    def metadata_cache_enabled(self):
+        """
+        Specifies whether module metadata calls are stored on a persistent cache.
+
+        :return: True if module metadata is cached on a file,
+            False if it is only cached in memory.
+        :rtype: bool
+        """
+        return self._metadata_cache_enabled
+
+    @property
+    def metadata_cache_ttl(self):
+        """
+        Get seconds module metadata stays valid in the metadata cache.
+
+        :return: time to live of module metadata in seconds, 0 if it never expires.
+        :rtype: float
+        """
+        return self._metadata_cache_ttl
+
+    @property
+    def metadata_cache_path(self):
+        """
+        Get the path of the file of the metadata cache.
+
+        :return: absolute path of the metadata cache file.
+        :rtype: str
+        """
+        return self._metadata_cache_path
+
+    @property
+    def governor_enabled(self):
+        """
+        Specifies whether the rate and concurrency of calls are governed.
+
+        :return: True if calls are governed, False otherwise.
+        :rtype: bool
+        """
+        return self._governor_enabled
+
+    @property
+    def governor_read_rate(self):
+        """
+        Get the maximum number of read calls per second.
+
+        :return: read calls per second, 0 for no limit.
+        :rtype: float
+        """
+        return self._governor_read_rate
+
+    @property
+    def governor_read_max_concurrency(self):
+        """
+        Get the maximum number of read calls in flight.
+
+        :return: maximum number of concurrent read calls.
+        :rtype: int
+        """
+        return self._governor_read_max_concurrency
+
+    @property
+    def governor_write_rate(self):
+        """
+        Get the maximum number of calls per second that modify data.
+
+        :return: write calls per second, 0 for no limit.
+        :rtype: float
+        """
+        return self._governor_write_rate
+
+    @property
+    def governor_write_max_concurrency(self):
+        """
+        Get the maximum number of calls that modify data in flight.
+
+        :return: maximum number of concurrent write calls.
+        :rtype: int
+        """
+        return self._governor_write_max_concurrency
+
+    @property
+    def governor_min_concurrency(self):
+        """
+        Get the number of calls in flight the adaptive limit never goes below.
+
+        :return: minimum number of concurrent calls.
+        :rtype: int
+        """
+        return self._governor_min_concurrency
+
+    @property
+    def governor_latency_tolerance(self):
+        """
+        Get the latency, relative to the lowest latency observed, over
+        which fewer calls are allowed in flight.
+
+        :return: latency tolerance ratio.
+        :rtype: float
+        """
+        return self._governor_latency_tolerance
+
+    @property
+    def retries(self):
+        """
+        Get the maximum number of retries of a call that fails with a transient error.
+
+        :return: maximum number of retries.
+        :rtype: int
+        """
+        return self._retries
+
+    @property
+    def retry_backoff(self):
+        """
+        Get the seconds to wait before the first retry of a call.
+
+        :return: initial backoff in seconds.
+        :rtype: float
+        """
+        return self._retry_backoff
+
+    @property
+    def retry_max_backoff(self):
+        """
+        Get the maximum seconds to wait before a retry of a call.
+
+        :return: maximum backoff in seconds.
+        :rtype: float
+        """
+        return self._retry_max_backoff
+
+    @property
+    def call_deadline(self):
+        """
+        Get the seconds a call can take, including its retries.
+
+        :return: deadline of calls in seconds, 0 for no limit.
+        :rtype: float
+        """
+        return self._call_deadline
+
+    @property
+    def hedge_percentile(self):
+        """
+        Get the percentile of latency after which a duplicate request is sent.
+
+        :return: latency percentile, 0 to never send duplicate requests.
+        :rtype: float
+        """
+        return self._hedge_percentile
+
+    @property
+    def retry_writes(self):
+        """
+        Specifies whether calls that modify data are also retried and hedged.
+
+        :return: True if calls that modify data are retried, False otherwise.
+        :rtype: bool
+        """
+        return self._retry_writes
+
+    @property
+    def metrics_enabled(self):
+        """
+        Specifies whether clients collect metrics of their calls from the start.
+
+        :return: True if metrics are collected, False otherwise.
+        :rtype: bool
+        """
+        return self._metrics_enabled
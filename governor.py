@@ -0,0 +1,398 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import asyncio
+import threading
+import time
+from collections import deque
+import requests
+from .suite_exceptions import NumberOfSessionsExceededException, \
+    ResourceManagementErrorException
+
+
+class TokenBucket(object):
+    """
+    Limits the rate of calls to a number of calls per second, allowing
+    bursts of up to burst calls.
+
+    Calls reserve a token and wait until it is available, so the waiting
+    time can be spent sleeping in a thread or in an event loop.
+    """
+
+    def __init__(self, rate, burst=None):
+        """
+        :param float rate: calls per second, 0 for no limit.
+        :param int burst: maximum number of calls made at once,
+            by default the calls of one second.
+        """
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Reserve a token.
+
+        :return: seconds to wait until the reserved token is available.
+        :rtype: float
+        """
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """
+        Wait until a token is available.
+        """
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """
+        Wait until a token is available without blocking the event loop.
+        """
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class _Waiter(object):
+
+    __slots__ = ('granted', '_event', '_loop', '_future')
+
+    def __init__(self, loop=None):
+        self.granted = False
+        self._loop = loop
+        if loop is None:
+            self._event = threading.Event()
+        else:
+            self._future = loop.create_future()
+
+    def wake(self):
+        if self._loop is None:
+            self._event.set()
+        else:
+            self._loop.call_soon_threadsafe(self._set_result)
+
+    def _set_result(self):
+        if not self._future.done():
+            self._future.set_result(None)
+
+    def wait(self):
+        self._event.wait()
+
+    def wait_async(self):
+        return self._future
+
+
+class AdaptiveLimiter(object):
+    """
+    Limits the number of calls in flight, adapting the limit to the
+    latency and errors observed, in the way of TCP congestion control.
+
+    The limit grows by one every time a full limit of calls succeeds.
+    It is multiplied by backoff_ratio when a call overloads the server,
+    and decreased by a tenth when the latency goes over latency_tolerance
+    times the lowest latency observed for the same kind of call, so
+    cheap and expensive calls sharing a limiter are not compared with
+    each other. Only calls started after the last decrease can decrease
+    it again, so the calls in flight when the server slows down do not
+    collapse the limit. Calls whose outcome is unknown, like cancelled
+    ones, do not change it.
+
+    Threads and asyncio tasks wait in the same queue, in arrival order.
+    """
+
+    def __init__(self, max_limit, min_limit=1, initial_limit=None,
+                 latency_tolerance=2.0, backoff_ratio=0.5):
+        """
+        :param int max_limit: maximum number of calls in flight.
+        :param int min_limit: minimum number of calls in flight.
+        :param int initial_limit: number of calls in flight to start with,
+            by default min_limit.
+        :param float latency_tolerance: latency, relative to the lowest
+            latency observed, over which the limit is decreased.
+        :param float backoff_ratio: ratio applied to the limit on overload errors.
+        """
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+        self._limit = float(min(max_limit, initial_limit or self.min_limit))
+        self._in_flight = 0
+        self._waiters = deque()
+        self._base_latencies = {}
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self):
+        """
+        Get the current number of calls allowed in flight.
+
+        :rtype: int
+        """
+        return max(1, int(self._limit))
+
+    @property
+    def in_flight(self):
+        """
+        Get the number of calls in flight.
+
+        :rtype: int
+        """
+        return self._in_flight
+
+    def _try_acquire(self, loop=None):
+        with self._lock:
+            if not self._waiters and self._in_flight < self.limit:
+                self._in_flight += 1
+                return None
+            waiter = _Waiter(loop)
+            self._waiters.append(waiter)
+            return waiter
+
+    def acquire(self):
+        """
+        Wait until a call can be made.
+        """
+        waiter = self._try_acquire()
+        if waiter is not None:
+            waiter.wait()
+
+    async def acquire_async(self):
+        """
+        Wait until a call can be made without blocking the event loop.
+        """
+        waiter = self._try_acquire(asyncio.get_running_loop())
+        if waiter is None:
+            return
+        try:
+            await waiter.wait_async()
+        except asyncio.CancelledError:
+            with self._lock:
+                if not waiter.granted:
+                    self._waiters.remove(waiter)
+                    raise
+            self.release()
+            raise
+
+    def release(self, latency=None, overloaded=False, key=None):
+        """
+        Finish a call and adapt the limit to its outcome.
+
+        :param float latency: seconds the call took, None if unknown.
+            Without latency, the limit is only changed if overloaded.
+        :param bool overloaded: True if the call failed because the server
+            was overloaded.
+        :param key: kind of call, like the API method, whose lowest
+            latency the latency is compared with.
+        """
+        with self._lock:
+            self._in_flight -= 1
+            now = time.monotonic()
+            base_latency = self._base_latencies.get(key)
+            if latency is not None and not overloaded:
+                if base_latency is None or latency < base_latency:
+                    base_latency = latency
+                else:
+                    # Let the baseline follow slow changes of the server.
+                    base_latency += (latency - base_latency) * 0.01
+                self._base_latencies[key] = base_latency
+            if latency is not None:
+                can_decrease = now - latency >= self._last_decrease
+            else:
+                can_decrease = now - self._last_decrease >= (base_latency or 0.0)
+            if overloaded:
+                if can_decrease:
+                    self._decrease(self.backoff_ratio, now)
+            elif latency is not None:
+                if latency > base_latency * self.latency_tolerance:
+                    if can_decrease:
+                        self._decrease(0.9, now)
+                elif self._limit < self.max_limit:
+                    self._limit = min(
+                        self.max_limit, self._limit + 1.0 / self.limit)
+            while self._waiters and self._in_flight < self.limit:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                self._in_flight += 1
+                waiter.wake()
+
+    def _decrease(self, ratio, now):
+        self._limit = max(self.min_limit, self._limit * ratio)
+        self._last_decrease = now
+
+
+def is_overload_error(exception):
+    """
+    Check if an exception shows that the server is overloaded: timeouts,
+    connection errors, HTTP 429 and 5xx statuses, and the SuiteCRM errors
+    about too many sessions or exhausted resources.
+
+    :param Exception exception: exception raised by a call.
+    :rtype: bool
+    """
+    if isinstance(exception, (NumberOfSessionsExceededException,
+                              ResourceManagementErrorException,
+                              requests.Timeout, requests.ConnectionError,
+                              asyncio.TimeoutError)):
+        return True
+    status = getattr(exception, 'status', None)
+    if status is None:
+        response = getattr(exception, 'response', None)
+        status = getattr(response, 'status_code', None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+class Governor(object):
+    """
+    Governs the calls of a kind made to a SuiteCRM instance, limiting
+    their rate with a TokenBucket and the calls in flight with an
+    AdaptiveLimiter.
+    """
+
+    def __init__(self, rate=0, max_concurrency=10, min_concurrency=1,
+                 latency_tolerance=2.0):
+        """
+        :param float rate: calls per second, 0 for no limit.
+        :param int max_concurrency: maximum number of calls in flight.
+        :param int min_concurrency: minimum number of calls in flight.
+        :param float latency_tolerance: latency, relative to the lowest
+            latency observed, over which fewer calls are allowed in flight.
+        """
+        self.bucket = TokenBucket(rate)
+        self.limiter = AdaptiveLimiter(
+            max_concurrency, min_concurrency,
+            latency_tolerance=latency_tolerance)
+
+    def acquire(self):
+        """
+        Wait until the limits allow a call, for calls that do not fit in
+        a function call, like streamed responses. Every acquire must be
+        followed by a release.
+
+        :return: start time of the call, to pass to release.
+        :rtype: float
+        """
+        self.bucket.acquire()
+        self.limiter.acquire()
+        return time.monotonic()
+
+    def release(self, start, exception=None, key=None):
+        """
+        Finish a call started with acquire.
+
+        :param float start: value returned by acquire.
+        :param BaseException exception: exception raised by the call, if it failed.
+        :param key: kind of call, like the API method, see AdaptiveLimiter.release.
+        """
+        if exception is None:
+            self.limiter.release(time.monotonic() - start, key=key)
+        elif not isinstance(exception, Exception):
+            self.limiter.release()
+        elif is_overload_error(exception):
+            self.limiter.release(time.monotonic() - start, True, key)
+        else:
+            self.limiter.release(time.monotonic() - start, key=key)
+
+    def call(self, function, *args, key=None, **kwargs):
+        """
+        Call a function when the limits allow it.
+
+        :param function: function that makes the call.
+        :param key: kind of call, like the API method, see AdaptiveLimiter.release.
+        :return: the result of the function.
+        """
+        start = self.acquire()
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as e:
+            self.release(start, e, key)
+            raise
+        self.release(start, key=key)
+        return result
+
+    async def call_async(self, function, *args, key=None, **kwargs):
+        """
+        Await a coroutine function when the limits allow it.
+
+        :param function: coroutine function that makes the call.
+        :param key: kind of call, like the API method, see AdaptiveLimiter.release.
+        :return: the result of the function.
+        """
+        await self.bucket.acquire_async()
+        await self.limiter.acquire_async()
+        start = time.monotonic()
+        try:
+            result = await function(*args, **kwargs)
+        except BaseException as e:
+            self.release(start, e, key)
+            raise
+        self.release(start, key=key)
+        return result
+
+
+_governors = {}
+_governors_lock = threading.Lock()
+
+
+def get_governor(conf, method_class):
+    """
+    Get the governor of a kind of calls to a SuiteCRM instance.
+
+    Clients of the same SuiteCRM URL share their governors, regardless of
+    the user, and of being synchronous or asynchronous.
+
+    :param Config conf: configuration of the SuiteCRM instance.
+    :param str method_class: 'read' or 'write'.
+    :return: the governor, None if governing is disabled.
+    :rtype: Governor
+    """
+    if not conf.governor_enabled:
+        return None
+    key = (conf.url, method_class)
+    governor = _governors.get(key)
+    if governor is None:
+        with _governors_lock:
+            governor = _governors.get(key)
+            if governor is None:
+                if method_class == 'write':
+                    rate = conf.governor_write_rate
+                    max_concurrency = conf.governor_write_max_concurrency
+                else:
+                    rate = conf.governor_read_rate
+                    max_concurrency = conf.governor_read_max_concurrency
+                governor = Governor(
+                    rate, max_concurrency, conf.governor_min_concurrency,
+                    conf.governor_latency_tolerance)
+                _governors[key] = governor
+    return governor
@@ -0,0 +1,232 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, float('inf'))
+
+
+class _MethodStats(object):
+
+    __slots__ = ('count', 'errors', 'latency_total', 'latency_max',
+                 'latency_buckets', 'request_bytes', 'response_bytes',
+                 'decode_time', 'bean_time', 'relogins', 'exceptions',
+                 'cache_hits', 'cache_misses')
+
+    def __init__(self, buckets):
+        self.count = 0
+        self.errors = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.latency_buckets = [0] * len(buckets)
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.decode_time = 0.0
+        self.bean_time = 0.0
+        self.relogins = 0
+        self.exceptions = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+class Metrics(object):
+    """
+    Collects statistics of the calls made to SuiteCRM, per API method.
+
+    The statistics can be read with snapshot(), and every value recorded
+    is also passed to the hooks added with add_hook, to send them to a
+    metrics system. A hook is called with the method, the name of the
+    metric and its value, the metrics are:
+
+    * 'latency': seconds a call took, including retries and re-logins.
+    * 'exception': name of the class of the exception raised by a call.
+    * 'request_bytes' and 'response_bytes': size of the JSON sent and received.
+    * 'decode_time': seconds spent decoding the JSON of a response.
+    * 'bean_time': seconds spent building the Bean objects of a response.
+    * 'relogin': 1 when a call had to login again.
+    * 'cache_hit' and 'cache_miss': 1 when a cached client looks up a call.
+
+    Exceptions raised by hooks are ignored, so they can not break calls.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        """
+        :param tuple[float] buckets: upper bounds, in seconds, of the buckets
+            of the latency histograms, the last one must be infinite.
+        """
+        self.buckets = tuple(buckets)
+        self._stats = {}
+        self._hooks = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook):
+        """
+        Add a function that is called with every value recorded.
+
+        :param hook: function called with the method, the metric and its value.
+        """
+        with self._lock:
+            self._hooks = self._hooks + [hook]
+
+    def remove_hook(self, hook):
+        """
+        Remove a function added with add_hook.
+
+        :param hook: function to remove.
+        """
+        with self._lock:
+            self._hooks = [h for h in self._hooks if h is not hook]
+
+    def _emit(self, method, metric, value):
+        for hook in self._hooks:
+            try:
+                hook(method, metric, value)
+            except Exception:
+                pass
+
+    def _get_stats(self, method):
+        stats = self._stats.get(method)
+        if stats is None:
+            stats = self._stats.setdefault(method, _MethodStats(self.buckets))
+        return stats
+
+    def record_call(self, method, latency, exception=None):
+        """
+        Record a call made to SuiteCRM.
+
+        :param str method: name of the API method.
+        :param float latency: seconds the call took.
+        :param Exception exception: exception raised by the call, if it failed.
+        """
+        with self._lock:
+            stats = self._get_stats(method)
+            stats.count += 1
+            stats.latency_total += latency
+            if latency > stats.latency_max:
+                stats.latency_max = latency
+            stats.latency_buckets[bisect_left(self.buckets, latency)] += 1
+            if exception is not None:
+                name = type(exception).__name__
+                stats.errors += 1
+                stats.exceptions[name] = stats.exceptions.get(name, 0) + 1
+        if self._hooks:
+            self._emit(method, 'latency', latency)
+            if exception is not None:
+                self._emit(method, 'exception', type(exception).__name__)
+
+    def record_transfer(self, method, request_bytes, response_bytes, decode_time):
+        """
+        Record the data sent and received by a request.
+
+        :param str method: name of the API method.
+        :param int request_bytes: size of the JSON sent.
+        :param int response_bytes: size of the JSON received.
+        :param float decode_time: seconds spent decoding the response.
+        """
+        with self._lock:
+            stats = self._get_stats(method)
+            stats.request_bytes += request_bytes
+            stats.response_bytes += response_bytes
+            stats.decode_time += decode_time
+        if self._hooks:
+            self._emit(method, 'request_bytes', request_bytes)
+            self._emit(method, 'response_bytes', response_bytes)
+            self._emit(method, 'decode_time', decode_time)
+
+    def record_beans(self, method, bean_time):
+        """
+        Record the time spent building the Bean objects of a response.
+
+        :param str method: name of the API method.
+        :param float bean_time: seconds spent building the beans.
+        """
+        with self._lock:
+            self._get_stats(method).bean_time += bean_time
+        if self._hooks:
+            self._emit(method, 'bean_time', bean_time)
+
+    def record_relogin(self, method):
+        """
+        Record a login made because the session of a call had expired.
+
+        :param str method: name of the API method.
+        """
+        with self._lock:
+            self._get_stats(method).relogins += 1
+        if self._hooks:
+            self._emit(method, 'relogin', 1)
+
+    def record_cache(self, method, hit):
+        """
+        Record a lookup of a call in the cache.
+
+        :param str method: name of the API method.
+        :param bool hit: True if the call was in the cache.
+        """
+        with self._lock:
+            stats = self._get_stats(method)
+            if hit:
+                stats.cache_hits += 1
+            else:
+                stats.cache_misses += 1
+        if self._hooks:
+            self._emit(method, 'cache_hit' if hit else 'cache_miss', 1)
+
+    def snapshot(self):
+        """
+        Get the statistics recorded so far.
+
+        :return: dict with the statistics of every method: 'count', 'errors',
+            'latency_total', 'latency_max', 'latency_histogram' (number of
+            calls per bucket upper bound), 'request_bytes', 'response_bytes',
+            'decode_time', 'bean_time', 'relogins', 'exceptions' (number of
+            exceptions per class name), 'cache_hits' and 'cache_misses'.
+        :rtype: dict[str, dict]
+        """
+        snapshot = {}
+        with self._lock:
+            for method, stats in self._stats.items():
+                snapshot[method] = {
+                    'count': stats.count,
+                    'errors': stats.errors,
+                    'latency_total': stats.latency_total,
+                    'latency_max': stats.latency_max,
+                    'latency_histogram': OrderedDict(
+                        zip(self.buckets, stats.latency_buckets)),
+                    'request_bytes': stats.request_bytes,
+                    'response_bytes': stats.response_bytes,
+                    'decode_time': stats.decode_time,
+                    'bean_time': stats.bean_time,
+                    'relogins': stats.relogins,
+                    'exceptions': dict(stats.exceptions),
+                    'cache_hits': stats.cache_hits,
+                    'cache_misses': stats.cache_misses,
+                }
+        return snapshot
+
+    def reset(self):
+        """
+        Discard the statistics recorded so far.
+        """
+        with self._lock:
+            self._stats = {}
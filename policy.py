@@ -0,0 +1,337 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import requests
+from .governor import is_overload_error
+
+
+class RetryPolicy(object):
+    """
+    Decides how API calls are retried, how long they can take and when
+    they are hedged.
+
+    Calls that fail with a transient error (timeouts, connection errors,
+    HTTP 429 and 5xx statuses and SuiteCRM resource errors) are retried
+    with exponential backoff and full jitter. Only calls that do not
+    modify data are retried, unless retry_writes is set.
+
+    A call can have a deadline: the read timeout of every attempt is
+    bounded by the time left, and no attempt is started once it is over.
+
+    If hedge_percentile is set, when an attempt takes longer than that
+    percentile of the latencies of its method, a duplicate request is sent
+    and the first response is used. Hedged attempts run in a pool of at
+    most max_hedge_workers threads; when it is full, calls are made on the
+    calling thread without hedging, so they never wait for a thread.
+    """
+
+    def __init__(self, retries=2, backoff=0.1, max_backoff=2.0, deadline=0,
+                 hedge_percentile=0, hedge_min_samples=20, retry_writes=False,
+                 write_methods=frozenset(), max_hedge_workers=64):
+        """
+        :param int retries: maximum number of retries of a call.
+        :param float backoff: seconds to wait before the first retry.
+        :param float max_backoff: maximum seconds to wait before a retry.
+        :param float deadline: seconds a call can take, 0 for no limit.
+        :param float hedge_percentile: percentile of latency after which a
+            duplicate request is sent, 0 to never hedge.
+        :param int hedge_min_samples: latencies of a method observed before
+            its calls are hedged.
+        :param bool retry_writes: if True, calls that modify data are also
+            retried and hedged.
+        :param frozenset[str] write_methods: methods that modify data.
+        :param int max_hedge_workers: maximum number of threads running
+            hedged attempts.
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.retry_writes = retry_writes
+        self.write_methods = write_methods
+        self.max_hedge_workers = max_hedge_workers
+        self._latencies = {}
+        self._hedge_delays = {}
+        self._executor = None
+        self._busy_workers = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, conf, write_methods=frozenset()):
+        """
+        Create the policy set in a configuration.
+
+        :param Config conf: configuration of the SuiteCRM instance.
+        :param frozenset[str] write_methods: methods that modify data.
+        :rtype: RetryPolicy
+        """
+        return cls(
+            conf.retries, conf.retry_backoff, conf.retry_max_backoff,
+            conf.call_deadline, conf.hedge_percentile,
+            retry_writes=conf.retry_writes, write_methods=write_methods
+        )
+
+    def is_retryable(self, method):
+        """
+        Check if calls to a method can be retried and hedged.
+
+        :param str method: name of the API method.
+        :rtype: bool
+        """
+        return self.retry_writes or method not in self.write_methods
+
+    @staticmethod
+    def is_transient(exception):
+        """
+        Check if a failed call may succeed if it is retried.
+
+        :param Exception exception: exception raised by the call.
+        :rtype: bool
+        """
+        return is_overload_error(exception)
+
+    def get_backoff(self, attempt):
+        """
+        Get the seconds to wait before a retry.
+
+        :param int attempt: number of the retry, starting at 0.
+        :rtype: float
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def get_deadline(self, timeout=None):
+        """
+        Get the time at which a call must be finished.
+
+        :param float timeout: seconds the call can take, by default the
+            deadline of the policy.
+        :return: time.monotonic() value of the deadline, None if there is no limit.
+        :rtype: float
+        """
+        if timeout is None:
+            timeout = self.deadline
+        return time.monotonic() + timeout if timeout else None
+
+    @staticmethod
+    def get_remaining(deadline):
+        """
+        Get the seconds left until a deadline.
+
+        :param float deadline: deadline returned by get_deadline.
+        :return: seconds left, None if there is no limit.
+        :rtype: float
+        """
+        return deadline - time.monotonic() if deadline is not None else None
+
+    def get_hedge_delay(self, method):
+        """
+        Get the seconds after which a duplicate request of a call is sent.
+
+        :param str method: name of the API method.
+        :return: seconds to wait, None if the call must not be hedged.
+        :rtype: float
+        """
+        if not self.hedge_percentile:
+            return None
+        return self._hedge_delays.get(method)
+
+    def record_latency(self, method, latency):
+        """
+        Record the latency of a successful attempt.
+
+        :param str method: name of the API method.
+        :param float latency: seconds the attempt took.
+        """
+        if not self.hedge_percentile:
+            return
+        latencies = self._latencies.get(method)
+        if latencies is None:
+            latencies = self._latencies.setdefault(method, deque(maxlen=200))
+        latencies.append(latency)
+        if len(latencies) >= self.hedge_min_samples and len(latencies) % 10 == 0:
+            ordered = sorted(latencies)
+            index = int(len(ordered) * self.hedge_percentile / 100.0)
+            self._hedge_delays[method] = ordered[min(index, len(ordered) - 1)]
+
+    def call(self, method, send, parameters, timeout=None, hedge=True):
+        """
+        Make a call applying the policy.
+
+        :param str method: name of the API method.
+        :param send: function that makes an attempt, called with the method,
+            the parameters and the seconds the attempt can take.
+        :param dict parameters: parameters of the call.
+        :param float timeout: seconds the call can take, by default the
+            deadline of the policy.
+        :param bool hedge: if False, duplicate requests are never sent, for
+            responses that must be closed, like streams.
+        :return: the response of the call.
+        :raises requests.Timeout: if the deadline is over.
+        """
+        deadline = self.get_deadline(timeout)
+        if not self.is_retryable(method):
+            return send(method, parameters, self._get_attempt_timeout(deadline))
+        attempt = 0
+        while True:
+            try:
+                if not hedge:
+                    return send(
+                        method, parameters, self._get_attempt_timeout(deadline))
+                return self._hedge(method, send, parameters, deadline)
+            except Exception as e:
+                if attempt >= self.retries or not self.is_transient(e):
+                    raise
+                delay = self.get_backoff(attempt)
+                remaining = self.get_remaining(deadline)
+                if remaining is not None and remaining <= delay:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+
+    def _get_attempt_timeout(self, deadline):
+        remaining = self.get_remaining(deadline)
+        if remaining is not None and remaining <= 0:
+            raise requests.Timeout('Deadline of the call exceeded')
+        return remaining
+
+    def _attempt(self, method, send, parameters, deadline):
+        start = time.monotonic()
+        response = send(method, parameters, self._get_attempt_timeout(deadline))
+        self.record_latency(method, time.monotonic() - start)
+        return response
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        self.max_hedge_workers, thread_name_prefix='suitepy-hedge')
+        return self._executor
+
+    def _reserve_workers(self):
+        # A hedged call takes up to two threads of the pool.
+        with self._lock:
+            if self._busy_workers + 2 > self.max_hedge_workers:
+                return False
+            self._busy_workers += 2
+            return True
+
+    def _release_worker(self, future=None):
+        with self._lock:
+            self._busy_workers -= 1
+
+    def _submit(self, method, send, parameters, deadline):
+        future = self._get_executor().submit(
+            self._attempt, method, send, parameters, deadline)
+        future.add_done_callback(self._release_worker)
+        return future
+
+    def _hedge(self, method, send, parameters, deadline):
+        delay = self.get_hedge_delay(method)
+        if delay is None or not self._reserve_workers():
+            return self._attempt(method, send, parameters, deadline)
+        pending = {self._submit(method, send, parameters, deadline)}
+        done, pending = wait(pending, delay)
+        if done:
+            self._release_worker()
+        else:
+            pending.add(self._submit(method, send, parameters, deadline))
+        error = None
+        while True:
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+            if not pending:
+                raise error
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+    async def call_async(self, method, send, parameters, timeout=None):
+        """
+        Make a call applying the policy without blocking the event loop.
+
+        :param str method: name of the API method.
+        :param send: coroutine function that makes an attempt, called with
+            the method, the parameters and the seconds the attempt can take.
+        :param dict parameters: parameters of the call.
+        :param float timeout: seconds the call can take, by default the
+            deadline of the policy.
+        :return: the response of the call.
+        :raises asyncio.TimeoutError: if the deadline is over.
+        """
+        deadline = self.get_deadline(timeout)
+        if not self.is_retryable(method):
+            return await self._attempt_async(method, send, parameters, deadline)
+        attempt = 0
+        while True:
+            try:
+                return await self._hedge_async(method, send, parameters, deadline)
+            except Exception as e:
+                if attempt >= self.retries or not self.is_transient(e):
+                    raise
+                delay = self.get_backoff(attempt)
+                remaining = self.get_remaining(deadline)
+                if remaining is not None and remaining <= delay:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _attempt_async(self, method, send, parameters, deadline):
+        remaining = self.get_remaining(deadline)
+        if remaining is not None and remaining <= 0:
+            raise asyncio.TimeoutError('Deadline of the call exceeded')
+        start = time.monotonic()
+        response = await asyncio.wait_for(
+            send(method, parameters, remaining), remaining)
+        self.record_latency(method, time.monotonic() - start)
+        return response
+
+    async def _hedge_async(self, method, send, parameters, deadline):
+        delay = self.get_hedge_delay(method)
+        if delay is None:
+            return await self._attempt_async(method, send, parameters, deadline)
+        pending = {asyncio.ensure_future(
+            self._attempt_async(method, send, parameters, deadline))}
+        done, pending = await asyncio.wait(pending, timeout=delay)
+        if not done:
+            pending.add(asyncio.ensure_future(
+                self._attempt_async(method, send, parameters, deadline)))
+        error = None
+        try:
+            while True:
+                for future in done:
+                    if future.exception() is None:
+                        return future.result()
+                    error = future.exception()
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for future in pending:
+                future.cancel()
@@ -19,11 +19,24 @@
 #######################################################################
 
 
+import threading
+
+
 class Singleton(object):
 
     _instance = None
+    _instance_lock = threading.Lock()
 
     def __new__(cls, *args, **kwargs):
-        if not cls._instance:
-            cls._instance = object.__new__(cls, *args, **kwargs)
-        return cls._instance
+        instance = cls.__dict__.get('_instance')
+        if not instance:
+            with Singleton._instance_lock:
+                instance = cls.__dict__.get('_instance')
+                if not instance:
+                    instance = cls._create_instance()
+                    cls._instance = instance
+        return instance
+
+    @classmethod
+    def _create_instance(cls):
+        return object.__new__(cls)
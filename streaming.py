@@ -0,0 +1,59 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import ijson
+from ijson.common import ObjectBuilder
+from .suite_exceptions import SuiteException
+
+_SCALAR_EVENTS = frozenset(['null', 'boolean', 'integer', 'double', 'number', 'string'])
+
+
+def iter_entry_list(stream, summary=None):
+    """
+    Parse incrementally a get_entry_list response read from a file-like
+    object, yielding every element of its entry_list as soon as it is complete.
+
+    Only one entry is kept in memory at once.
+
+    :param stream: file-like object with the JSON response.
+    :param dict summary: if specified, it is filled with the top-level
+        scalar values of the response, like result_count or total_count.
+    :return: generator of the entries of the response.
+    :rtype: collections.Iterator[dict]
+    :raises SuiteException: if the response is a SuiteCRM error.
+    """
+    if summary is None:
+        summary = {}
+    builder = None
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if builder is not None:
+            if prefix == 'entry_list.item' and event == 'end_map':
+                yield builder.value
+                builder = None
+            else:
+                builder.event(event, value)
+        elif prefix == 'entry_list.item' and event == 'start_map':
+            builder = ObjectBuilder()
+            builder.event(event, value)
+        elif '.' not in prefix and prefix and event in _SCALAR_EVENTS:
+            summary[prefix] = value
+    if not summary or (len(summary) == 3 and 'name' in summary and
+                       'description' in summary and 'number' in summary):
+        raise SuiteException.get_suite_exception(summary)
@@ -20,52 +20,282 @@
 
 import requests
 import hashlib
-import json
-from collections import OrderedDict
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from .suite_exceptions import *
-from .bean import Bean
+from .bean import Bean, CompactBean, LazyBean
 from .bean_exceptions import *
+from .cache import LRUCache, SQLiteCache, make_cache_key
+from .coalesce import SingleFlight
+from .codec import get_codec
+from .columnar import convert_columns, entries_to_columns, extend_columns, \
+    get_field_types
 from .config import Config
+from .governor import get_governor
+from .metrics import Metrics
+from .policy import RetryPolicy
 from .singleton import Singleton
+from .transport import get_transport
+
+
+class _DefaultConfig(object):
+    """
+    Loads the default configuration file the first time it is used.
+    """
+
+    def __init__(self):
+        self._conf = None
+        self._lock = threading.Lock()
+
+    def __get__(self, instance, owner):
+        if self._conf is None:
+            with self._lock:
+                if self._conf is None:
+                    self._conf = Config()
+        return self._conf
+
+
+class _ResponseStream(object):
+    """
+    Streamed response that counts the bytes read and holds the governor
+    slot of its call until it is closed.
+    """
+
+    def __init__(self, stream, governor=None, start=None, key=None):
+        self._stream = stream
+        self._governor = governor
+        self._start = start
+        self._key = key
+        self._error = None
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        try:
+            data = self._stream.read(size)
+        except Exception as e:
+            self._error = e
+            raise
+        self.bytes_read += len(data)
+        return data
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            governor = self._governor
+            if governor is not None:
+                self._governor = None
+                governor.release(self._start, self._error, self._key)
 
 
 class SuiteCRM(Singleton):
     """
     This class contains methods to interact with a SuiteCRM instance.
+
+    By default, SuiteCRM() returns a single instance per process that uses
+    the configuration of the suitepy.ini file. Independent instances, each
+    with its own session, connection pool and cache, are created by passing
+    a Config, and SuiteCRM.for_config reuses them per configuration.
+
+    An instance can be shared by several threads. When the session expires,
+    a single thread logs in again while the others wait for the new session.
+    Identical read calls made at the same time by several threads share
+    a single request, unless the coalesce_calls setting is disabled.
+    A read never shares the request of a read started before the last
+    write of the instance finished, so it always sees that write.
     """
 
-    conf = Config()
+    conf = _DefaultConfig()
     _session_id = None
+    _transport = None
+    _codec = None
+    _policy = None
+    _metrics = None
+    _write_generation = 0
+    _metadata_cache = None
+    _max_cached_metadata_calls = 10000
+    _clients = {}
+    _client_locks = {}
+    _clients_lock = threading.Lock()
+    _write_methods = frozenset([
+        'login', 'logout', 'set_entry', 'set_entries', 'set_relationship',
+        'set_relationships', 'set_note_attachment', 'set_document_revision',
+        'set_campaign_merge',
+    ])
 
-    def __init__(self):
+    def __new__(cls, *args, **kwargs):
+        if cls._get_conf_argument(args, kwargs) is None:
+            return super(SuiteCRM, cls).__new__(cls)
+        return cls._create_instance()
+
+    def __init__(self, conf=None):
+        """
+        Creates a client and logs in to SuiteCRM.
+
+        :param Config conf: configuration of the SuiteCRM instance. If not
+            specified, the default configuration is used and the single
+            default instance is returned.
+        """
+        if conf is not None:
+            self.conf = conf
+        if self._metrics is None and self.conf.metrics_enabled:
+            self._metrics = Metrics()
+        self._get_transport()
         if not self._session_id:
-            self._login()
-
-    def _call(self, method, parameters):
-        data = {
-            'method': method,
-            'input_type': 'JSON',
-            'response_type': 'JSON',
-            'rest_data': json.dumps(parameters),
-        }
-        r = requests.post(
-            self.conf.url,
-            data=data,
-            verify=self.conf.verify_ssl
-        )
-        r.raise_for_status()
-        response = json.loads(r.text, object_pairs_hook=OrderedDict)
+            self._renew_session(None)
+
+    @classmethod
+    def _create_instance(cls):
+        instance = object.__new__(cls)
+        instance._lock = threading.RLock()
+        instance._login_lock = threading.Lock()
+        instance._single_flight = SingleFlight()
+        return instance
+
+    @staticmethod
+    def _get_conf_argument(args, kwargs):
+        conf = kwargs.get('conf')
+        if conf is None:
+            for arg in args:
+                if isinstance(arg, Config):
+                    return arg
+        return conf
+
+    @classmethod
+    def for_config(cls, conf):
+        """
+        Get the client of a configuration, creating it the first time.
+
+        Configurations with the same URL, username and application name
+        share the same client.
+
+        :param Config conf: configuration of the SuiteCRM instance.
+        :return: the client of the configuration.
+        :rtype: SuiteCRM
+        """
+        key = (cls, conf.key)
+        client = cls._clients.get(key)
+        if client is None:
+            # The client logs in when it is created, so only the callers
+            # of the same configuration wait for it.
+            with cls._clients_lock:
+                lock = cls._client_locks.setdefault(key, threading.Lock())
+            with lock:
+                client = cls._clients.get(key)
+                if client is None:
+                    client = cls(conf=conf)
+                    cls._clients[key] = client
+        return client
+
+    def _get_transport(self):
+        if self._transport is not None:
+            return self._transport
+        with self._lock:
+            if self._transport is None:
+                self._transport = get_transport(self.conf)
+        return self._transport
+
+    def _get_codec(self):
+        if self._codec is None:
+            self._codec = get_codec(self.conf.json_codec)
+        return self._codec
+
+    def _get_policy(self):
+        if self._policy is None:
+            self._policy = RetryPolicy.from_config(self.conf, self._write_methods)
+        return self._policy
+
+    def _call(self, method, parameters, timeout=None):
+        if method in self._write_methods:
+            try:
+                return self._send(method, parameters, timeout)
+            finally:
+                with self._lock:
+                    self._write_generation += 1
+        if self.conf.coalesce_calls:
+            key = self._get_coalescing_key(
+                method, parameters, self._write_generation)
+            if key is not None:
+                return self._single_flight.do(
+                    key, self._send, method, parameters, timeout)
+        return self._send(method, parameters, timeout)
+
+    def _get_governor(self, method):
+        method_class = 'write' if method in self._write_methods else 'read'
+        return get_governor(self.conf, method_class)
+
+    @staticmethod
+    def _get_coalescing_key(method, parameters, write_generation=0):
+        # The session is part of the key: a call made with a renewed
+        # session must not join one that will fail with the expired one.
+        # So is the number of writes finished: a read made after a write
+        # must not join one that may have been answered before it.
+        try:
+            key = (write_generation, parameters.get('session'),
+                   make_cache_key(method, parameters))
+            hash(key)
+            return key
+        except Exception:
+            return None
+
+    def _send(self, method, parameters, timeout=None):
+        return self._get_policy().call(
+            method, self._send_attempt, parameters, timeout)
+
+    def _send_attempt(self, method, parameters, timeout=None):
+        governor = self._get_governor(method)
+        if governor is None:
+            return self._send_request(method, parameters, timeout)
+        return governor.call(
+            self._send_request, method, parameters, timeout, key=method)
+
+    def _send_request(self, method, parameters, timeout=None):
+        codec = self._get_codec()
+        payload = codec.dumps(parameters)
+        content = self._get_transport().post(method, payload, timeout)
+        metrics = self._metrics
+        if metrics is None:
+            response = codec.loads(content)
+        else:
+            start = time.perf_counter()
+            response = codec.loads(content)
+            metrics.record_transfer(method, len(payload), len(content),
+                                    time.perf_counter() - start)
         if self._call_failed(response):
             raise SuiteException.get_suite_exception(response)
         return response
 
-    def _request(self, method, parameters):
+    def _request(self, method, parameters, timeout=None):
+        metrics = self._metrics
+        if metrics is None:
+            return self._request_with_session(method, parameters, timeout)
+        start = time.perf_counter()
         try:
-            return self._call(method, parameters)
+            response = self._request_with_session(method, parameters, timeout)
+        except Exception as e:
+            metrics.record_call(method, time.perf_counter() - start, e)
+            raise
+        metrics.record_call(method, time.perf_counter() - start)
+        return response
+
+    def _request_with_session(self, method, parameters, timeout=None):
+        try:
+            return self._call(method, parameters, timeout)
         except InvalidSessionIDException:
-            self._login()
+            if self._metrics is not None:
+                self._metrics.record_relogin(method)
+            self._renew_session(parameters.get('session'))
+            parameters = OrderedDict(parameters)
             parameters['session'] = self._session_id
-            return self._call(method, parameters)
+            return self._call(method, parameters, timeout)
+
+    def _renew_session(self, expired_session_id):
+        with self._login_lock:
+            if self._session_id == expired_session_id:
+                self._login()
 
     @staticmethod
     def _call_failed(result):
@@ -73,28 +303,241 @@ class SuiteCRM(Singleton):
                               and 'description' in result and 'number' in result)
 
     def _login(self):
+        login_result = self._call(
+            'login', self._get_login_parameters(self.conf))
+        self._session_id = login_result['id']
+
+    @classmethod
+    def _get_login_parameters(cls, conf):
         login_parameters = OrderedDict()
         login_parameters['user_auth'] = {
-            'user_name': self.conf.username,
-            'password': self._md5(self.conf.password)
+            'user_name': conf.username,
+            'password': cls._md5(conf.password)
         }
-        login_parameters['application_name'] = self.conf.application_name
-        login_result = self._call('login', login_parameters)
-        self._session_id = login_result['id']
+        login_parameters['application_name'] = conf.application_name
+        return login_parameters
 
     @staticmethod
     def _md5(text):
         return hashlib.md5(text.encode('utf8')).hexdigest()
 
+    @classmethod
+    def _get_bean_failed(cls, result):
+        try:
+            return cls._entry_failed(result['entry_list'][0])
+        except Exception:
+            return False
+
     @staticmethod
-    def _get_bean_failed(result):
+    def _entry_failed(entry):
         try:
-            return result['entry_list'][0]['name_value_list'][0]['name'] == 'warning'
+            return entry['name_value_list'][0]['name'] == 'warning'
         except Exception:
             return False
 
+    @classmethod
+    def _get_bean_from_result(cls, module_name, result):
+        if cls._get_bean_failed(result):
+            error_msg = result['entry_list'][0]['name_value_list'][0]['value']
+            raise BeanNotFoundException(error_msg)
+        return Bean(
+            module_name,
+            result['entry_list'][0]['name_value_list'],
+            result['relationship_list'][0] if len(
+                result['relationship_list']) > 0 else []
+        )
+
+    @staticmethod
+    def _update_bean_from_result(bean, result):
+        entry_list = dict(result['entry_list'])
+        entry_list.pop('new_with_id', None)
+        bean._set_name_value_list(entry_list)
+        bean['id'] = result['id']
+
+    @staticmethod
+    def _get_bean_list_from_result(module_name, result, offset, max_results,
+                                   compact=False, lazy=False):
+        if compact and lazy:
+            raise ValueError('A bean list cannot be compact and lazy at once')
+        bean_list = []
+        if lazy:
+            for entry in result['entry_list']:
+                bean_list.append(LazyBean(module_name, entry['name_value_list']))
+        elif compact:
+            schema = None
+            for entry in result['entry_list']:
+                bean = CompactBean(
+                    module_name, entry['name_value_list'], schema=schema)
+                schema = bean.schema
+                bean_list.append(bean)
+        else:
+            for entry in result['entry_list']:
+                bean_list.append(Bean(module_name, entry['name_value_list']))
+        page = SuiteCRM._get_page_from_result(result, offset, max_results)
+        page['entry_list'] = bean_list
+        return page
+
+    @staticmethod
+    def _get_page_from_result(result, offset, max_results):
+        previous_offset = None
+        if offset and max_results and offset - max_results >= 0:
+            previous_offset = offset - max_results
+        next_offset = None
+        try:
+            if int(result['next_offset']) < int(result['total_count']):
+                next_offset = result['next_offset']
+        except Exception:
+            pass
+        return {
+            "result_count": result['result_count'],
+            "total_count": result['total_count'],
+            "previous_offset": previous_offset,
+            "current_offset": offset if offset else 0,
+            "next_offset": next_offset,
+            "current_limit": max_results
+        }
+
+    @staticmethod
+    def _get_relationships_from_result(result, offset, limit, lazy=False):
+        bean_class = LazyBean if lazy else Bean
+        bean_list = []
+        for i, entry in enumerate(result['entry_list']):
+            bean_list.append(
+                bean_class(
+                    entry['module_name'],
+                    entry['name_value_list'],
+                    result['relationship_list'][i] if len(
+                        result['relationship_list']) > i else []
+                )
+            )
+        previous_offset = None
+        result_count = len(bean_list)
+        if offset and limit and offset - limit >= 0:
+            previous_offset = offset - limit
+        next_offset = None
+        if limit and result_count == limit:
+            if offset:
+                next_offset = offset + limit
+            else:
+                next_offset = limit
+        return {
+            "entry_list": bean_list,
+            "result_count": result_count,
+            "previous_offset": previous_offset,
+            "current_offset": offset if offset else 0,
+            "next_offset": next_offset,
+            "current_limit": limit
+        }
+
+    def _get_metadata_cache(self):
+        if self._metadata_cache is not None:
+            return self._metadata_cache
+        with self._lock:
+            if self._metadata_cache is None and self.conf.metadata_cache_enabled:
+                try:
+                    self._metadata_cache = SQLiteCache(
+                        self.conf.metadata_cache_path,
+                        self._max_cached_metadata_calls,
+                        self.conf.metadata_cache_ttl
+                    )
+                except Exception:
+                    # Metadata is kept in memory if the cache file
+                    # can not be used, for example if it is not writable.
+                    pass
+            if self._metadata_cache is None:
+                self._metadata_cache = LRUCache(
+                    self._max_cached_metadata_calls,
+                    self.conf.metadata_cache_ttl
+                )
+        return self._metadata_cache
+
+    def _request_metadata(self, method, parameters, module_name=None,
+                          timeout=None):
+        cache = self._get_metadata_cache()
+        key = (self.conf.url, self.conf.username,
+               make_cache_key(method, parameters))
+        try:
+            result = cache.get(key)
+        except Exception:
+            result = None
+        if result is None:
+            result = self._request(method, parameters, timeout)
+            try:
+                cache.set(key, result, [('metadata', module_name)])
+            except Exception:
+                pass
+        return result
+
+    def refresh_metadata(self, module_name=None):
+        """
+        Discard the cached metadata of a module, so it is retrieved
+        again from SuiteCRM the next time it is requested.
+
+        :param str module_name: name of the module, if not specified the
+            metadata of all the modules and the list of available modules is discarded.
+        """
+        cache = self._get_metadata_cache()
+        try:
+            if module_name is None:
+                cache.clear()
+            else:
+                cache.invalidate_tag(('metadata', module_name))
+        except Exception:
+            pass
+
+    def close(self):
+        """
+        Closes the pooled HTTP connections to SuiteCRM.
+        A new pool is created if the client is used again.
+        """
+        with self._lock:
+            if self._transport is not None:
+                self._transport.close()
+
+    def enable_metrics(self, hook=None):
+        """
+        Start collecting metrics of the calls made by this client.
+
+        :param hook: function called with the method, the metric and the value
+            of every value recorded, see Metrics.add_hook.
+        :return: the metrics of the client.
+        :rtype: Metrics
+        """
+        with self._lock:
+            if self._metrics is None:
+                self._metrics = Metrics()
+        if hook is not None:
+            self._metrics.add_hook(hook)
+        return self._metrics
+
+    def disable_metrics(self):
+        """
+        Stop collecting metrics of the calls made by this client.
+        """
+        self._metrics = None
+
+    def get_metrics(self):
+        """
+        Get the metrics of the calls made by this client.
+
+        :return: dict with the statistics of every API method under 'methods',
+            see Metrics.snapshot. It is empty if metrics are not enabled.
+        :rtype: dict
+        """
+        metrics = self._metrics
+        return {'methods': metrics.snapshot() if metrics is not None else {}}
+
+    def _build_beans(self, method, function, *args):
+        metrics = self._metrics
+        if metrics is None:
+            return function(*args)
+        start = time.perf_counter()
+        result = function(*args)
+        metrics.record_beans(method, time.perf_counter() - start)
+        return result
+
     def get_bean(self, module_name, id, select_fields='',
-                 link_name_to_fields_array='', track_view=''):
+                 link_name_to_fields_array='', track_view='', timeout=None):
         """
         Retrieve a single Bean based on ID.
 
@@ -105,6 +548,8 @@ class SuiteCRM(Singleton):
         :param list[dict] link_name_to_fields_array: a list of link_names and for each link_name,
             what fields value to be returned.
         :param bool track_view: should we track the record accessed.
+        :param float timeout: seconds the call can take, including its retries,
+            by default the deadline setting of the configuration.
         :return: Bean object matching the selection criteria.
         :rtype: Bean
         :raises BeanNotFoundException: if the Bean is not found.
@@ -117,35 +562,209 @@ class SuiteCRM(Singleton):
         parameters['select_fields'] = select_fields
         parameters['link_name_to_fields_array'] = link_name_to_fields_array
         parameters['track_view'] = track_view
-        result = self._request('get_entry', parameters)
-        if self._get_bean_failed(result):
-            error_msg = result['entry_list'][0]['name_value_list'][0]['value']
-            raise BeanNotFoundException(error_msg)
-        return Bean(
-            module_name,
-            result['entry_list'][0]['name_value_list'],
-            result['relationship_list'][0] if len(
-                result['relationship_list']) > 0 else []
-        )
+        result = self._request('get_entry', parameters, timeout)
+        return self._build_beans(
+            'get_entry', self._get_bean_from_result, module_name, result)
 
-    def save_bean(self, bean):
+    def get_beans(self, module_name, ids, select_fields='',
+                  link_name_to_fields_array='', batch_size=100, workers=1,
+                  timeout=None):
+        """
+        Retrieve several Beans based on their IDs.
+
+        The IDs are requested in batches of batch_size IDs per call,
+        and batches can be requested concurrently on a pool of workers.
+
+        :param str module_name: name of the module to return records from.
+        :param list[str] ids: list of bean ids.
+        :param list[str] select_fields: list of the fields to be included in the results.
+            This optional parameter allows for only needed fields to be retrieved.
+        :param list[dict] link_name_to_fields_array: a list of link_names and for each link_name,
+            what fields value to be returned.
+        :param int batch_size: maximum number of IDs requested on each call.
+        :param int workers: number of batches requested concurrently.
+        :param float timeout: seconds every call to SuiteCRM can take, including
+            its retries, by default the deadline setting of the configuration.
+        :return: dict containing the found beans keyed by ID in 'entry_list'
+            and the IDs of the beans not found in 'missing_ids'.
+        :rtype: dict[str, object]
+        :raises SuiteException: if error when retrieving beans from SuiteCRM instance.
+        """
+        ids = list(ids)
+        batch_size = max(batch_size, 1)
+        batches = [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)]
+
+        def get_batch(batch_ids):
+            parameters = OrderedDict()
+            parameters['session'] = self._session_id
+            parameters['module_name'] = module_name
+            parameters['ids'] = batch_ids
+            parameters['select_fields'] = select_fields
+            parameters['link_name_to_fields_array'] = link_name_to_fields_array
+            return self._request('get_entries', parameters, timeout)
+
+        if workers > 1 and len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(get_batch, batches))
+        else:
+            results = [get_batch(batch_ids) for batch_ids in batches]
+        bean_list = OrderedDict()
+        missing_ids = []
+        for batch_ids, result in zip(batches, results):
+            relationship_list = result.get('relationship_list') or []
+            for i, bean_id in enumerate(batch_ids):
+                if i >= len(result['entry_list']) or \
+                        self._entry_failed(result['entry_list'][i]):
+                    missing_ids.append(bean_id)
+                    continue
+                bean_list[bean_id] = Bean(
+                    module_name,
+                    result['entry_list'][i]['name_value_list'],
+                    relationship_list[i] if len(relationship_list) > i else []
+                )
+        return {
+            "entry_list": bean_list,
+            "missing_ids": missing_ids
+        }
+
+    def save_bean(self, bean, timeout=None):
         """
         Saves a Bean object to SuiteCRM.
 
         :param Bean bean: Bean object.
+        :param float timeout: seconds the call can take, including its retries,
+            by default the deadline setting of the configuration.
         :raises SuiteException: if error when saving Bean to SuiteCRM instance.
         """
+        self._save_bean(bean, timeout=timeout)
+
+    def _save_bean(self, bean, new_with_id=False, timeout=None):
         parameters = OrderedDict()
         parameters['session'] = self._session_id
         parameters['module_name'] = bean.module
-        parameters['name_value_list'] = bean.name_value_list
-        result = self._request('set_entry', parameters)
-        bean._set_name_value_list(result['entry_list'])
-        bean['id'] = result['id']
+        parameters['name_value_list'] = self._get_name_value_list(
+            bean, new_with_id)
+        result = self._request('set_entry', parameters, timeout)
+        self._update_bean_from_result(bean, result)
+
+    @staticmethod
+    def _get_name_value_list(bean, new_with_id=False):
+        name_value_list = bean.name_value_list
+        if new_with_id:
+            # Create the record with the id set by the client.
+            name_value_list.append({'name': 'new_with_id', 'value': True})
+        return name_value_list
+
+    def save_beans(self, beans, batch_size=100, workers=1, timeout=None):
+        """
+        Saves several Bean objects to SuiteCRM.
+
+        Beans are grouped by module and sent in batches of batch_size
+        beans per call. New beans get a random id before being sent, so if
+        SuiteCRM rejects a batch, its beans are saved one by one without
+        creating twice the ones created before the batch failed, and a bad
+        record does not prevent saving the others. New beans that could
+        not be saved get back an empty id.
+
+        :param list[Bean] beans: list of Bean objects.
+        :param int batch_size: maximum number of beans saved on each call.
+        :param int workers: number of batches saved concurrently.
+        :param float timeout: seconds every call to SuiteCRM can take, including
+            its retries, by default the deadline setting of the configuration.
+        :return: one report per bean, in the same order as beans, containing
+            the 'bean', whether it has been saved in 'success' and
+            the raised exception, if any, in 'error'.
+        :rtype: list[dict[str, object]]
+        """
+        beans = list(beans)
+        batch_size = max(batch_size, 1)
+        reports = [{'bean': bean, 'success': False, 'error': None}
+                   for bean in beans]
+        reports_by_module = OrderedDict()
+        for report in reports:
+            reports_by_module.setdefault(report['bean'].module, []).append(report)
+        batches = []
+        for module_reports in reports_by_module.values():
+            for i in range(0, len(module_reports), batch_size):
+                batches.append(module_reports[i:i + batch_size])
+        if workers > 1 and len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(
+                    lambda batch: self._save_beans_batch(batch, timeout),
+                    batches))
+        else:
+            for batch in batches:
+                self._save_beans_batch(batch, timeout)
+        return reports
+
+    def _save_beans_batch(self, reports, timeout=None):
+        module_name = reports[0]['bean'].module
+        new_ids = set()
+        for report in reports:
+            if not report['bean']['id']:
+                report['bean']['id'] = str(uuid.uuid4())
+                new_ids.add(report['bean']['id'])
+        parameters = OrderedDict()
+        parameters['session'] = self._session_id
+        parameters['module_name'] = module_name
+        parameters['name_value_lists'] = [
+            self._get_name_value_list(
+                report['bean'], report['bean']['id'] in new_ids)
+            for report in reports
+        ]
+        try:
+            result = self._request('set_entries', parameters, timeout)
+        except SuiteException:
+            self._save_beans_one_by_one(module_name, reports, new_ids, timeout)
+            return
+        except requests.RequestException as e:
+            for report in reports:
+                self._set_save_error(report, e, new_ids)
+            return
+        ids = result.get('ids')
+        if not isinstance(ids, list):
+            ids = []
+        for i, report in enumerate(reports):
+            if i < len(ids) and ids[i]:
+                report['bean']['id'] = ids[i]
+                report['success'] = True
+            else:
+                self._set_save_error(report, UnknownSuiteException(None), new_ids)
+
+    def _save_beans_one_by_one(self, module_name, reports, new_ids,
+                               timeout=None):
+        # The rejected batch may have created some of the new beans.
+        created_ids = set()
+        if new_ids:
+            try:
+                created_ids = set(self.get_beans(
+                    module_name, list(new_ids), ['id'],
+                    timeout=timeout)['entry_list'])
+            except (requests.RequestException, SuiteException) as e:
+                for report in reports:
+                    self._set_save_error(report, e, new_ids)
+                return
+        for report in reports:
+            bean = report['bean']
+            if bean['id'] in created_ids:
+                report['success'] = True
+                continue
+            try:
+                self._save_bean(bean, bean['id'] in new_ids, timeout)
+                report['success'] = True
+            except (requests.RequestException, SuiteException) as e:
+                self._set_save_error(report, e, new_ids)
+
+    @staticmethod
+    def _set_save_error(report, error, new_ids):
+        report['error'] = error
+        if report['bean']['id'] in new_ids:
+            report['bean']['id'] = ''
 
     def get_bean_list(self, module_name, query='', order_by='',
                       offset='', select_fields='', link_name_to_fields_array='',
-                      max_results='', deleted='', favorites=''):
+                      max_results='', deleted='', favorites='', compact=False,
+                      lazy=False, timeout=None):
         """
         Get list of beans matching criteria.
 
@@ -162,6 +781,10 @@ class SuiteCRM(Singleton):
         :param bool deleted: False if deleted records should not be include,
             True if deleted records should be included.
         :param bool favorites: True if only favorites should be included, False otherwise.
+        :param bool compact: if True, return CompactBean objects instead of Bean objects.
+        :param bool lazy: if True, return LazyBean objects instead of Bean objects.
+        :param float timeout: seconds the call can take, including its retries,
+            by default the deadline setting of the configuration.
         :return: dict containing results matching criteria.
         :rtype: dict[str, object]
         :raises SuiteException: if error when retrieving beans from SuiteCRM instance.
@@ -177,34 +800,377 @@ class SuiteCRM(Singleton):
         parameters['max_results'] = max_results
         parameters['deleted'] = deleted
         parameters['favorites'] = favorites
-        result = self._request('get_entry_list', parameters)
+        result = self._request('get_entry_list', parameters, timeout)
+        return self._build_beans(
+            'get_entry_list', self._get_bean_list_from_result,
+            module_name, result, offset, max_results, compact, lazy)
+
+    def stream_bean_list(self, module_name, query='', order_by='', offset='',
+                         select_fields='', link_name_to_fields_array='',
+                         max_results='', deleted='', favorites='',
+                         compact=False, lazy=False, timeout=None):
+        """
+        Get the beans matching criteria as a stream, parsing the response
+        while it is being downloaded. Requires the ijson package.
+
+        Every bean is yielded as soon as its record has been received,
+        so memory usage does not depend on the size of the page. As in
+        get_bean_list, the relationship_list of the response is ignored.
+
+        :param str module_name: name of the module to return records from.
+        :param str query: SQL WHERE clause without the word 'WHERE'.
+        :param str order_by: SQL ORDER BY clause without the phrase 'ORDER BY'.
+        :param int offset: the record offset to start from.
+        :param list[str] select_fields: a list of the fields to be included in the results.
+            This optional parameter allows for only needed fields to be retrieved.
+        :param list[dict] link_name_to_fields_array: a list of link_names and for each link_name,
+            what fields value to be returned.
+        :param int max_results: the maximum number of records to return.
+        :param bool deleted: False if deleted records should not be include,
+            True if deleted records should be included.
+        :param bool favorites: True if only favorites should be included, False otherwise.
+        :param bool compact: if True, yield CompactBean objects instead of Bean objects.
+        :param bool lazy: if True, yield LazyBean objects instead of Bean objects.
+        :param float timeout: seconds the call can take, including its retries,
+            by default the deadline setting of the configuration.
+        :return: generator of the beans matching criteria.
+        :rtype: collections.Iterator[Bean]
+        :raises SuiteException: if error when retrieving beans from SuiteCRM instance.
+        """
+        if compact and lazy:
+            raise ValueError('A bean list cannot be compact and lazy at once')
+        parameters = OrderedDict()
+        parameters['session'] = self._session_id
+        parameters['module_name'] = module_name
+        parameters['query'] = query
+        parameters['order_by'] = order_by
+        parameters['offset'] = offset
+        parameters['select_fields'] = select_fields
+        parameters['link_name_to_fields_array'] = link_name_to_fields_array
+        parameters['max_results'] = max_results
+        parameters['deleted'] = deleted
+        parameters['favorites'] = favorites
+        try:
+            entries = self._stream_entry_list(parameters, timeout)
+            entry = next(entries, None)
+        except InvalidSessionIDException:
+            if self._metrics is not None:
+                self._metrics.record_relogin('get_entry_list')
+            self._renew_session(parameters['session'])
+            parameters['session'] = self._session_id
+            entries = self._stream_entry_list(parameters, timeout)
+            entry = next(entries, None)
+        schema = None
+        while entry is not None:
+            if lazy:
+                bean = LazyBean(module_name, entry['name_value_list'])
+            elif compact:
+                bean = CompactBean(
+                    module_name, entry['name_value_list'], schema=schema)
+                schema = bean.schema
+            else:
+                bean = Bean(module_name, entry['name_value_list'])
+            yield bean
+            entry = next(entries, None)
+
+    def _stream_entry_list(self, parameters, timeout=None):
+        from .streaming import iter_entry_list
+        payload = self._get_codec().dumps(parameters)
+        metrics = self._metrics
+        start = time.perf_counter()
+        stream = None
+        try:
+            stream = self._get_policy().call(
+                'get_entry_list', self._open_stream, payload, timeout,
+                hedge=False)
+            for entry in iter_entry_list(stream):
+                yield entry
+        except Exception as e:
+            if metrics is not None:
+                metrics.record_call('get_entry_list', time.perf_counter() - start, e)
+            raise
+        finally:
+            if stream is not None:
+                stream.close()
+        if metrics is not None:
+            metrics.record_call('get_entry_list', time.perf_counter() - start)
+            metrics.record_transfer(
+                'get_entry_list', len(payload), stream.bytes_read, 0.0)
+
+    def _open_stream(self, method, payload, timeout=None):
+        # Streamed calls last until the whole response is read, so their
+        # latency is compared with that of other streamed calls.
+        key = (method, 'stream')
+        governor = self._get_governor(method)
+        start = governor.acquire() if governor is not None else None
+        try:
+            stream = self._get_transport().stream(method, payload, timeout)
+        except BaseException as e:
+            if governor is not None:
+                governor.release(start, e, key)
+            raise
+        return _ResponseStream(stream, governor, start, key)
+
+    def iter_beans(self, module_name, query='', order_by='', select_fields='',
+                   page_size=100, link_name_to_fields_array='', deleted='',
+                   favorites='', prefetch=1, compact=False, lazy=False,
+                   timeout=None):
+        """
+        Iterate over all the beans matching criteria, fetching them page by page.
+
+        While the caller processes a page, the following pages are
+        downloaded in the background. At most prefetch pages are kept
+        in memory ahead of the one being processed.
+
+        :param str module_name: name of the module to return records from.
+        :param str query: SQL WHERE clause without the word 'WHERE'.
+        :param str order_by: SQL ORDER BY clause without the phrase 'ORDER BY'.
+        :param list[str] select_fields: a list of the fields to be included in the results.
+            This optional parameter allows for only needed fields to be retrieved.
+        :param int page_size: number of records requested on each call.
+        :param list[dict] link_name_to_fields_array: a list of link_names and for each link_name,
+            what fields value to be returned.
+        :param bool deleted: False if deleted records should not be include,
+            True if deleted records should be included.
+        :param bool favorites: True if only favorites should be included, False otherwise.
+        :param int prefetch: number of pages downloaded ahead of the current one (at least 1).
+        :param bool compact: if True, yield CompactBean objects instead of Bean objects.
+        :param bool lazy: if True, yield LazyBean objects instead of Bean objects.
+        :param float timeout: seconds every call to SuiteCRM can take, including
+            its retries, by default the deadline setting of the configuration.
+        :return: generator of the beans matching criteria.
+        :rtype: collections.Iterator[Bean]
+        :raises SuiteException: if error when retrieving beans from SuiteCRM instance.
+        """
+
+        def get_page(offset):
+            return self.get_bean_list(
+                module_name, query=query, order_by=order_by, offset=offset,
+                select_fields=select_fields,
+                link_name_to_fields_array=link_name_to_fields_array,
+                max_results=page_size, deleted=deleted, favorites=favorites,
+                compact=compact, lazy=lazy, timeout=timeout
+            )
+
+        prefetch = max(prefetch, 1)
+        executor = ThreadPoolExecutor(max_workers=prefetch)
+        pending = deque([executor.submit(get_page, 0)])
+        next_offset = page_size
+        total_count = None
+        try:
+            while pending:
+                page = pending.popleft().result()
+                if total_count is None:
+                    total_count = int(page['total_count'])
+                if page['next_offset'] is None or not page['result_count']:
+                    total_count = min(total_count, next_offset)
+                while len(pending) < prefetch and next_offset < total_count:
+                    pending.append(executor.submit(get_page, next_offset))
+                    next_offset += page_size
+                for bean in page['entry_list']:
+                    yield bean
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def get_all_beans(self, module_name, query='', order_by='', select_fields='',
+                      page_size=100, link_name_to_fields_array='', deleted='',
+                      favorites='', workers=4, ordered=True, compact=False,
+                      lazy=False, timeout=None):
+        """
+        Get all the beans matching criteria, fetching the pages in parallel.
+
+        The first page is used to know the total number of records,
+        then the remaining pages are requested concurrently on a pool
+        of workers. Calls are retried as set in the retry policy, and the
+        pages not requested yet are cancelled when a page fails.
+
+        :param str module_name: name of the module to return records from.
+        :param str query: SQL WHERE clause without the word 'WHERE'.
+        :param str order_by: SQL ORDER BY clause without the phrase 'ORDER BY'.
+        :param list[str] select_fields: a list of the fields to be included in the results.
+            This optional parameter allows for only needed fields to be retrieved.
+        :param int page_size: number of records requested on each call.
+        :param list[dict] link_name_to_fields_array: a list of link_names and for each link_name,
+            what fields value to be returned.
+        :param bool deleted: False if deleted records should not be include,
+            True if deleted records should be included.
+        :param bool favorites: True if only favorites should be included, False otherwise.
+        :param int workers: number of pages requested concurrently.
+        :param bool ordered: if False, beans are returned in the order the pages arrive.
+        :param bool compact: if True, return CompactBean objects instead of Bean objects.
+        :param bool lazy: if True, return LazyBean objects instead of Bean objects.
+        :param float timeout: seconds every call to SuiteCRM can take, including
+            its retries, by default the deadline setting of the configuration.
+        :return: list with all the beans matching criteria.
+        :rtype: list[Bean]
+        :raises SuiteException: if error when retrieving beans from SuiteCRM instance.
+        """
+
+        def get_page(offset):
+            return self.get_bean_list(
+                module_name, query=query, order_by=order_by, offset=offset,
+                select_fields=select_fields,
+                link_name_to_fields_array=link_name_to_fields_array,
+                max_results=page_size, deleted=deleted, favorites=favorites,
+                compact=compact, lazy=lazy, timeout=timeout
+            )
+
         bean_list = []
-        for entry in result['entry_list']:
-            bean_list.append(Bean(module_name, entry['name_value_list']))
-        previous_offset = None
-        if offset and max_results and offset - max_results >= 0:
-            previous_offset = offset - max_results
-        next_offset = None
+        for page in self._get_all_pages(get_page, page_size, workers, ordered):
+            bean_list.extend(page['entry_list'])
+        return bean_list
+
+    @staticmethod
+    def _get_all_pages(get_page, page_size, workers, ordered):
+        first_page = get_page(0)
+        yield first_page
+        if first_page['next_offset'] is None:
+            return
+        offsets = range(page_size, int(first_page['total_count']), page_size)
+        executor = ThreadPoolExecutor(max_workers=max(workers, 1))
+        futures = [executor.submit(get_page, offset) for offset in offsets]
         try:
-            if int(result['next_offset']) < int(result['total_count']):
-                next_offset = result['next_offset']
-        except Exception:
-            pass
-        return {
-            "result_count": result['result_count'],
-            "total_count": result['total_count'],
-            "previous_offset": previous_offset,
-            "current_offset": offset if offset else 0,
-            "next_offset": next_offset,
-            "current_limit": max_results,
-            "entry_list": bean_list
-        }
+            if ordered:
+                completed = futures
+            else:
+                completed = as_completed(futures)
+            for future in completed:
+                yield future.result()
+        finally:
+            # Do not wait for the remaining pages if one failed
+            # or the caller stopped iterating.
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
 
-    def get_available_modules(self, filter='default'):
+    def get_bean_columns(self, module_name, query='', order_by='', offset='',
+                         select_fields='', max_results='', deleted='',
+                         favorites='', output='dict', typed=None, timeout=None):
+        """
+        Get a page of records matching criteria as columns instead of beans.
+
+        One list of values per field is built directly from the response,
+        without creating a Bean for every record. Values can be converted
+        to the types of the fields retrieved with get_module_fields.
+
+        :param str module_name: name of the module to return records from.
+        :param str query: SQL WHERE clause without the word 'WHERE'.
+        :param str order_by: SQL ORDER BY clause without the phrase 'ORDER BY'.
+        :param int offset: the record offset to start from.
+        :param list[str] select_fields: a list of the fields to be included in the results.
+        :param int max_results: the maximum number of records to return.
+        :param bool deleted: False if deleted records should not be include,
+            True if deleted records should be included.
+        :param bool favorites: True if only favorites should be included, False otherwise.
+        :param str output: 'dict' for a dict of lists, 'numpy' for a dict of
+            NumPy arrays or 'pandas' for a DataFrame.
+        :param bool typed: whether values are converted to the types of the fields,
+            by default only for 'numpy' and 'pandas' outputs.
+        :param float timeout: seconds the call can take, including its retries,
+            by default the deadline setting of the configuration.
+        :return: dict containing the columns in 'columns' and the same
+            paging information returned by get_bean_list.
+        :rtype: dict[str, object]
+        :raises SuiteException: if error when retrieving records from SuiteCRM instance.
+        """
+        page = self._get_bean_columns_page(
+            module_name, query, order_by, offset, select_fields,
+            max_results, deleted, favorites, timeout
+        )
+        page['columns'] = self._convert_columns(
+            module_name, page['columns'], output, typed, timeout)
+        return page
+
+    def get_all_bean_columns(self, module_name, query='', order_by='',
+                             select_fields='', page_size=100, deleted='',
+                             favorites='', workers=4, output='dict', typed=None,
+                             timeout=None):
+        """
+        Get all the records matching criteria as columns, fetching the pages in parallel.
+
+        Pages are requested as in get_all_beans, and their columns are
+        concatenated in offset order before being converted to the output.
+
+        :param str module_name: name of the module to return records from.
+        :param str query: SQL WHERE clause without the word 'WHERE'.
+        :param str order_by: SQL ORDER BY clause without the phrase 'ORDER BY'.
+        :param list[str] select_fields: a list of the fields to be included in the results.
+        :param int page_size: number of records requested on each call.
+        :param bool deleted: False if deleted records should not be include,
+            True if deleted records should be included.
+        :param bool favorites: True if only favorites should be included, False otherwise.
+        :param int workers: number of pages requested concurrently.
+        :param str output: 'dict' for a dict of lists, 'numpy' for a dict of
+            NumPy arrays or 'pandas' for a DataFrame.
+        :param bool typed: whether values are converted to the types of the fields,
+            by default only for 'numpy' and 'pandas' outputs.
+        :param float timeout: seconds every call to SuiteCRM can take, including
+            its retries, by default the deadline setting of the configuration.
+        :return: the columns of all the records matching criteria.
+        :raises SuiteException: if error when retrieving records from SuiteCRM instance.
+        """
+
+        # Without select_fields, the columns are the fields of the first
+        # record, so every page has the same columns of the same length.
+        column_fields = []
+
+        def get_page(offset):
+            return self._get_bean_columns_page(
+                module_name, query, order_by, offset, select_fields,
+                page_size, deleted, favorites, timeout, column_fields
+            )
+
+        columns = None
+        for page in self._get_all_pages(get_page, page_size, workers, True):
+            if columns is None:
+                columns = page['columns']
+                column_fields.extend(columns.keys())
+            else:
+                extend_columns(columns, page['columns'])
+        return self._convert_columns(
+            module_name, columns, output, typed, timeout)
+
+    def _get_bean_columns_page(self, module_name, query, order_by, offset,
+                               select_fields, max_results, deleted, favorites,
+                               timeout=None, column_fields=None):
+        parameters = OrderedDict()
+        parameters['session'] = self._session_id
+        parameters['module_name'] = module_name
+        parameters['query'] = query
+        parameters['order_by'] = order_by
+        parameters['offset'] = offset
+        parameters['select_fields'] = select_fields
+        parameters['link_name_to_fields_array'] = ''
+        parameters['max_results'] = max_results
+        parameters['deleted'] = deleted
+        parameters['favorites'] = favorites
+        result = self._request('get_entry_list', parameters, timeout)
+        page = self._get_page_from_result(result, offset, max_results)
+        page['columns'] = entries_to_columns(
+            result['entry_list'], column_fields or select_fields)
+        return page
+
+    def _convert_columns(self, module_name, columns, output, typed,
+                         timeout=None):
+        if typed is None:
+            typed = output != 'dict'
+        field_types = None
+        if typed:
+            field_types = get_field_types(
+                self.get_module_fields(
+                    module_name, list(columns.keys()), timeout))
+        return convert_columns(columns, field_types, output)
+
+    def get_available_modules(self, filter='default', timeout=None):
         """
         Retrieve the list of available modules on the system available to the currently logged in user.
+        The result is kept on the metadata cache, see refresh_metadata.
 
         :param str filter: valid values are: [all, default, mobile].
+        :param float timeout: seconds the call can take, including its retries,
+            by default the deadline setting of the configuration.
         :return: dictionary containing information about modules.
         :rtype: dict[str, object]
         :raises SuiteException: if error when retrieving modules from SuiteCRM.
@@ -212,15 +1178,19 @@ class SuiteCRM(Singleton):
         parameters = OrderedDict()
         parameters['session'] = self._session_id
         parameters['filter'] = filter
-        result = self._request('get_available_modules', parameters)
+        result = self._request_metadata(
+            'get_available_modules', parameters, timeout=timeout)
         return result
 
-    def get_module_fields(self, module_name, fields=''):
+    def get_module_fields(self, module_name, fields='', timeout=None):
         """
         Retrieve field definitions of a module.
+        The result is kept on the metadata cache, see refresh_metadata.
 
         :param str module_name: the name of the module to return records from.
         :param list[str] fields: if specified then retrieve definition of specified fields only.
+        :param float timeout: seconds the call can take, including its retries,
+            by default the deadline setting of the configuration.
         :return: field definitions of the specified module.
         :rtype: dict[str, object]
         :raises SuiteException: if error when retrieving field definitions from SuiteCRM.
@@ -229,13 +1199,15 @@ class SuiteCRM(Singleton):
         parameters['session'] = self._session_id
         parameters['module_name'] = module_name
         parameters['fields'] = fields
-        result = self._request('get_module_fields', parameters)
+        result = self._request_metadata(
+            'get_module_fields', parameters, module_name, timeout)
         return result
 
     def get_relationships(self, module_name, module_id, link_field_name,
                           related_module_query='', related_fields=None,
                           related_module_link_name_to_fields_array=None, deleted=False,
-                          order_by='', offset='', limit=''):
+                          order_by='', offset='', limit='', lazy=False,
+                          timeout=None):
         """
         Retrieve a collection of beans that are related to the specified bean
         and optionally return relationship data for those related beans.
@@ -253,6 +1225,9 @@ class SuiteCRM(Singleton):
         :param str order_by: SQL ORDER BY clause without the phrase 'ORDER BY'.
         :param int offset: the result offset to start from.
         :param int limit: the maximum number of records to return.
+        :param bool lazy: if True, return LazyBean objects instead of Bean objects.
+        :param float timeout: seconds the call can take, including its retries,
+            by default the deadline setting of the configuration.
         :return: dict containing results matching criteria.
         :rtype: dict[str, object]
         :raises SuiteException: if error when retrieving beans from SuiteCRM instance.
@@ -270,38 +1245,14 @@ class SuiteCRM(Singleton):
         parameters['order_by'] = order_by
         parameters['offset'] = offset
         parameters['limit'] = limit
-        result = self._request('get_relationships', parameters)
-        bean_list = []
-        for i, entry in enumerate(result['entry_list']):
-            bean_list.append(
-                Bean(
-                    entry['module_name'],
-                    entry['name_value_list'],
-                    result['relationship_list'][i] if len(
-                        result['relationship_list']) > i else []
-                )
-            )
-        previous_offset = None
-        result_count = len(bean_list)
-        if offset and limit and offset - limit >= 0:
-            previous_offset = offset - limit
-        next_offset = None
-        if limit and result_count == limit:
-            if offset:
-                next_offset = offset + limit
-            else:
-                next_offset = limit
-        return {
-            "entry_list": bean_list,
-            "result_count": result_count,
-            "previous_offset": previous_offset,
-            "current_offset": offset if offset else 0,
-            "next_offset": next_offset,
-            "current_limit": limit
-        }
+        result = self._request('get_relationships', parameters, timeout)
+        return self._build_beans(
+            'get_relationships', self._get_relationships_from_result,
+            result, offset, limit, lazy)
 
     def set_relationship(self, module_name, module_id, link_field_name,
-                         related_ids, name_value_list=None, delete=False):
+                         related_ids, name_value_list=None, delete=False,
+                         timeout=None):
         """
         Set a single relationship between two beans. The items are related by module name and id.
 
@@ -313,6 +1264,8 @@ class SuiteCRM(Singleton):
         :param dict[str, str] name_value_list: the keys of the array are the SugarBean attributes,
             the values of the array are the values the attributes should have.
         :param bool delete: if True delete the relationship and if False add the relationship.
+        :param float timeout: seconds the call can take, including its retries,
+            by default the deadline setting of the configuration.
         :return: how many relationships are deleted, created and failed.
         :rtype: dict[str, int]
         :raises SuiteException: if error when relating beans.
@@ -325,13 +1278,15 @@ class SuiteCRM(Singleton):
         parameters['related_ids'] = related_ids
         parameters['name_value_list'] = name_value_list or []
         parameters['delete'] = delete
-        return self._request('set_relationship', parameters)
+        return self._request('set_relationship', parameters, timeout)
 
-    def get_note_attachment(self, note_id):
+    def get_note_attachment(self, note_id, timeout=None):
         """
         Retrieve an attachment from a note.
 
         :param str note_id: ID of the appropriate Note.
+        :param float timeout: seconds the call can take, including its retries,
+            by default the deadline setting of the configuration.
         :return: the requested attachment.
         :rtype: dict[str, object]
         :raises SuiteException: if error when retrieving the attachment from SuiteCRM instance.
@@ -339,15 +1294,17 @@ class SuiteCRM(Singleton):
         parameters = OrderedDict()
         parameters['session'] = self._session_id
         parameters['id'] = note_id
-        return self._request('get_note_attachment', parameters)
+        return self._request('get_note_attachment', parameters, timeout)
 
-    def set_note_attachment(self, note_id, filename, file):
+    def set_note_attachment(self, note_id, filename, file, timeout=None):
         """
         Add or replace the attachment on a Note.
 
         :param str note_id: ID of the Note containing the attachment.
         :param str filename: the file name of the attachment.
         :param str file: the binary contents of the file.
+        :param float timeout: seconds the call can take, including its retries,
+            by default the deadline setting of the configuration.
         :return: the ID of the note.
         :rtype: dict[str, str]
         :raises SuiteException: if error when setting the note attachment.
@@ -359,15 +1316,17 @@ class SuiteCRM(Singleton):
             'filename': filename,
             'file': file
         }
-        return self._request('set_note_attachment', parameters)
+        return self._request('set_note_attachment', parameters, timeout)
 
-    def get_pdf_template(self, template_id, bean_module, bean_id):
+    def get_pdf_template(self, template_id, bean_module, bean_id, timeout=None):
         """
         Retrieve PDF Template for a given module record.
 
         :param str template_id: template ID used to generate PDF.
         :param str bean_module: module name of the bean that will be used to populate PDF.
         :param str bean_id: ID of the bean record.
+        :param float timeout: seconds the call can take, including its retries,
+            by default the deadline setting of the configuration.
         :return: the generated PDF.
         :rtype: dict[str, str]
         :raises SuiteException: if error when retrieving PDF.
@@ -377,4 +1336,4 @@ class SuiteCRM(Singleton):
         parameters['template_id'] = template_id
         parameters['bean_module'] = bean_module
         parameters['bean_id'] = bean_id
-        return self._request('get_pdf_template', parameters)
+        return self._request('get_pdf_template', parameters, timeout)
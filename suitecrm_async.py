@@ -0,0 +1,435 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import asyncio
+import time
+from collections import OrderedDict
+from .coalesce import AsyncSingleFlight
+from .codec import get_codec
+from .governor import get_governor
+from .metrics import Metrics
+from .policy import RetryPolicy
+from .suite_exceptions import *
+from .suitecrm import SuiteCRM
+from .transport import get_transport
+
+
+class AsyncSuiteCRM(object):
+    """
+    This class contains awaitable methods to interact with a SuiteCRM instance.
+
+    It returns the same Bean objects and raises the same exceptions as the
+    SuiteCRM class, but it does not block the event loop while waiting
+    for SuiteCRM responses. The number of calls in flight is bounded by
+    the async_max_concurrency setting of the configuration, and identical
+    read calls made at the same time by several tasks share a single request.
+    Calls are sent with the transport of the async_transport setting,
+    aiohttp by default.
+
+    Instances must be closed when no longer needed, either by calling
+    close() or by using them as an asynchronous context manager::
+
+        async with AsyncSuiteCRM() as crm:
+            bean = await crm.get_bean('Contacts', contact_id)
+    """
+
+    def __init__(self, conf=None, max_concurrency=None):
+        """
+        Creates an asynchronous SuiteCRM client.
+
+        :param Config conf: configuration to use, by default the SuiteCRM one.
+        :param int max_concurrency: maximum number of calls in flight,
+            by default the async_max_concurrency setting of the configuration.
+        """
+        self.conf = conf or SuiteCRM.conf
+        self._max_concurrency = max_concurrency or self.conf.async_max_concurrency
+        self._session_id = None
+        self._transport = get_transport(
+            self.conf, self.conf.async_transport, asynchronous=True)
+        self._semaphore = None
+        self._login_lock = None
+        self._codec = get_codec(self.conf.json_codec)
+        self._single_flight = AsyncSingleFlight()
+        self._write_generation = 0
+        self._policy = RetryPolicy.from_config(self.conf, SuiteCRM._write_methods)
+        self._metrics = Metrics() if self.conf.metrics_enabled else None
+
+    async def __aenter__(self):
+        await self.login()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def _get_semaphore(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        return self._semaphore
+
+    def _get_login_lock(self):
+        if self._login_lock is None:
+            self._login_lock = asyncio.Lock()
+        return self._login_lock
+
+    async def _call(self, method, parameters, timeout=None):
+        if method in SuiteCRM._write_methods:
+            try:
+                return await self._send(method, parameters, timeout)
+            finally:
+                self._write_generation += 1
+        if self.conf.coalesce_calls:
+            key = SuiteCRM._get_coalescing_key(
+                method, parameters, self._write_generation)
+            if key is not None:
+                return await self._single_flight.do(
+                    key, self._send, method, parameters, timeout)
+        return await self._send(method, parameters, timeout)
+
+    async def _send(self, method, parameters, timeout=None):
+        return await self._policy.call_async(
+            method, self._send_attempt, parameters, timeout)
+
+    async def _send_attempt(self, method, parameters, timeout=None):
+        method_class = 'write' if method in SuiteCRM._write_methods else 'read'
+        governor = get_governor(self.conf, method_class)
+        if governor is None:
+            return await self._send_request(method, parameters, timeout)
+        return await governor.call_async(
+            self._send_request, method, parameters, timeout, key=method)
+
+    async def _send_request(self, method, parameters, timeout=None):
+        payload = self._codec.dumps(parameters)
+        async with self._get_semaphore():
+            content = await self._transport.post_async(method, payload, timeout)
+        metrics = self._metrics
+        if metrics is None:
+            response = self._codec.loads(content)
+        else:
+            start = time.perf_counter()
+            response = self._codec.loads(content)
+            metrics.record_transfer(method, len(payload), len(content),
+                                    time.perf_counter() - start)
+        if SuiteCRM._call_failed(response):
+            raise SuiteException.get_suite_exception(response)
+        return response
+
+    async def _request(self, method, parameters, timeout=None):
+        metrics = self._metrics
+        if metrics is None:
+            return await self._request_with_session(method, parameters, timeout)
+        start = time.perf_counter()
+        try:
+            response = await self._request_with_session(method, parameters, timeout)
+        except Exception as e:
+            metrics.record_call(method, time.perf_counter() - start, e)
+            raise
+        metrics.record_call(method, time.perf_counter() - start)
+        return response
+
+    async def _request_with_session(self, method, parameters, timeout=None):
+        if not self._session_id:
+            await self._login(None)
+        parameters['session'] = self._session_id
+        try:
+            return await self._call(method, parameters, timeout)
+        except InvalidSessionIDException:
+            if self._metrics is not None:
+                self._metrics.record_relogin(method)
+            await self._login(parameters['session'])
+            parameters['session'] = self._session_id
+            return await self._call(method, parameters, timeout)
+
+    async def _login(self, expired_session_id):
+        async with self._get_login_lock():
+            if self._session_id != expired_session_id:
+                # Another task already logged in while we were waiting.
+                return
+            login_result = await self._call(
+                'login', SuiteCRM._get_login_parameters(self.conf))
+            self._session_id = login_result['id']
+
+    async def login(self):
+        """
+        Login to SuiteCRM if there is no active session.
+        Calls perform the login automatically when needed.
+
+        :raises SuiteException: if error when login to SuiteCRM instance.
+        """
+        if not self._session_id:
+            await self._login(None)
+
+    async def close(self):
+        """
+        Closes the pooled HTTP connections to SuiteCRM.
+        """
+        await self._transport.close_async()
+
+    def enable_metrics(self, hook=None):
+        """
+        Start collecting metrics of the calls made by this client.
+
+        See SuiteCRM.enable_metrics for the description of the parameters.
+        """
+        if self._metrics is None:
+            self._metrics = Metrics()
+        if hook is not None:
+            self._metrics.add_hook(hook)
+        return self._metrics
+
+    def disable_metrics(self):
+        """
+        Stop collecting metrics of the calls made by this client.
+        """
+        self._metrics = None
+
+    def get_metrics(self):
+        """
+        Get the metrics of the calls made by this client.
+
+        See SuiteCRM.get_metrics for the description of the result.
+        """
+        metrics = self._metrics
+        return {'methods': metrics.snapshot() if metrics is not None else {}}
+
+    def _build_beans(self, method, function, *args):
+        metrics = self._metrics
+        if metrics is None:
+            return function(*args)
+        start = time.perf_counter()
+        result = function(*args)
+        metrics.record_beans(method, time.perf_counter() - start)
+        return result
+
+    async def get_bean(self, module_name, id, select_fields='',
+                       link_name_to_fields_array='', track_view='',
+                       timeout=None):
+        """
+        Retrieve a single Bean based on ID.
+
+        See SuiteCRM.get_bean for the description of the parameters.
+
+        :return: Bean object matching the selection criteria.
+        :rtype: Bean
+        :raises BeanNotFoundException: if the Bean is not found.
+        :raises SuiteException: if error when retrieving bean from SuiteCRM instance.
+        """
+        parameters = OrderedDict()
+        parameters['session'] = self._session_id
+        parameters['module_name'] = module_name
+        parameters['id'] = id
+        parameters['select_fields'] = select_fields
+        parameters['link_name_to_fields_array'] = link_name_to_fields_array
+        parameters['track_view'] = track_view
+        result = await self._request('get_entry', parameters, timeout)
+        return self._build_beans(
+            'get_entry', SuiteCRM._get_bean_from_result, module_name, result)
+
+    async def save_bean(self, bean, timeout=None):
+        """
+        Saves a Bean object to SuiteCRM.
+
+        :param Bean bean: Bean object.
+        :param float timeout: seconds the call can take, including its retries,
+            by default the deadline setting of the configuration.
+        :raises SuiteException: if error when saving Bean to SuiteCRM instance.
+        """
+        parameters = OrderedDict()
+        parameters['session'] = self._session_id
+        parameters['module_name'] = bean.module
+        parameters['name_value_list'] = bean.name_value_list
+        result = await self._request('set_entry', parameters, timeout)
+        SuiteCRM._update_bean_from_result(bean, result)
+
+    async def get_bean_list(self, module_name, query='', order_by='',
+                            offset='', select_fields='', link_name_to_fields_array='',
+                            max_results='', deleted='', favorites='', compact=False,
+                            lazy=False, timeout=None):
+        """
+        Get list of beans matching criteria.
+
+        See SuiteCRM.get_bean_list for the description of the parameters.
+
+        :return: dict containing results matching criteria.
+        :rtype: dict[str, object]
+        :raises SuiteException: if error when retrieving beans from SuiteCRM instance.
+        """
+        parameters = OrderedDict()
+        parameters['session'] = self._session_id
+        parameters['module_name'] = module_name
+        parameters['query'] = query
+        parameters['order_by'] = order_by
+        parameters['offset'] = offset
+        parameters['select_fields'] = select_fields
+        parameters['link_name_to_fields_array'] = link_name_to_fields_array
+        parameters['max_results'] = max_results
+        parameters['deleted'] = deleted
+        parameters['favorites'] = favorites
+        result = await self._request('get_entry_list', parameters, timeout)
+        return self._build_beans(
+            'get_entry_list', SuiteCRM._get_bean_list_from_result,
+            module_name, result, offset, max_results, compact, lazy)
+
+    async def get_available_modules(self, filter='default', timeout=None):
+        """
+        Retrieve the list of available modules on the system available to the currently logged in user.
+
+        :param str filter: valid values are: [all, default, mobile].
+        :param float timeout: seconds the call can take, including its retries,
+            by default the deadline setting of the configuration.
+        :return: dictionary containing information about modules.
+        :rtype: dict[str, object]
+        :raises SuiteException: if error when retrieving modules from SuiteCRM.
+        """
+        parameters = OrderedDict()
+        parameters['session'] = self._session_id
+        parameters['filter'] = filter
+        return await self._request('get_available_modules', parameters, timeout)
+
+    async def get_module_fields(self, module_name, fields='', timeout=None):
+        """
+        Retrieve field definitions of a module.
+
+        :param str module_name: the name of the module to return records from.
+        :param list[str] fields: if specified then retrieve definition of specified fields only.
+        :param float timeout: seconds the call can take, including its retries,
+            by default the deadline setting of the configuration.
+        :return: field definitions of the specified module.
+        :rtype: dict[str, object]
+        :raises SuiteException: if error when retrieving field definitions from SuiteCRM.
+        """
+        parameters = OrderedDict()
+        parameters['session'] = self._session_id
+        parameters['module_name'] = module_name
+        parameters['fields'] = fields
+        return await self._request('get_module_fields', parameters, timeout)
+
+    async def get_relationships(self, module_name, module_id, link_field_name,
+                                related_module_query='', related_fields=None,
+                                related_module_link_name_to_fields_array=None, deleted=False,
+                                order_by='', offset='', limit='', lazy=False,
+                                timeout=None):
+        """
+        Retrieve a collection of beans that are related to the specified bean
+        and optionally return relationship data for those related beans.
+
+        See SuiteCRM.get_relationships for the description of the parameters.
+
+        :return: dict containing results matching criteria.
+        :rtype: dict[str, object]
+        :raises SuiteException: if error when retrieving beans from SuiteCRM instance.
+        """
+        parameters = OrderedDict()
+        parameters['session'] = self._session_id
+        parameters['module_name'] = module_name
+        parameters['module_id'] = module_id
+        parameters['link_field_name'] = link_field_name
+        parameters['related_module_query'] = related_module_query
+        parameters['related_fields'] = related_fields or []
+        parameters['related_module_link_name_to_fields_array'] = \
+            related_module_link_name_to_fields_array or []
+        parameters['deleted'] = deleted
+        parameters['order_by'] = order_by
+        parameters['offset'] = offset
+        parameters['limit'] = limit
+        result = await self._request('get_relationships', parameters, timeout)
+        return self._build_beans(
+            'get_relationships', SuiteCRM._get_relationships_from_result,
+            result, offset, limit, lazy)
+
+    async def set_relationship(self, module_name, module_id, link_field_name,
+                               related_ids, name_value_list=None, delete=False,
+                               timeout=None):
+        """
+        Set a single relationship between two beans. The items are related by module name and id.
+
+        See SuiteCRM.set_relationship for the description of the parameters.
+
+        :return: how many relationships are deleted, created and failed.
+        :rtype: dict[str, int]
+        :raises SuiteException: if error when relating beans.
+        """
+        parameters = OrderedDict()
+        parameters['session'] = self._session_id
+        parameters['module_name'] = module_name
+        parameters['module_id'] = module_id
+        parameters['link_field_name'] = link_field_name
+        parameters['related_ids'] = related_ids
+        parameters['name_value_list'] = name_value_list or []
+        parameters['delete'] = delete
+        return await self._request('set_relationship', parameters, timeout)
+
+    async def get_note_attachment(self, note_id, timeout=None):
+        """
+        Retrieve an attachment from a note.
+
+        :param str note_id: ID of the appropriate Note.
+        :param float timeout: seconds the call can take, including its retries,
+            by default the deadline setting of the configuration.
+        :return: the requested attachment.
+        :rtype: dict[str, object]
+        :raises SuiteException: if error when retrieving the attachment from SuiteCRM instance.
+        """
+        parameters = OrderedDict()
+        parameters['session'] = self._session_id
+        parameters['id'] = note_id
+        return await self._request('get_note_attachment', parameters, timeout)
+
+    async def set_note_attachment(self, note_id, filename, file, timeout=None):
+        """
+        Add or replace the attachment on a Note.
+
+        :param str note_id: ID of the Note containing the attachment.
+        :param str filename: the file name of the attachment.
+        :param str file: the binary contents of the file.
+        :param float timeout: seconds the call can take, including its retries,
+            by default the deadline setting of the configuration.
+        :return: the ID of the note.
+        :rtype: dict[str, str]
+        :raises SuiteException: if error when setting the note attachment.
+        """
+        parameters = OrderedDict()
+        parameters['session'] = self._session_id
+        parameters['note'] = {
+            'id': note_id,
+            'filename': filename,
+            'file': file
+        }
+        return await self._request('set_note_attachment', parameters, timeout)
+
+    async def get_pdf_template(self, template_id, bean_module, bean_id,
+                               timeout=None):
+        """
+        Retrieve PDF Template for a given module record.
+
+        :param str template_id: template ID used to generate PDF.
+        :param str bean_module: module name of the bean that will be used to populate PDF.
+        :param str bean_id: ID of the bean record.
+        :param float timeout: seconds the call can take, including its retries,
+            by default the deadline setting of the configuration.
+        :return: the generated PDF.
+        :rtype: dict[str, str]
+        :raises SuiteException: if error when retrieving PDF.
+        """
+        parameters = OrderedDict()
+        parameters['session'] = self._session_id
+        parameters['template_id'] = template_id
+        parameters['bean_module'] = bean_module
+        parameters['bean_id'] = bean_id
+        return await self._request('get_pdf_template', parameters, timeout)
@@ -18,10 +18,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #######################################################################
 
-import json
-import time
+from .cache import create_cache, make_cache_key
 from .suitecrm import SuiteCRM
-from collections import OrderedDict
 
 
 class SuiteCRMCached(SuiteCRM):
@@ -31,8 +29,20 @@ class SuiteCRMCached(SuiteCRM):
     if is not on the cache, make the request to SuiteCRM, save it
     in the cache and finally return the result of the request.
 
-    The cache has a limit of cached requests, when this limit is reached,
-    the request that has not been accessed for a longer time is eliminated.
+    The cache has a limit of cached requests, and optionally a limit of
+    memory, when a limit is reached, the request that has not been
+    accessed for a longer time is eliminated.
+    Cached requests can also expire after a time to live.
+    The cache is kept in memory by default, it can also be stored on a
+    SQLite file to survive restarts and be shared between processes.
+
+    Cached calls are identified by their method and parameters, regardless
+    of the session used to make them, so they are still valid after a re-login.
+
+    Calls that modify data are never cached. Instead, they discard the
+    cached results they affect: saving a bean discards the cached calls that
+    retrieved it and the bean lists of its module, and relating beans
+    discards the cached relationships of both sides.
 
     This class allows you to make the same calls as the SuiteCRM class.
     Its the responsibility of the programmer to determine when to
@@ -41,80 +51,189 @@ class SuiteCRMCached(SuiteCRM):
     the existing information on the SuiteCRM instance.
     """
 
-    _cache = {}
-    _cache_accessed = {}
-    _max_cached_requests = 100
+    _cache = None
+    _max_invalidated_tags = 10000
+
+    def __init__(self, conf=None, max_cached_requests=None, cache_ttl=None,
+                 cache=None, max_cached_bytes=None, max_cached_entry_bytes=None):
+        """
+        Creates the cached client, or returns the existing one.
+
+        :param Config conf: configuration of the SuiteCRM instance. If not
+            specified, the default configuration is used and the single
+            default instance is returned.
+        :param int max_cached_requests: maximum number of cached calls,
+            by default the max_cached_requests setting of the configuration.
+        :param float cache_ttl: seconds a cached call is valid, 0 to never expire,
+            by default the cache_ttl setting of the configuration.
+        :param CacheBackend cache: cache where calls are stored, by default
+            one of the kind set in the cache_backend setting of the configuration.
+        :param int max_cached_bytes: maximum estimated size of the cached calls,
+            0 for no limit, by default the max_cached_bytes setting of the configuration.
+        :param int max_cached_entry_bytes: calls bigger than this size are not cached,
+            0 for no limit, by default the max_cached_entry_bytes setting of the configuration.
+        """
+        if conf is not None:
+            self.conf = conf
+        with self._lock:
+            if cache is not None:
+                self._cache = cache
+            elif self._cache is None:
+                self._cache = create_cache(
+                    self.conf.cache_backend,
+                    self.conf.max_cached_requests,
+                    self.conf.cache_ttl,
+                    self.conf.cache_path,
+                    self.conf.max_cached_bytes,
+                    self.conf.max_cached_entry_bytes
+                )
+            if max_cached_requests is not None:
+                self._cache.max_size = max_cached_requests
+            if cache_ttl is not None:
+                self._cache.ttl = cache_ttl
+            if max_cached_bytes is not None:
+                self._cache.max_bytes = max_cached_bytes
+            if max_cached_entry_bytes is not None:
+                self._cache.max_entry_bytes = max_cached_entry_bytes
+        super(SuiteCRMCached, self).__init__(conf)
+
+    @classmethod
+    def _create_instance(cls):
+        instance = super(SuiteCRMCached, cls)._create_instance()
+        # Write generation at which every tag was last invalidated, to not
+        # cache reads started before. Reads started before the floor are
+        # not cached, as the generations before it have been forgotten.
+        instance._invalidated_tags = {}
+        instance._invalidated_floor = 0
+        return instance
 
     def _login(self):
-        login_parameters = OrderedDict()
-        login_parameters['user_auth'] = {
-            'user_name': self.conf.username,
-            'password': self._md5(self.conf.password)
-        }
-        login_parameters['application_name'] = self.conf.application_name
         login_result = super(SuiteCRMCached, self)._call(
             'login',
-            login_parameters
+            self._get_login_parameters(self.conf)
         )
         self._session_id = login_result['id']
 
-    def _call(self, method, parameters):
-        cached_call = self._get_cached_call(method, parameters)
-        if cached_call:
+    def _call(self, method, parameters, timeout=None):
+        if method in self._write_methods:
+            response = None
+            try:
+                response = super(SuiteCRMCached, self)._call(
+                    method, parameters, timeout)
+                return response
+            finally:
+                self._invalidate_cached_calls(method, parameters, response)
+        key = self._get_cache_key(method, parameters)
+        cached_call = self._get_cached_call(key)
+        metrics = self._metrics
+        if metrics is not None:
+            metrics.record_cache(method, cached_call is not None)
+        if cached_call is not None:
             return cached_call
         else:
-            response = super(SuiteCRMCached, self)._call(method, parameters)
-            self._add_call_to_cache(method, parameters, response)
+            write_generation = self._write_generation
+            response = super(SuiteCRMCached, self)._call(
+                method, parameters, timeout)
+            with self._lock:
+                if not self._invalidated_since(
+                        method, parameters, write_generation):
+                    self._add_call_to_cache(key, method, parameters, response)
             return response
 
-    @staticmethod
-    def _get_time():
-        return time.time()
-
-    def _get_oldest_accessed_cache_key(self):
+    def _get_cache_key(self, method, parameters):
         try:
-            oldest_accessed = None
-            for key, timestamp in self._cache_accessed.items():
-                if oldest_accessed and oldest_accessed[1] > timestamp:
-                    oldest_accessed = (key, timestamp)
-                else:
-                    oldest_accessed = (key, timestamp)
-            return oldest_accessed[0]
+            key = (self.conf.url, self.conf.username,
+                   make_cache_key(method, parameters))
+            hash(key)
+            return key
         except Exception:
             return None
 
-    def _remove_oldest_cached_requests(self):
-        if len(self._cache) > self._max_cached_requests:
-            oldest_accessed = self._get_oldest_accessed_cache_key()
-            if oldest_accessed:
-                del self._cache[oldest_accessed]
-                del self._cache_accessed[oldest_accessed]
-
-    def _add_call_to_cache(self, method, parameters, response):
+    def _add_call_to_cache(self, key, method, parameters, response):
+        if key is None:
+            return False
         try:
-            key = (method, json.dumps(parameters))
-            self._cache[key] = response
-            self._cache_accessed[key] = self._get_time()
-            self._remove_oldest_cached_requests()
-            return True
+            return self._cache.set(
+                key, response, self._get_cache_tags(method, parameters))
         except Exception:
             return False
 
-    def _get_cached_call(self, method, parameters):
+    @staticmethod
+    def _get_cache_tags(method, parameters):
+        if method == 'get_entry':
+            return [('entry', parameters['module_name'], parameters['id'])]
+        if method == 'get_entries':
+            return [('entry', parameters['module_name'], id)
+                    for id in parameters['ids']]
+        if method == 'get_entry_list':
+            return [('list', parameters['module_name'])]
+        if method == 'get_relationships':
+            return [('relationships', parameters['module_id'])]
+        if method == 'get_note_attachment':
+            return [('entry', 'Notes', parameters['id'])]
+        return []
+
+    @staticmethod
+    def _get_invalidated_tags(method, parameters, response):
+        tags = []
+        if method in ('set_entry', 'set_entries'):
+            if method == 'set_entry':
+                name_value_lists = [parameters['name_value_list']]
+                ids = [response['id']] if response else []
+            else:
+                name_value_lists = parameters['name_value_lists']
+                ids = list(response.get('ids') or []) if response else []
+            for name_value_list in name_value_lists:
+                for field in name_value_list:
+                    if field['name'] == 'id' and field['value']:
+                        ids.append(field['value'])
+            tags.append(('list', parameters['module_name']))
+            tags.extend(('entry', parameters['module_name'], id) for id in ids)
+        elif method == 'set_relationship':
+            tags.append(('relationships', parameters['module_id']))
+            tags.extend(('relationships', id) for id in parameters['related_ids'])
+        elif method == 'set_relationships':
+            for module_id, related_ids in zip(parameters['module_ids'],
+                                              parameters['related_ids']):
+                tags.append(('relationships', module_id))
+                tags.extend(('relationships', id) for id in related_ids)
+        elif method == 'set_note_attachment':
+            tags.append(('entry', 'Notes', parameters['note']['id']))
+        return tags
+
+    def _invalidated_since(self, method, parameters, write_generation):
+        if write_generation < self._invalidated_floor:
+            return True
         try:
-            key = (method, json.dumps(parameters))
-            cached_response = self._cache[key]
-            self._cache_accessed[key] = self._get_time()
-            return cached_response
+            tags = self._get_cache_tags(method, parameters)
         except Exception:
+            return False
+        return any(self._invalidated_tags.get(tag, -1) > write_generation
+                   for tag in tags)
+
+    def _invalidate_cached_calls(self, method, parameters, response):
+        with self._lock:
+            if len(self._invalidated_tags) >= self._max_invalidated_tags:
+                self._invalidated_tags.clear()
+                self._invalidated_floor = self._write_generation
+            try:
+                for tag in self._get_invalidated_tags(
+                        method, parameters, response):
+                    self._invalidated_tags[tag] = self._write_generation
+                    self._cache.invalidate_tag(tag)
+            except Exception:
+                self.clear_cache()
+
+    def _get_cached_call(self, key):
+        if key is None:
             return None
+        return self._cache.get(key)
 
     def clear_cache(self):
         """
         This method clears all the information stored on the internal cache.
         """
         self._cache.clear()
-        self._cache_accessed.clear()
 
     def get_number_of_cached_calls(self):
         """
@@ -124,3 +243,38 @@ class SuiteCRMCached(SuiteCRM):
         :rtype: int
         """
         return len(self._cache)
+
+    def get_cached_bytes(self):
+        """
+        Get the estimated size of the cached calls.
+
+        :return: size of cached calls in bytes.
+        :rtype: int
+        """
+        return self._cache.size_bytes
+
+    def get_metrics(self):
+        """
+        Get the metrics of the calls made by this client.
+
+        :return: dict with the statistics of every API method under 'methods',
+            see Metrics.snapshot, and the statistics of the cache under 'cache',
+            see get_cache_statistics.
+        :rtype: dict
+        """
+        metrics = super(SuiteCRMCached, self).get_metrics()
+        metrics['cache'] = self.get_cache_statistics()
+        return metrics
+
+    def get_cache_statistics(self):
+        """
+        Get the hit, miss and eviction counters of the cache.
+
+        :return: dict with the number of 'hits', 'misses' and 'evictions'.
+        :rtype: dict[str, int]
+        """
+        return {
+            'hits': self._cache.hits,
+            'misses': self._cache.misses,
+            'evictions': self._cache.evictions,
+        }
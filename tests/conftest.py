@@ -0,0 +1,105 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import importlib.util
+import itertools
+import os
+import sys
+import pytest
+
+# The repository is the package itself, so it is loaded under the name it
+# is installed with to make its relative imports work.
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if 'suitepy' not in sys.modules:
+    _spec = importlib.util.spec_from_file_location(
+        'suitepy', os.path.join(_ROOT, '__init__.py'),
+        submodule_search_locations=[_ROOT])
+    sys.modules['suitepy'] = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(sys.modules['suitepy'])
+
+from suitepy.benchmarks.server import StandInServer
+from suitepy.config import Config
+from suitepy.transport import InProcessTransport, register_transport
+
+_transport_names = ('stand-in-%d' % i for i in itertools.count())
+
+
+@pytest.fixture
+def server():
+    """
+    StandInServer answering the calls of the conf fixture in process.
+    """
+    server = StandInServer(records=20, fields=2)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def count_calls(server):
+    """
+    Function that records the parameters of the calls of a method
+    made to the server fixture, and returns the list where they are added.
+    """
+
+    def count_calls(method):
+        calls = []
+        handle = server.handle
+
+        def counting_handle(called_method, rest_data):
+            if called_method == method:
+                calls.append(rest_data)
+            return handle(called_method, rest_data)
+
+        server.handle = counting_handle
+        return calls
+
+    return count_calls
+
+
+@pytest.fixture
+def make_conf(server, tmp_path):
+    """
+    Function that creates configurations of clients that send their calls
+    to the server fixture, with other settings by section.
+    """
+    name = next(_transport_names)
+    register_transport(
+        name, lambda conf: InProcessTransport(conf, server.handle))
+
+    def make_conf(settings=None):
+        all_settings = {
+            'SuiteCRM HTTP Connection': {
+                'transport': name, 'async_transport': name},
+        }
+        for section, values in (settings or {}).items():
+            all_settings.setdefault(section, {}).update(values)
+        return Config.from_values(
+            'http://stand-in/service/v4_1/rest.php', server.username,
+            server.password, config_dir=str(tmp_path), settings=all_settings)
+
+    return make_conf
+
+
+@pytest.fixture
+def conf(make_conf):
+    """
+    Configuration of a client that sends its calls to the server fixture.
+    """
+    return make_conf()
@@ -0,0 +1,74 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import pytest
+from suitepy.bean import Bean, BeanSchema, CompactBean, LazyBean
+
+NAME_VALUE_LIST = {
+    'id': {'name': 'id', 'value': 'contacts-1'},
+    'name': {'name': 'name', 'value': 'Contact 1'},
+    'email': {'name': 'email', 'value': 'contact@example.com'},
+}
+
+RELATIONSHIP_LIST = [{
+    'name': 'accounts',
+    'records': [{'id': {'name': 'id', 'value': 'accounts-1'}}],
+}]
+
+
+@pytest.mark.parametrize('bean_class', [LazyBean, CompactBean])
+def test_beans_offer_the_interface_of_bean(bean_class):
+    bean = Bean('Contacts', NAME_VALUE_LIST, RELATIONSHIP_LIST)
+    other = bean_class('Contacts', NAME_VALUE_LIST, RELATIONSHIP_LIST)
+    assert other.module == 'Contacts'
+    assert other['name'] == bean['name'] == 'Contact 1'
+    assert other['accounts'] == bean['accounts'] == [{'id': 'accounts-1'}]
+    assert other['unknown'] == ''
+    assert other.json == bean.json
+    assert other.name_value_list == bean.name_value_list
+    assert list(other.fields) == list(bean.fields)
+    assert str(other) == str(bean)
+    other['name'] = 'Renamed'
+    other['phone'] = '555'
+    assert other['name'] == 'Renamed' and other['phone'] == '555'
+    assert other.json == dict(bean.json, name='Renamed', phone='555')
+
+
+def test_lazy_bean_decodes_the_fields_when_they_are_accessed():
+    bean = LazyBean('Contacts', list(NAME_VALUE_LIST.values()), RELATIONSHIP_LIST)
+    assert bean['email'] == 'contact@example.com'
+    assert bean._decoded_fields == {'email': 'contact@example.com'}
+    assert bean._decoded_relationships is None
+    bean['email'] = 'other@example.com'
+    assert bean.json['email'] == 'other@example.com'
+    assert bean.json['name'] == 'Contact 1'
+
+
+def test_compact_beans_with_the_same_fields_share_their_schema():
+    first = CompactBean('Contacts', NAME_VALUE_LIST)
+    second = CompactBean(
+        'Contacts', list(NAME_VALUE_LIST.values()), schema=first.schema)
+    other = CompactBean('Contacts', {'id': {'name': 'id', 'value': 'x'}})
+    assert first.schema is second.schema
+    assert first.schema is BeanSchema.get(
+        'Contacts', ('id', 'name', 'email'))
+    assert other.schema is not first.schema
+    assert not hasattr(first, '__dict__')
+    assert CompactBean('Contacts').json == {}
@@ -0,0 +1,165 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+from collections import OrderedDict
+import pytest
+from suitepy import cache
+from suitepy.cache import LRUCache, SQLiteCache, create_cache, make_cache_key
+
+
+def count_size_estimations(monkeypatch):
+    values = []
+    estimate_size = cache.estimate_size
+
+    def counting_estimate_size(value):
+        values.append(value)
+        return estimate_size(value)
+
+    monkeypatch.setattr(cache, 'estimate_size', counting_estimate_size)
+    return values
+
+
+def test_lru_cache_without_byte_limits_does_not_estimate_sizes_on_set(
+        monkeypatch):
+    estimations = count_size_estimations(monkeypatch)
+    lru = LRUCache(max_size=2)
+    lru.set('a', {'value': 'a' * 100})
+    lru.set('b', {'value': 'b'})
+    lru.set('c', {'value': 'c'})
+    assert estimations == []
+    assert lru.size_bytes == cache.estimate_size({'value': 'b'}) + \
+        cache.estimate_size({'value': 'c'})
+
+
+def test_lru_cache_with_byte_limits_keeps_its_size_under_them():
+    lru = LRUCache(max_size=100, max_bytes=1000, max_entry_bytes=600)
+    assert not lru.set('big', 'x' * 1000)
+    for i in range(10):
+        assert lru.set(i, 'x' * 200)
+    assert 0 < lru.size_bytes <= 1000
+    assert 9 in lru and 0 not in lru
+    lru.delete(9)
+    lru.clear()
+    assert lru.size_bytes == 0
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_cache(request, tmp_path):
+    """
+    Function that creates caches of every backend, with a fake clock.
+    """
+    caches = []
+
+    def make_cache(**kwargs):
+        new_cache = create_cache(
+            request.param, path=str(tmp_path / 'cache.sqlite'), **kwargs)
+        new_cache.clock = Clock()
+        new_cache._get_time = new_cache.clock
+        caches.append(new_cache)
+        return new_cache
+
+    yield make_cache
+    for new_cache in caches:
+        if hasattr(new_cache, 'close'):
+            new_cache.close()
+
+
+def test_cache_evicts_the_least_recently_used_entry(make_cache):
+    lru = make_cache(max_size=2)
+    lru.set('a', 1)
+    lru.clock.now += 1
+    lru.set('b', 2)
+    lru.clock.now += 1
+    assert lru.get('a') == 1
+    lru.clock.now += 1
+    lru.set('c', 3)
+    assert lru.get('b') is None
+    assert lru.get('a') == 1 and lru.get('c') == 3
+    assert len(lru) == 2
+    assert lru.evictions == 1
+    assert (lru.hits, lru.misses) == (3, 1)
+
+
+def test_cache_entries_expire_after_the_ttl(make_cache):
+    lru = make_cache(max_size=10, ttl=5)
+    lru.set('a', 1)
+    lru.clock.now += 4
+    assert lru.get('a') == 1
+    lru.clock.now += 1
+    assert lru.get('a', 'expired') == 'expired'
+    assert len(lru) == 0
+
+
+def test_cache_keeps_its_size_under_the_byte_budget(make_cache):
+    lru = make_cache(max_size=100, max_bytes=3000, max_entry_bytes=1500)
+    assert not lru.set('big', 'x' * 2000)
+    for i in range(10):
+        lru.clock.now += 1
+        assert lru.set(i, 'x' * 1000)
+    assert 0 < lru.size_bytes <= 3000
+    assert lru.get(9) is not None and lru.get(0) is None
+    assert lru.get('big') is None
+
+
+def test_cache_invalidates_the_entries_of_a_tag(make_cache):
+    lru = make_cache(max_size=10)
+    lru.set('a', 1, [('Contacts', 'a'), 'Contacts'])
+    lru.set('b', 2, [('Contacts', 'b'), 'Contacts'])
+    lru.set('c', 3, ['Accounts'])
+    assert lru.invalidate_tag(('Contacts', 'a')) == 1
+    assert lru.get('a') is None and lru.get('b') == 2
+    assert lru.invalidate_tag('Contacts') == 1
+    assert lru.get('b') is None and lru.get('c') == 3
+    assert lru.invalidate_tag('Contacts') == 0
+    lru.clear()
+    assert len(lru) == 0 and lru.size_bytes == 0
+
+
+def test_sqlite_cache_survives_reopening(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    sqlite_cache = SQLiteCache(path, max_size=10)
+    sqlite_cache.set(('get_entry', 'a'), {'id': 'a'}, ['Contacts'])
+    sqlite_cache.close()
+    sqlite_cache = SQLiteCache(path, max_size=10)
+    assert sqlite_cache.get(('get_entry', 'a')) == {'id': 'a'}
+    assert sqlite_cache.invalidate_tag('Contacts') == 1
+    assert len(sqlite_cache) == 0
+    sqlite_cache.close()
+
+
+def test_equivalent_calls_have_the_same_key():
+    key = make_cache_key('get_entry_list', OrderedDict([
+        ('session', 'a'), ('module_name', 'Contacts'), ('query', ''),
+        ('select_fields', ['name', 'id'])]))
+    assert key == make_cache_key('get_entry_list', OrderedDict([
+        ('select_fields', ['id', 'name']), ('query', None),
+        ('module_name', 'Contacts'), ('session', 'b')]))
+    assert key != make_cache_key('get_entry_list', OrderedDict([
+        ('module_name', 'Accounts'), ('select_fields', ['id', 'name'])]))
+    hash(key)
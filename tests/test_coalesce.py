@@ -0,0 +1,133 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import asyncio
+import threading
+import time
+import pytest
+from suitepy.coalesce import AsyncSingleFlight, SingleFlight
+
+
+def run_in_threads(count, function):
+    threads = [threading.Thread(target=function) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def test_concurrent_calls_with_the_same_key_run_once():
+    single_flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    runs = []
+    results = []
+
+    def slow_call():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+        return 'result'
+
+    leader = run_in_threads(
+        1, lambda: results.append(single_flight.do('key', slow_call)))
+    started.wait(5)
+    followers = run_in_threads(
+        3, lambda: results.append(single_flight.do('key', slow_call)))
+    while single_flight.coalesced < 3:
+        time.sleep(0.001)
+    release.set()
+    for thread in leader + followers:
+        thread.join(5)
+    assert runs == [1]
+    assert results == ['result'] * 4
+    assert len(single_flight) == 0
+
+
+def test_waiting_calls_get_the_exception_of_the_call():
+    single_flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def failing_call():
+        started.set()
+        release.wait(5)
+        raise ValueError('failed')
+
+    def call():
+        try:
+            single_flight.do('key', failing_call)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = run_in_threads(1, call)
+    started.wait(5)
+    threads += run_in_threads(1, call)
+    while single_flight.coalesced < 1:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(errors) == 2 and errors[0] is errors[1]
+    assert single_flight.do('key', lambda: 'again') == 'again'
+
+
+def test_calls_with_other_keys_are_not_coalesced():
+    single_flight = SingleFlight()
+    assert single_flight.do('a', lambda: 1) == 1
+    assert single_flight.do('a', lambda: 2) == 2
+    assert single_flight.coalesced == 0
+
+
+def test_concurrent_tasks_with_the_same_key_run_once():
+    single_flight = AsyncSingleFlight()
+    runs = []
+
+    async def slow_call(value):
+        runs.append(value)
+        await asyncio.sleep(0.01)
+        return value
+
+    async def main():
+        return await asyncio.gather(
+            *[single_flight.do('key', slow_call, i) for i in range(4)])
+
+    assert asyncio.run(main()) == [0] * 4
+    assert runs == [0]
+    assert single_flight.coalesced == 3
+    assert len(single_flight) == 0
+
+
+def test_cancelling_the_running_task_cancels_the_waiting_ones():
+    single_flight = AsyncSingleFlight()
+
+    async def main():
+        leader = asyncio.ensure_future(
+            single_flight.do('key', asyncio.sleep, 5))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(
+            single_flight.do('key', asyncio.sleep, 5))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        assert len(single_flight) == 0
+
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import pytest
+from suitepy.codec import JSONCodec, get_codec
+from suitepy.suitecrm import SuiteCRM
+
+CODECS = ['json', 'orjson', 'ujson']
+
+
+def get_installed_codec(name):
+    if name != 'json':
+        pytest.importorskip(name)
+    return get_codec(name)
+
+
+@pytest.mark.parametrize('name', CODECS)
+def test_codecs_encode_and_decode_api_values(name):
+    codec = get_installed_codec(name)
+    value = {'session': 'abc', 'name_value_list': [
+        {'name': 'name', 'value': 'Ñandú 1'}, {'name': 'amount', 'value': 1.5}],
+        'deleted': False, 'offset': None}
+    document = codec.dumps(value)
+    assert isinstance(document, str)
+    assert codec.loads(document) == value
+    assert codec.loads(document.encode('utf8')) == value
+    assert codec.name == name
+
+
+def test_auto_codec_and_unknown_codecs():
+    codec = get_codec('auto')
+    assert codec.name in ('json', 'orjson')
+    assert isinstance(codec, JSONCodec)
+    with pytest.raises(ValueError):
+        get_codec('yaml')
+
+
+@pytest.mark.parametrize('name', CODECS)
+def test_clients_work_with_every_codec(make_conf, name):
+    get_installed_codec(name)
+    client = SuiteCRM(make_conf(
+        {'SuiteCRM HTTP Connection': {'json_codec': name}}))
+    assert client._get_codec().name == name
+    bean = client.get_bean('Contacts', 'contacts-00000001')
+    bean['name'] = 'Ñandú'
+    client.save_bean(bean)
+    assert client.get_bean('Contacts', 'contacts-00000001')['name'] == 'Ñandú'
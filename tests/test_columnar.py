@@ -0,0 +1,101 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import datetime
+from decimal import Decimal
+import pytest
+from suitepy.columnar import entries_to_columns, extend_columns, type_columns
+from suitepy.suitecrm import SuiteCRM
+
+
+def entry(**fields):
+    return {'name_value_list': dict(
+        (name, {'name': name, 'value': value}) for name, value in fields.items())}
+
+
+def test_entries_become_columns_with_none_for_missing_values():
+    entries = [entry(id='a', name='A'), entry(id='b'), entry(name='C', other=1)]
+    columns = entries_to_columns(entries)
+    assert columns == {'id': ['a', 'b', None], 'name': ['A', None, 'C']}
+    assert list(entries_to_columns(entries, ['name'])) == ['name']
+    assert entries_to_columns([]) == {}
+    assert extend_columns(columns, {'id': ['d'], 'name': ['D']}) == \
+        {'id': ['a', 'b', None, 'd'], 'name': ['A', None, 'C', 'D']}
+
+
+def test_values_are_converted_to_the_types_of_the_fields():
+    columns = type_columns(
+        {'count': ['1', '', 'x'], 'amount': ['1.50', None, '2'],
+         'deleted': ['0', '1', True], 'day': ['2018-01-02', '', None],
+         'name': ['A', '', None]},
+        {'count': 'int', 'amount': 'currency', 'deleted': 'bool',
+         'day': 'date', 'name': 'varchar'})
+    assert columns['count'] == [1, None, None]
+    assert columns['amount'] == [Decimal('1.50'), None, Decimal('2')]
+    assert columns['deleted'] == [False, True, True]
+    assert columns['day'] == [datetime.date(2018, 1, 2), None, None]
+    assert columns['name'] == ['A', '', None]
+
+
+def test_bean_columns_are_the_fields_of_the_beans(conf):
+    client = SuiteCRM(conf)
+    page = client.get_bean_list('Contacts', max_results=5)
+    columns = client.get_bean_columns('Contacts', max_results=5)['columns']
+    assert columns['amount'] == ['0', '10', '20', '30', '40']
+    for field, values in columns.items():
+        assert values == [bean[field] for bean in page['entry_list']]
+
+
+def test_typed_bean_columns(conf):
+    client = SuiteCRM(conf)
+    columns = client.get_all_bean_columns(
+        'Contacts', select_fields=['id', 'date_entered', 'amount', 'deleted'],
+        page_size=6, typed=True)
+    assert len(columns['id']) == 20
+    assert columns['amount'][:2] == [Decimal('0'), Decimal('10')]
+    assert columns['deleted'] == [False] * 20
+    assert columns['date_entered'][0] == datetime.datetime(2018, 1, 1, 10)
+    with pytest.raises(ValueError):
+        client.get_bean_columns('Contacts', output='xml')
+
+
+def test_bean_columns_as_numpy_arrays(conf):
+    numpy = pytest.importorskip('numpy')
+    client = SuiteCRM(conf)
+    arrays = client.get_bean_columns(
+        'Contacts', select_fields=['name', 'amount', 'deleted', 'date_entered'],
+        max_results=4, output='numpy')['columns']
+    assert arrays['amount'].dtype == numpy.float64
+    assert arrays['amount'].tolist() == [0.0, 10.0, 20.0, 30.0]
+    assert arrays['deleted'].dtype == bool
+    assert arrays['date_entered'].dtype == numpy.dtype('datetime64[s]')
+    assert arrays['name'].tolist() == ['Contacts %d' % i for i in range(4)]
+
+
+def test_bean_columns_as_a_dataframe(conf):
+    pytest.importorskip('pandas')
+    client = SuiteCRM(conf)
+    frame = client.get_bean_columns(
+        'Contacts', select_fields=['name', 'amount', 'deleted'],
+        max_results=4, output='pandas')['columns']
+    assert list(frame.columns) == ['name', 'amount', 'deleted']
+    assert len(frame) == 4
+    assert frame['amount'].sum() == 60.0
+    assert str(frame['deleted'].dtype) == 'boolean'
@@ -0,0 +1,129 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import time
+import requests
+from suitepy.governor import AdaptiveLimiter, Governor, TokenBucket, \
+    is_overload_error
+from suitepy.suite_exceptions import InvalidSessionIDException, \
+    ResourceManagementErrorException
+
+
+def acquire(limiter, calls):
+    for _ in range(calls):
+        limiter.acquire()
+
+
+def test_burst_of_overloaded_calls_decreases_the_limit_once():
+    limiter = AdaptiveLimiter(8, initial_limit=8)
+    acquire(limiter, 8)
+    time.sleep(0.01)
+    for _ in range(8):
+        limiter.release(0.01, True, 'get_entry')
+    assert limiter.limit == 4
+    acquire(limiter, 1)
+    time.sleep(0.01)
+    limiter.release(0.005, True, 'get_entry')
+    assert limiter.limit == 2
+
+
+def test_calls_without_latency_do_not_change_the_limit():
+    limiter = AdaptiveLimiter(8, initial_limit=2)
+    for _ in range(10):
+        acquire(limiter, 1)
+        limiter.release()
+    assert limiter.limit == 2
+    assert limiter.in_flight == 0
+
+
+def test_limit_grows_while_calls_succeed():
+    limiter = AdaptiveLimiter(4)
+    for _ in range(20):
+        acquire(limiter, 1)
+        limiter.release(0.01, key='get_entry')
+    assert limiter.limit == 4
+
+
+def test_latency_baseline_is_kept_per_key():
+    limiter = AdaptiveLimiter(8, initial_limit=8)
+    for _ in range(50):
+        acquire(limiter, 1)
+        limiter.release(0.001, key='get_entry')
+        acquire(limiter, 1)
+        limiter.release(0.05, key='get_entry_list')
+    assert limiter.limit == 8
+    acquire(limiter, 1)
+    limiter.release(0.5, key='get_entry_list')
+    assert limiter.limit == 7
+
+
+def test_governor_releases_overloaded_calls_with_their_key():
+    governor = Governor(max_concurrency=8)
+    governor.limiter._limit = 8.0
+
+    def time_out():
+        raise requests.Timeout()
+
+    for _ in range(3):
+        try:
+            governor.call(time_out, key='get_entry')
+        except requests.Timeout:
+            pass
+    assert governor.limiter.limit == 1
+    assert governor.limiter.in_flight == 0
+
+
+def test_governor_decreases_the_limit_once_on_a_burst_of_timeouts():
+    governor = Governor(max_concurrency=8)
+    governor.limiter._limit = 8.0
+    starts = [governor.acquire() for _ in range(8)]
+    time.sleep(0.01)
+    for start in starts:
+        governor.release(start, requests.Timeout(), 'get_entry')
+    assert governor.limiter.limit == 4
+
+
+def test_governor_does_not_raise_the_limit_on_interrupted_calls():
+    governor = Governor(max_concurrency=8)
+
+    def interrupt():
+        raise KeyboardInterrupt()
+
+    for _ in range(5):
+        try:
+            governor.call(interrupt, key='get_entry')
+        except KeyboardInterrupt:
+            pass
+    assert governor.limiter.limit == 1
+    assert governor.limiter.in_flight == 0
+
+
+def test_token_bucket_limits_the_rate():
+    bucket = TokenBucket(rate=100, burst=1)
+    assert bucket.reserve() == 0.0
+    assert 0 < bucket.reserve() <= 0.01
+
+
+def test_overload_errors():
+    assert is_overload_error(requests.Timeout())
+    assert is_overload_error(requests.ConnectionError())
+    assert is_overload_error(ResourceManagementErrorException(None))
+    assert not is_overload_error(InvalidSessionIDException(None))
+    assert not is_overload_error(ValueError())
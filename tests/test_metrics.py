@@ -0,0 +1,86 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+from suitepy.metrics import Metrics
+from suitepy.suitecrm import SuiteCRM
+from suitepy.suitecrm_cached import SuiteCRMCached
+
+
+def test_calls_are_recorded_per_method():
+    metrics = Metrics(buckets=(0.1, 1.0, float('inf')))
+    metrics.record_call('get_entry', 0.05)
+    metrics.record_call('get_entry', 2.0, ValueError('failed'))
+    metrics.record_transfer('get_entry', 100, 1000, 0.01)
+    metrics.record_relogin('get_entry')
+    stats = metrics.snapshot()['get_entry']
+    assert stats['count'] == 2 and stats['errors'] == 1
+    assert stats['latency_total'] == 2.05 and stats['latency_max'] == 2.0
+    assert list(stats['latency_histogram'].values()) == [1, 0, 1]
+    assert stats['exceptions'] == {'ValueError': 1}
+    assert (stats['request_bytes'], stats['response_bytes']) == (100, 1000)
+    assert stats['relogins'] == 1
+    metrics.reset()
+    assert metrics.snapshot() == {}
+
+
+def test_hooks_get_every_value_and_their_errors_are_ignored():
+    metrics = Metrics()
+    values = []
+
+    def failing_hook(method, metric, value):
+        raise RuntimeError('hook failed')
+
+    metrics.add_hook(failing_hook)
+    metrics.add_hook(lambda *value: values.append(value))
+    metrics.record_call('get_entry', 0.5)
+    metrics.record_cache('get_entry', False)
+    assert values == [('get_entry', 'latency', 0.5),
+                      ('get_entry', 'cache_miss', 1)]
+    metrics.remove_hook(failing_hook)
+    assert len(metrics._hooks) == 1
+
+
+def test_clients_record_the_metrics_of_their_calls(server, make_conf):
+    client = SuiteCRM(make_conf({'SuiteCRM Metrics': {'enabled': 'True'}}))
+    client.get_bean('Contacts', 'contacts-00000001')
+    server.expire_sessions()
+    client.get_bean_list('Contacts', max_results=5)
+    methods = client.get_metrics()['methods']
+    assert methods['get_entry']['count'] == 1
+    assert methods['get_entry']['response_bytes'] > 0
+    assert methods['get_entry_list']['relogins'] == 1
+    assert methods['get_entry_list']['bean_time'] > 0
+
+
+def test_metrics_can_be_enabled_on_a_running_client(conf):
+    client = SuiteCRMCached(conf)
+    assert client.get_metrics()['methods'] == {}
+    values = []
+    client.enable_metrics(lambda *value: values.append(value))
+    client.get_bean('Contacts', 'contacts-00000001')
+    client.get_bean('Contacts', 'contacts-00000001')
+    metrics = client.get_metrics()
+    assert metrics['methods']['get_entry']['cache_hits'] == 1
+    assert metrics['methods']['get_entry']['cache_misses'] == 1
+    assert metrics['cache']['hits'] == 1
+    assert ('get_entry', 'cache_hit', 1) in values
+    client.disable_metrics()
+    client.get_bean('Contacts', 'contacts-00000002')
+    assert client.get_metrics()['methods'] == {}
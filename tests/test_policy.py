@@ -0,0 +1,132 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import threading
+import time
+import pytest
+import requests
+from suitepy.config import Config
+from suitepy.policy import RetryPolicy
+from suitepy.suite_exceptions import InvalidSessionIDException
+from suitepy.suitecrm import SuiteCRM
+
+
+def failing(errors, response='ok'):
+    """
+    Get a send function that raises the given errors, then responds.
+    """
+    calls = []
+
+    def send(method, parameters, timeout):
+        calls.append(timeout)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return response
+
+    return send, calls
+
+
+def test_transient_errors_are_retried():
+    policy = RetryPolicy(retries=2, backoff=0.001)
+    send, calls = failing([requests.Timeout(), requests.ConnectionError()])
+    assert policy.call('get_entry', send, {}) == 'ok'
+    assert len(calls) == 3
+
+
+def test_retries_are_limited():
+    policy = RetryPolicy(retries=1, backoff=0.001)
+    send, calls = failing([requests.Timeout()] * 3)
+    with pytest.raises(requests.Timeout):
+        policy.call('get_entry', send, {})
+    assert len(calls) == 2
+
+
+def test_permanent_errors_and_writes_are_not_retried():
+    policy = RetryPolicy(retries=2, backoff=0.001,
+                         write_methods=frozenset(['set_entry']))
+    send, calls = failing([InvalidSessionIDException(None)])
+    with pytest.raises(InvalidSessionIDException):
+        policy.call('get_entry', send, {})
+    assert len(calls) == 1
+    send, calls = failing([requests.Timeout()])
+    with pytest.raises(requests.Timeout):
+        policy.call('set_entry', send, {})
+    assert len(calls) == 1
+
+
+def test_attempts_are_bounded_by_the_deadline():
+    policy = RetryPolicy(retries=5, backoff=0.001)
+    send, calls = failing([])
+    policy.call('get_entry', send, {}, timeout=5)
+    assert 4 < calls[0] <= 5
+    with pytest.raises(requests.Timeout):
+        policy.call('get_entry', send, {}, timeout=-1)
+
+
+def test_no_retry_is_started_after_the_deadline():
+    policy = RetryPolicy(retries=5, backoff=0.2, max_backoff=0.2)
+    send, calls = failing([requests.Timeout()] * 5)
+    start = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        policy.call('get_entry', send, {}, timeout=0.1)
+    assert time.monotonic() - start < 0.3
+
+
+def test_slow_calls_are_hedged():
+    policy = RetryPolicy(hedge_percentile=90, hedge_min_samples=10)
+    for _ in range(10):
+        policy.record_latency('get_entry', 0.01)
+    attempts = []
+
+    def send(method, parameters, timeout):
+        attempts.append(threading.current_thread().name)
+        time.sleep(1 if len(attempts) == 1 else 0.01)
+        return len(attempts)
+
+    start = time.monotonic()
+    assert policy.call('get_entry', send, {}) == 2
+    assert time.monotonic() - start < 0.5
+
+
+def test_calls_are_not_hedged_when_the_pool_is_full():
+    policy = RetryPolicy(hedge_percentile=90, hedge_min_samples=10,
+                         max_hedge_workers=1)
+    for _ in range(10):
+        policy.record_latency('get_entry', 0.01)
+    threads = []
+
+    def send(method, parameters, timeout):
+        threads.append(threading.current_thread())
+        return 'ok'
+
+    assert policy.call('get_entry', send, {}) == 'ok'
+    assert threads == [threading.current_thread()]
+
+
+def test_public_methods_accept_a_timeout(server, tmp_path):
+    server.start()
+    client = SuiteCRM(Config.from_values(
+        server.url, server.username, server.password,
+        config_dir=str(tmp_path)))
+    server.latency = 1
+    start = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        client.get_bean('Contacts', 'contacts-00000001', timeout=0.2)
+    assert time.monotonic() - start < 0.8
@@ -0,0 +1,84 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import io
+import json
+import pytest
+from suitepy.bean import CompactBean, LazyBean
+from suitepy.suite_exceptions import SuiteException
+from suitepy.suitecrm import SuiteCRM
+
+pytest.importorskip('ijson')
+
+from suitepy.streaming import iter_entry_list
+
+
+def test_entries_are_parsed_one_by_one():
+    response = {
+        'result_count': 2, 'total_count': '2', 'next_offset': 2,
+        'entry_list': [
+            {'id': 'a', 'name_value_list': {
+                'name': {'name': 'name', 'value': 'A'},
+                'amount': {'name': 'amount', 'value': 1.5}}},
+            {'id': 'b', 'name_value_list': {
+                'name': {'name': 'name', 'value': 'B'}}},
+        ],
+        'relationship_list': [],
+    }
+    summary = {}
+    entries = iter_entry_list(
+        io.BytesIO(json.dumps(response).encode('utf8')), summary)
+    assert next(entries) == response['entry_list'][0]
+    assert list(entries) == response['entry_list'][1:]
+    assert summary == {'result_count': 2, 'total_count': '2', 'next_offset': 2}
+
+
+def test_errors_are_raised_as_suite_exceptions():
+    error = {'name': 'Invalid Session ID', 'number': 11,
+             'description': 'The session ID is invalid'}
+    with pytest.raises(SuiteException):
+        list(iter_entry_list(io.BytesIO(json.dumps(error).encode('utf8'))))
+
+
+@pytest.mark.parametrize('bean_options', [{}, {'compact': True}, {'lazy': True}])
+def test_streamed_beans_are_the_beans_of_the_page(conf, bean_options):
+    client = SuiteCRM(conf)
+    page = client.get_bean_list('Contacts', max_results=10)
+    beans = list(client.stream_bean_list(
+        'Contacts', max_results=10, **bean_options))
+    assert [bean.json for bean in beans] == \
+        [bean.json for bean in page['entry_list']]
+    if bean_options.get('compact'):
+        assert all(isinstance(bean, CompactBean) for bean in beans)
+        assert len(set(id(bean.schema) for bean in beans)) == 1
+    if bean_options.get('lazy'):
+        assert all(isinstance(bean, LazyBean) for bean in beans)
+
+
+def test_streamed_call_logs_in_again_when_the_session_expires(
+        server, conf, count_calls):
+    logins = count_calls('login')
+    client = SuiteCRM(conf)
+    client.get_bean('Contacts', 'contacts-00000001')
+    server.expire_sessions()
+    names = [bean['name'] for bean in client.stream_bean_list(
+        'Contacts', max_results=3)]
+    assert names == ['Contacts 0', 'Contacts 1', 'Contacts 2']
+    assert len(logins) == 2
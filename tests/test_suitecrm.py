@@ -0,0 +1,336 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import json
+import threading
+import time
+import pytest
+from suitepy.bean import Bean
+from suitepy.suite_exceptions import SuiteException
+from suitepy.suitecrm import SuiteCRM
+from suitepy.suitecrm_cached import SuiteCRMCached
+
+
+def test_expired_session_logs_in_again(server, conf, count_calls):
+    logins = count_calls('login')
+    client = SuiteCRM(conf)
+    server.expire_sessions()
+    bean = client.get_bean('Contacts', 'contacts-00000001')
+    assert bean['name'] == 'Contacts 1'
+    assert len(logins) == 2
+    client.get_bean('Contacts', 'contacts-00000002')
+    assert len(logins) == 2
+
+
+def test_get_beans_reports_missing_ids(server, conf):
+    client = SuiteCRM(conf)
+    result = client.get_beans(
+        'Contacts', ['contacts-00000001', 'unknown', 'contacts-00000003'],
+        batch_size=2)
+    assert list(result['entry_list']) == ['contacts-00000001', 'contacts-00000003']
+    assert result['entry_list']['contacts-00000003']['name'] == 'Contacts 3'
+    assert result['missing_ids'] == ['unknown']
+
+
+def test_cached_client_discards_saved_beans(conf, count_calls):
+    get_entry_calls = count_calls('get_entry')
+    client = SuiteCRMCached(conf=conf)
+    bean = client.get_bean('Contacts', 'contacts-00000001')
+    client.get_bean('Contacts', 'contacts-00000001')
+    assert len(get_entry_calls) == 1
+    bean['name'] = 'Renamed'
+    client.save_bean(bean)
+    assert client.get_bean('Contacts', 'contacts-00000001')['name'] == 'Renamed'
+    assert len(get_entry_calls) == 2
+
+
+def reject_batches_after(server, saved):
+    """
+    Make set_entries save the first beans of a batch and then fail,
+    as SuiteCRM does when a record of the batch is rejected.
+    """
+    handle = server.handle
+
+    def rejecting_handle(method, rest_data):
+        if method == 'set_entries':
+            parameters = json.loads(rest_data)
+            for name_value_list in parameters['name_value_lists'][:saved]:
+                server._save(parameters['module_name'], name_value_list)
+            return server._error('invalid_call')
+        return handle(method, rest_data)
+
+    server.handle = rejecting_handle
+
+
+def test_save_beans_saves_one_by_one_when_a_batch_is_rejected(server, conf):
+    reject_batches_after(server, 0)
+    client = SuiteCRM(conf)
+    existing = client.get_bean('Contacts', 'contacts-00000001')
+    existing['name'] = 'Renamed'
+    new = Bean('Contacts')
+    new['name'] = 'New contact'
+    reports = client.save_beans([existing, new])
+    assert [report['success'] for report in reports] == [True, True]
+    assert server.data.modules['Contacts']['contacts-00000001']['name'] == 'Renamed'
+    assert server.data.modules['Contacts'][new['id']]['name'] == 'New contact'
+    assert 'new_with_id' not in new.fields
+    assert len(server.data.modules['Contacts']) == 21
+
+
+def test_save_beans_does_not_create_twice_the_beans_of_a_rejected_batch(
+        server, conf):
+    reject_batches_after(server, 1)
+    client = SuiteCRM(conf)
+    beans = []
+    for i in range(3):
+        bean = Bean('Contacts')
+        bean['name'] = 'New contact %d' % i
+        beans.append(bean)
+    reports = client.save_beans(beans)
+    assert all(report['success'] for report in reports)
+    assert len(server.data.modules['Contacts']) == 23
+    assert sorted(bean['id'] for bean in beans) == sorted(
+        set(server.data.modules['Contacts']) - set(
+            'contacts-%08d' % i for i in range(20)))
+
+
+def test_save_beans_clears_the_id_of_new_beans_not_saved(server, conf):
+    handle = server.handle
+
+    def reject_all(method, rest_data):
+        if method in ('set_entries', 'set_entry'):
+            return server._error('invalid_call')
+        return handle(method, rest_data)
+
+    server.handle = reject_all
+    client = SuiteCRM(conf)
+    bean = Bean('Contacts')
+    bean['name'] = 'New contact'
+    reports = client.save_beans([bean])
+    assert not reports[0]['success'] and reports[0]['error'] is not None
+    assert bean['id'] == ''
+
+
+def test_cached_client_accepts_positional_conf(conf, count_calls):
+    get_entry_calls = count_calls('get_entry')
+    client = SuiteCRMCached(conf, 10)
+    assert client.conf is conf
+    assert client._cache.max_size == 10
+    client.get_bean('Contacts', 'contacts-00000001')
+    client.get_bean('Contacts', 'contacts-00000001')
+    assert len(get_entry_calls) == 1
+
+
+
+def test_cached_client_keeps_its_calls_on_sqlite(make_conf, count_calls):
+    get_entry_calls = count_calls('get_entry')
+    conf = make_conf({'SuiteCRM Cache': {'cache_backend': 'sqlite'}})
+    bean = SuiteCRMCached(conf).get_bean('Contacts', 'contacts-00000001')
+    client = SuiteCRMCached(conf)
+    assert client.get_bean('Contacts', 'contacts-00000001').json == bean.json
+    assert len(get_entry_calls) == 1
+    bean['name'] = 'Renamed'
+    client.save_bean(bean)
+    assert client.get_bean('Contacts', 'contacts-00000001')['name'] == 'Renamed'
+    assert len(get_entry_calls) == 2
+
+def hold_first_call(server, method):
+    """
+    Make the first call to a method wait, after being answered,
+    until the returned event is set.
+    """
+    release = threading.Event()
+    held = []
+    handle = server.handle
+
+    def holding_handle(called_method, rest_data):
+        response = handle(called_method, rest_data)
+        if called_method == method and not held:
+            held.append(rest_data)
+            release.wait(10)
+        return response
+
+    server.handle = holding_handle
+    return release
+
+
+def read_in_thread(client):
+    results = []
+    thread = threading.Thread(target=lambda: results.append(
+        client.get_bean('Contacts', 'contacts-00000001')['name']))
+    thread.start()
+    return thread, results
+
+
+def test_reads_after_a_write_do_not_join_older_reads(server, conf):
+    release = hold_first_call(server, 'get_entry')
+    client = SuiteCRM(conf)
+    old_read, old_results = read_in_thread(client)
+    time.sleep(0.1)
+    bean = Bean('Contacts')
+    bean['id'] = 'contacts-00000001'
+    bean['name'] = 'Renamed'
+    client.save_bean(bean)
+    new_read, new_results = read_in_thread(client)
+    new_read.join(5)
+    release.set()
+    old_read.join(5)
+    assert old_results == ['Contacts 1']
+    assert new_results == ['Renamed']
+
+
+def test_cached_client_does_not_cache_reads_older_than_a_write(server, conf):
+    release = hold_first_call(server, 'get_entry')
+    client = SuiteCRMCached(conf)
+    old_read, old_results = read_in_thread(client)
+    time.sleep(0.1)
+    bean = Bean('Contacts')
+    bean['id'] = 'contacts-00000001'
+    bean['name'] = 'Renamed'
+    client.save_bean(bean)
+    release.set()
+    old_read.join(5)
+    assert old_results == ['Contacts 1']
+    assert client.get_bean('Contacts', 'contacts-00000001')['name'] == 'Renamed'
+
+
+def test_get_all_beans_fetches_every_page(server, conf):
+    client = SuiteCRM(conf)
+    beans = client.get_all_beans('Contacts', page_size=3, workers=3)
+    assert [bean['id'] for bean in beans] == [
+        'contacts-%08d' % i for i in range(20)]
+
+
+def test_get_all_beans_stops_at_the_first_failed_page(server, conf):
+    handle = server.handle
+    offsets = []
+
+    def fail_second_page(method, rest_data):
+        if method == 'get_entry_list':
+            offset = json.loads(rest_data)['offset']
+            offsets.append(offset)
+            if offset == 2:
+                return server._error('invalid_call')
+            if offset > 2:
+                time.sleep(0.05)
+        return handle(method, rest_data)
+
+    server.handle = fail_second_page
+    client = SuiteCRM(conf)
+    start = time.monotonic()
+    with pytest.raises(SuiteException):
+        client.get_all_beans('Contacts', page_size=2, workers=1)
+    assert time.monotonic() - start < 0.2
+    assert offsets.count(2) == 1
+    assert len(offsets) < 10
+
+
+def test_module_fields_are_cached_in_memory_until_refreshed(conf, count_calls):
+    calls = count_calls('get_module_fields')
+    client = SuiteCRM(conf)
+    fields = client.get_module_fields('Contacts')
+    assert client.get_module_fields('Contacts') == fields
+    assert len(calls) == 1
+    client.refresh_metadata('Contacts')
+    client.get_module_fields('Contacts')
+    assert len(calls) == 2
+    client.refresh_metadata()
+    client.get_module_fields('Contacts')
+    assert len(calls) == 3
+
+
+def test_get_all_bean_columns_keeps_the_columns_of_the_first_page(
+        server, conf):
+    handle = server.handle
+
+    def handle_with_other_fields(method, rest_data):
+        result = handle(method, rest_data)
+        if method == 'get_entry_list' and json.loads(rest_data)['offset']:
+            for entry in result['entry_list']:
+                fields = entry['name_value_list']
+                fields.pop('field_0')
+                fields['extra'] = {'name': 'extra', 'value': 'x'}
+                entry['name_value_list'] = dict(reversed(list(fields.items())))
+        return result
+
+    server.handle = handle_with_other_fields
+    client = SuiteCRM(conf)
+    columns = client.get_all_bean_columns('Contacts', page_size=6)
+    assert list(columns) == server.data.fields
+    assert all(len(values) == 20 for values in columns.values())
+    assert columns['name'][19] == 'Contacts 19'
+    assert columns['field_0'][6:] == [None] * 14
+
+
+def run_in_threads(count, function):
+    results = [None] * count
+    errors = []
+
+    def run(i):
+        try:
+            results[i] = function(i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert errors == []
+    return results
+
+
+def test_threads_share_the_client_of_a_configuration(
+        server, conf, count_calls, monkeypatch):
+    monkeypatch.setattr(SuiteCRM, '_clients', {})
+    logins = count_calls('login')
+    server.latency = 0.01
+    clients = run_in_threads(8, lambda i: SuiteCRM.for_config(conf))
+    assert all(client is clients[0] for client in clients)
+    assert len(logins) == 1
+
+
+def test_threads_log_in_again_once_when_the_session_expires(
+        server, conf, count_calls):
+    logins = count_calls('login')
+    client = SuiteCRM(conf)
+    server.expire_sessions()
+    server.latency = 0.01
+    names = run_in_threads(8, lambda i: client.get_bean(
+        'Contacts', 'contacts-%08d' % i)['name'])
+    assert names == ['Contacts %d' % i for i in range(8)]
+    assert len(logins) == 2
+
+
+def test_threads_share_identical_reads(server, conf, count_calls):
+    get_entry_calls = count_calls('get_entry')
+    release = hold_first_call(server, 'get_entry')
+    client = SuiteCRM(conf)
+    first_read, first_results = read_in_thread(client)
+    while not get_entry_calls:
+        time.sleep(0.001)
+    threading.Timer(0.1, release.set).start()
+    names = run_in_threads(7, lambda i: client.get_bean(
+        'Contacts', 'contacts-00000001')['name'])
+    first_read.join(10)
+    assert first_results + names == ['Contacts 1'] * 8
+    assert len(get_entry_calls) == 1
+    assert client._single_flight.coalesced == 7
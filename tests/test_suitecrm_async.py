@@ -0,0 +1,121 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import asyncio
+import itertools
+from suitepy.bean import Bean
+from suitepy.suitecrm_async import AsyncSuiteCRM
+from suitepy.transport import InProcessTransport, register_transport
+
+_transport_names = ('slow-stand-in-%d' % i for i in itertools.count())
+
+
+class SlowTransport(InProcessTransport):
+    """
+    Transport that lets other tasks run while a call is in flight,
+    and counts the calls in flight.
+    """
+
+    def __init__(self, conf, handler):
+        super(SlowTransport, self).__init__(conf, handler)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def post_async(self, method, payload, timeout=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return self.post(method, payload, timeout)
+        finally:
+            self.in_flight -= 1
+
+
+def make_slow_conf(server, make_conf):
+    name = next(_transport_names)
+    register_transport(name, lambda conf: SlowTransport(conf, server.handle))
+    return make_conf({'SuiteCRM HTTP Connection': {'async_transport': name}})
+
+
+def test_async_client_reads_and_saves_beans(conf):
+    async def main():
+        async with AsyncSuiteCRM(conf) as crm:
+            bean = await crm.get_bean('Contacts', 'contacts-00000001')
+            assert bean['name'] == 'Contacts 1'
+            bean['name'] = 'Renamed'
+            await crm.save_bean(bean)
+            bean = await crm.get_bean('Contacts', 'contacts-00000001')
+            assert bean['name'] == 'Renamed'
+            new_bean = Bean('Contacts')
+            new_bean['name'] = 'New'
+            await crm.save_bean(new_bean)
+            assert new_bean['id']
+            page = await crm.get_bean_list('Contacts', max_results=5)
+            assert len(page['entry_list']) == 5
+            assert page['next_offset'] == 5
+
+    asyncio.run(main())
+
+
+def test_async_client_logs_in_again_once_when_the_session_expires(
+        server, conf, count_calls):
+    logins = count_calls('login')
+
+    async def main():
+        async with AsyncSuiteCRM(conf) as crm:
+            server.expire_sessions()
+            beans = await asyncio.gather(*[
+                crm.get_bean('Contacts', 'contacts-%08d' % i)
+                for i in range(5)])
+            assert [bean['name'] for bean in beans] == \
+                ['Contacts %d' % i for i in range(5)]
+
+    asyncio.run(main())
+    assert len(logins) == 2
+
+
+def test_async_client_coalesces_identical_reads(
+        server, make_conf, count_calls):
+    conf = make_slow_conf(server, make_conf)
+    get_entry_calls = count_calls('get_entry')
+
+    async def main():
+        async with AsyncSuiteCRM(conf) as crm:
+            beans = await asyncio.gather(*[
+                crm.get_bean('Contacts', 'contacts-00000001')
+                for _ in range(5)])
+            assert all(bean['name'] == 'Contacts 1' for bean in beans)
+
+    asyncio.run(main())
+    assert len(get_entry_calls) == 1
+
+
+def test_async_client_bounds_the_calls_in_flight(server, make_conf):
+    conf = make_slow_conf(server, make_conf)
+
+    async def main():
+        async with AsyncSuiteCRM(conf, max_concurrency=2) as crm:
+            await asyncio.gather(*[
+                crm.get_bean('Contacts', 'contacts-%08d' % i)
+                for i in range(10)])
+            return crm._transport
+
+    transport = asyncio.run(main())
+    assert transport.max_in_flight == 2
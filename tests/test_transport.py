@@ -0,0 +1,86 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import asyncio
+import threading
+import pytest
+from suitepy.config import Config
+from suitepy.transport import AiohttpTransport, InProcessTransport, \
+    RequestsTransport, get_transport, register_transport
+
+
+@pytest.fixture
+def plain_conf(tmp_path):
+    return Config.from_values('http://stand-in/service/v4_1/rest.php',
+                              'admin', 'admin', config_dir=str(tmp_path))
+
+
+def test_transports_are_selected_by_name(plain_conf):
+    assert isinstance(get_transport(plain_conf), RequestsTransport)
+    register_transport('echo', lambda conf: InProcessTransport(
+        conf, lambda method, payload: {'method': method}))
+    transport = get_transport(plain_conf, 'echo')
+    assert transport.post('login', '{}') == b'{"method": "login"}'
+    assert isinstance(
+        get_transport(plain_conf, 'suitepy.transport.RequestsTransport'),
+        RequestsTransport)
+
+
+def test_unknown_transports_are_rejected(plain_conf):
+    with pytest.raises(ValueError):
+        get_transport(plain_conf, 'unknown')
+    with pytest.raises(ValueError):
+        get_transport(plain_conf, 'suitepy.transport.Unknown')
+
+
+def test_asynchronous_only_transports_are_rejected_for_sync_clients(plain_conf):
+    with pytest.raises(ValueError):
+        get_transport(plain_conf, 'aiohttp')
+    pytest.importorskip('aiohttp')
+    transport = get_transport(plain_conf, 'aiohttp', asynchronous=True)
+    assert isinstance(transport, AiohttpTransport)
+    with pytest.raises(TypeError):
+        transport.post('login', '{}')
+
+
+def test_in_process_transport_posts_asynchronously(plain_conf):
+    transport = InProcessTransport(plain_conf, lambda method, payload: payload)
+    assert asyncio.run(transport.post_async('login', '"x"')) == b'"x"'
+    assert transport.stream('login', '"x"').read() == b'"x"'
+
+
+def test_requests_transport_creates_a_single_session(plain_conf):
+    transport = RequestsTransport(plain_conf)
+    sessions = []
+    barrier = threading.Barrier(8)
+
+    def get_session():
+        barrier.wait()
+        sessions.append(transport._get_http_session())
+
+    threads = [threading.Thread(target=get_session) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(map(id, sessions))) == 1
+    transport.close()
+    assert transport._get_http_session() is not sessions[0]
+    transport.close()
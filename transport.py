@@ -0,0 +1,332 @@
+#######################################################################
+# Suite PY is a simple Python client for SuiteCRM API.
+
+# Copyright (C) 2017-2018 BTACTIC, SCCL
+# Copyright (C) 2017-2018 Marc Sanchez Fauste
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#######################################################################
+
+import asyncio
+import functools
+import importlib
+import io
+import json
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class Transport(object):
+    """
+    Sends API calls to SuiteCRM and returns the raw bytes of the responses.
+
+    Transports only move bytes: the parameters are encoded, and the
+    responses are decoded, mapped to exceptions and turned into beans by
+    the clients. A transport is created with the configuration of the
+    client that uses it.
+
+    Subclasses must implement post. The default stream and post_async
+    methods are built on top of it, post_async running it on the default
+    executor of the event loop, so any transport can be used by
+    AsyncSuiteCRM. Transports that can only be used from an event loop
+    set asynchronous_only and implement post_async instead.
+    """
+
+    name = None
+    asynchronous_only = False
+
+    def __init__(self, conf):
+        """
+        :param Config conf: configuration of the SuiteCRM instance.
+        """
+        self.conf = conf
+
+    def post(self, method, payload, timeout=None):
+        """
+        Send an API call.
+
+        :param str method: name of the API method.
+        :param str payload: JSON encoded parameters of the call.
+        :param float timeout: seconds the response can take, by default
+            the read_timeout setting of the configuration.
+        :return: body of the response.
+        :rtype: bytes
+        :raises requests.RequestException: if the call can not be sent or
+            the server responds with an HTTP error.
+        """
+        raise NotImplementedError()
+
+    def stream(self, method, payload, timeout=None):
+        """
+        Send an API call and get its response as a file-like object,
+        to read it while it is received.
+
+        :param str method: name of the API method.
+        :param str payload: JSON encoded parameters of the call.
+        :param float timeout: seconds the response can take.
+        :return: file-like object with the body of the response,
+            it must be closed when done.
+        """
+        return io.BytesIO(self.post(method, payload, timeout))
+
+    async def post_async(self, method, payload, timeout=None):
+        """
+        Send an API call without blocking the event loop.
+
+        See post for the description of the parameters.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self.post, method, payload, timeout))
+
+    def close(self):
+        """
+        Close the connections of the transport.
+        A transport can be used again after being closed.
+        """
+
+    async def close_async(self):
+        """
+        Close the connections of the transport from an event loop.
+        """
+        self.close()
+
+    def _get_read_timeout(self, timeout):
+        if timeout is None:
+            return self.conf.read_timeout
+        return min(self.conf.read_timeout, timeout)
+
+    @staticmethod
+    def _get_form(method, payload):
+        return {
+            'method': method,
+            'input_type': 'JSON',
+            'response_type': 'JSON',
+            'rest_data': payload,
+        }
+
+
+class _ResponseStream(object):
+
+    def __init__(self, response):
+        self._response = response
+        response.raw.decode_content = True
+
+    def read(self, size=-1):
+        return self._response.raw.read(size)
+
+    def close(self):
+        self._response.close()
+
+
+class RequestsTransport(Transport):
+    """
+    Transport that posts form encoded calls with the requests package,
+    keeping a pool of persistent connections configured by the
+    SuiteCRM HTTP Connection settings.
+    """
+
+    name = 'requests'
+
+    def __init__(self, conf):
+        super(RequestsTransport, self).__init__(conf)
+        self._http_session = None
+        self._lock = threading.Lock()
+
+    def _get_http_session(self):
+        http_session = self._http_session
+        if http_session is not None:
+            return http_session
+        with self._lock:
+            if self._http_session is None:
+                adapter = HTTPAdapter(
+                    pool_connections=self.conf.pool_connections,
+                    pool_maxsize=self.conf.pool_maxsize,
+                    pool_block=self.conf.pool_block
+                )
+                http_session = requests.Session()
+                http_session.mount('http://', adapter)
+                http_session.mount('https://', adapter)
+                http_session.verify = self.conf.verify_ssl
+                if not self.conf.keep_alive:
+                    http_session.headers['Connection'] = 'close'
+                self._http_session = http_session
+            return self._http_session
+
+    def _post(self, method, payload, timeout, stream):
+        r = self._get_http_session().post(
+            self.conf.url,
+            data=self._get_form(method, payload),
+            timeout=(self.conf.connect_timeout, self._get_read_timeout(timeout)),
+            stream=stream
+        )
+        try:
+            r.raise_for_status()
+        except requests.HTTPError:
+            r.close()
+            raise
+        return r
+
+    def post(self, method, payload, timeout=None):
+        return self._post(method, payload, timeout, False).content
+
+    def stream(self, method, payload, timeout=None):
+        return _ResponseStream(self._post(method, payload, timeout, True))
+
+    def close(self):
+        with self._lock:
+            http_session = self._http_session
+            self._http_session = None
+        if http_session is not None:
+            http_session.close()
+
+
+class AiohttpTransport(Transport):
+    """
+    Transport that posts form encoded calls with the aiohttp package,
+    only from an event loop. Requires aiohttp.
+
+    The number of connections is not limited by the transport, the
+    clients that use it limit the number of calls in flight.
+    """
+
+    name = 'aiohttp'
+    asynchronous_only = True
+
+    def __init__(self, conf):
+        super(AiohttpTransport, self).__init__(conf)
+        import aiohttp
+        self._aiohttp = aiohttp
+        self._http_session = None
+
+    def _get_http_session(self):
+        if self._http_session is None:
+            connector = self._aiohttp.TCPConnector(
+                limit=0,
+                force_close=not self.conf.keep_alive,
+                ssl=None if self.conf.verify_ssl else False
+            )
+            timeout = self._aiohttp.ClientTimeout(
+                sock_connect=self.conf.connect_timeout,
+                sock_read=self.conf.read_timeout
+            )
+            self._http_session = self._aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout
+            )
+        return self._http_session
+
+    def _get_client_timeout(self, timeout):
+        if timeout is None:
+            return None
+        return self._aiohttp.ClientTimeout(
+            total=timeout,
+            sock_connect=self.conf.connect_timeout,
+            sock_read=self._get_read_timeout(timeout)
+        )
+
+    def post(self, method, payload, timeout=None):
+        raise TypeError('The aiohttp transport can only be used by '
+                        'asynchronous clients, use post_async')
+
+    async def post_async(self, method, payload, timeout=None):
+        async with self._get_http_session().post(
+                self.conf.url, data=self._get_form(method, payload),
+                timeout=self._get_client_timeout(timeout)) as r:
+            r.raise_for_status()
+            return await r.read()
+
+    async def close_async(self):
+        if self._http_session is not None:
+            await self._http_session.close()
+            self._http_session = None
+
+
+class InProcessTransport(Transport):
+    """
+    Transport that passes calls to a function of the same process,
+    without any network, for tests and benchmarks.
+
+    The function is called with the method and the JSON encoded parameters,
+    and returns the response as bytes, str or a value to encode as JSON.
+    """
+
+    name = 'inprocess'
+
+    def __init__(self, conf, handler):
+        """
+        :param Config conf: configuration of the SuiteCRM instance.
+        :param handler: function that answers the calls.
+        """
+        super(InProcessTransport, self).__init__(conf)
+        self.handler = handler
+
+    def post(self, method, payload, timeout=None):
+        response = self.handler(method, payload)
+        if isinstance(response, bytes):
+            return response
+        if not isinstance(response, str):
+            response = json.dumps(response)
+        return response.encode('utf8')
+
+    async def post_async(self, method, payload, timeout=None):
+        return self.post(method, payload, timeout)
+
+
+_TRANSPORTS = {
+    RequestsTransport.name: RequestsTransport,
+    AiohttpTransport.name: AiohttpTransport,
+}
+
+
+def register_transport(name, factory):
+    """
+    Register a transport, so it can be selected by name in the configuration.
+
+    :param str name: name of the transport.
+    :param factory: function or class called with the configuration
+        of a client to create its transport.
+    """
+    _TRANSPORTS[name] = factory
+
+
+def get_transport(conf, name=None, asynchronous=False):
+    """
+    Create a transport.
+
+    :param Config conf: configuration of the SuiteCRM instance.
+    :param str name: name of a registered transport, like 'requests' or
+        'aiohttp', or dotted path of a Transport class, like
+        'mypackage.transports.Http2Transport'. By default the transport
+        setting of the configuration.
+    :param bool asynchronous: True if the transport is used by an
+        asynchronous client.
+    :return: the transport.
+    :rtype: Transport
+    :raises ValueError: if the transport does not exist, or can only be
+        used by asynchronous clients and asynchronous is False.
+    """
+    if name is None:
+        name = conf.transport
+    factory = _TRANSPORTS.get(name)
+    if factory is None:
+        module_name, _, class_name = name.replace(':', '.').rpartition('.')
+        try:
+            factory = getattr(importlib.import_module(module_name), class_name)
+        except (ImportError, AttributeError, ValueError):
+            raise ValueError('Unknown transport: ' + str(name))
+    if not asynchronous and getattr(factory, 'asynchronous_only', False):
+        raise ValueError('The ' + str(name) + ' transport can only be used '
+                         'by asynchronous clients')
+    return factory(conf)